@@ -0,0 +1,127 @@
+"""
+Streaming export of a tenant's projects, tasks and comments.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)``, which uses a
+server-side cursor on PostgreSQL, and are serialized one at a time. Memory use
+therefore stays flat however large the tenant is, and the first bytes go out
+before the query has finished.
+
+Tasks and comments of archived projects (see ``apps.core.archive``) follow
+the live ones, one project at a time, so memory use is bounded by the
+largest archive.
+"""
+import csv
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from apps.core import archive
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+
+# Column name -> queryset lookup, per resource.
+RESOURCES = {
+    'projects': (Project, {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'status': 'status',
+        'due_date': 'due_date',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+    'tasks': (Task, {
+        'id': 'id',
+        'project_id': 'project_id',
+        'project': 'project__name',
+        'title': 'title',
+        'description': 'description',
+        'status': 'status',
+        'priority': 'priority',
+        'assignee_email': 'assignee_email',
+        'due_date': 'due_date',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+    'comments': (TaskComment, {
+        'id': 'id',
+        'task_id': 'task_id',
+        'content': 'content',
+        'author_email': 'author_email',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def get_chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+# Resources whose rows archived projects keep, by position in ``archive.archived_rows``.
+ARCHIVED = {'tasks': 0, 'comments': 1}
+
+
+def _value(instance, lookup):
+    for name in lookup.split('__'):
+        instance = getattr(instance, name)
+    return instance
+
+
+def export_rows(organization, resource):
+    """
+    Yield the tenant's rows for ``resource`` as tuples: the live ones in
+    primary key order, then the archived ones, by project.
+    """
+    model, columns = RESOURCES[resource]
+    yield from (
+        model.objects.for_organization(organization)
+        .order_by('pk')
+        .values_list(*columns.values())
+        .iterator(chunk_size=get_chunk_size())
+    )
+    if resource not in ARCHIVED:
+        return
+    for tables in archive.archived_rows(organization):
+        for instance in sorted(tables[ARCHIVED[resource]], key=lambda instance: instance.pk):
+            yield tuple(_value(instance, lookup) for lookup in columns.values())
+
+
+def columns(resource):
+    return list(RESOURCES[resource][1])
+
+
+class Echo:
+    """File-like object whose ``write`` hands the value back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def to_ndjson(names, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def to_csv(names, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        )
+
+
+SERIALIZERS = {
+    'ndjson': to_ndjson,
+    'csv': to_csv,
+}
+
+
+def stream_export(organization, resource, format):
+    return SERIALIZERS[format](columns(resource), export_rows(organization, resource))
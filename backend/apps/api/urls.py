@@ -1,10 +1,21 @@
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from rest_framework.routers import DefaultRouter
+from apps.core import metrics
+from apps.core.response_cache import response_cache
+from .views import export_view, import_view
 
 router = DefaultRouter()
 
 urlpatterns = [
     path('', include(router.urls)),
     path('health/', lambda request: JsonResponse({'status': 'ok'}), name='health-check'),
+    path(
+        'metrics/',
+        lambda request: HttpResponse(metrics.registry.render(), content_type=metrics.CONTENT_TYPE),
+        name='metrics',
+    ),
+    path('cache/stats/', lambda request: JsonResponse(response_cache.get_stats()), name='cache-stats'),
+    path('export/<str:resource>/', export_view, name='export'),
+    path('import/<str:resource>/', import_view, name='import'),
 ]
\ No newline at end of file
@@ -0,0 +1,56 @@
+import codecs
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from apps.tasks.importer import FORMATS as IMPORT_FORMATS, IMPORTERS, ImportFormatError, read_rows
+from .export import FORMATS, RESOURCES, stream_export
+
+
+@require_GET
+def export_view(request, resource):
+    organization = getattr(request, 'organization', None)
+    if not organization:
+        return JsonResponse({'error': 'Organization required'}, status=400)
+    if resource not in RESOURCES:
+        return JsonResponse({'error': f'Unknown resource {resource!r}'}, status=404)
+    format = request.GET.get('format', 'ndjson')
+    if format not in FORMATS:
+        return JsonResponse({'error': f'Format must be one of: {", ".join(FORMATS)}'}, status=400)
+
+    response = StreamingHttpResponse(
+        stream_export(organization, resource, format),
+        content_type=FORMATS[format],
+    )
+    filename = f'{organization.slug}-{resource}-{timezone.now():%Y%m%d%H%M%S}.{format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Let nginx and similar proxies pass rows through as they are produced.
+    response['X-Accel-Buffering'] = 'no'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@csrf_exempt
+@require_POST
+def import_view(request, resource):
+    """
+    Import the uploaded rows, sent either as the raw request body or as the
+    ``file`` field of a multipart form. The body is read line by line, so
+    the upload is never held in memory in one piece.
+    """
+    organization = getattr(request, 'organization', None)
+    if not organization:
+        return JsonResponse({'error': 'Organization required'}, status=400)
+    if resource not in IMPORTERS:
+        return JsonResponse({'error': f'Unknown resource {resource!r}'}, status=404)
+    format = request.GET.get('format', 'ndjson')
+    if format not in IMPORT_FORMATS:
+        return JsonResponse({'error': f'Format must be one of: {", ".join(IMPORT_FORMATS)}'}, status=400)
+
+    upload = request.FILES['file'] if 'file' in request.FILES else request
+    importer = IMPORTERS[resource](organization, checkpoint_key=request.GET.get('checkpoint'))
+    try:
+        report = importer.run(read_rows(codecs.iterdecode(upload, 'utf-8'), format))
+    except (ImportFormatError, UnicodeDecodeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(report)
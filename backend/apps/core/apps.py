@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+
+    def ready(self):
+        from .response_cache import check_version_cache
+        from .routers import record_writes
+
+        connection_created.connect(record_writes)
+        checks.register(check_version_cache, checks.Tags.caches)
+        # Registers the background jobs of every app (see apps.core.queue).
+        autodiscover_modules('jobs')
@@ -0,0 +1,250 @@
+"""
+Cold storage for the tasks and comments of finished projects.
+
+``ARCHIVED`` projects, and ``COMPLETED`` ones not updated for
+``ARCHIVE_COMPLETED_AFTER_DAYS``, rarely change, yet their rows sit in the
+same tables and indexes as live work. ``archive_project`` moves their tasks
+and comments into one ``ProjectArchive`` row (zlib-compressed JSON, a list
+of values per row) and sets the project's ``archived_at``. The project and
+the stored counters stay as they are.
+
+Reads go through to the archive: ``tasks(projectId)``, ``task`` and
+``taskComments`` fall back to ``archived_tasks``, ``archived_task`` and
+``archived_comments``, which build model instances that are never saved.
+Changing the rows needs them back in the live tables: ``restore_project``
+reinserts them with their ids and timestamps. ``manage.py archive_projects``
+archives whatever is eligible and is meant to run on a schedule.
+"""
+import json
+import logging
+import zlib
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+from .bulk import insert_values
+from .models import ProjectArchive
+from .purge import delete_batch
+
+logger = logging.getLogger(__name__)
+
+# Ids per DELETE; SQLite allows 999 parameters per statement.
+DELETE_CHUNK = 500
+
+
+def get_completed_after():
+    return timedelta(days=getattr(settings, 'ARCHIVE_COMPLETED_AFTER_DAYS', 90))
+
+
+def _columns(model):
+    # search_vector is filled in again by its trigger on restore.
+    return [field.attname for field in model._meta.concrete_fields if field.name != 'search_vector']
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Cannot archive a {type(value).__name__}')
+
+
+def encode(tables):
+    """Compress ``{name: (columns, rows)}``."""
+    payload = {name: {'columns': columns, 'rows': rows} for name, (columns, rows) in tables.items()}
+    return zlib.compress(json.dumps(payload, default=_default, separators=(',', ':')).encode())
+
+
+def decode(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def _rows(payload, name, model):
+    """One table of ``payload`` as Python values, in ``_columns(model)`` order."""
+    table = payload.get(name) or {'columns': [], 'rows': []}
+    columns = _columns(model)
+    fields = [model._meta.get_field(column) for column in columns]
+    # Columns added since the rows were archived come back empty.
+    positions = [table['columns'].index(column) if column in table['columns'] else None for column in columns]
+    return [
+        tuple(
+            None if position is None else field.to_python(row[position])
+            for field, position in zip(fields, positions)
+        )
+        for row in table['rows']
+    ]
+
+
+def _delete(model, ids, organization_id):
+    for start in range(0, len(ids), DELETE_CHUNK):
+        delete_batch(model.objects.filter(pk__in=ids[start:start + DELETE_CHUNK]), None, organization_id)
+
+
+def eligible_projects(now=None):
+    cutoff = (now or timezone.now()) - get_completed_after()
+    return Project.objects.filter(archived_at__isnull=True).filter(
+        Q(status='ARCHIVED') | Q(status='COMPLETED', updated_at__lt=cutoff)
+    )
+
+
+def archive_project(project):
+    """Move the tasks and comments of ``project`` into its archive. Returns the archive."""
+    with transaction.atomic():
+        locked = Project.objects.select_for_update().filter(pk=project.pk).first()
+        if locked is None:
+            # Being purged.
+            return None
+        organization_id = locked.organization_id
+        tasks = list(
+            Task.objects.filter(organization_id=organization_id, project_id=locked.pk)
+            .order_by('pk').values_list(*_columns(Task))
+        )
+        comments = list(
+            TaskComment.objects.filter(
+                organization_id=organization_id, task__organization_id=organization_id, task__project_id=locked.pk
+            ).order_by('pk').values_list(*_columns(TaskComment))
+        )
+
+        archive = ProjectArchive.objects.select_for_update().filter(pk=locked.pk).first()
+        archived_tasks, archived_comments = [], []
+        if archive is None:
+            archive = ProjectArchive(project=locked, organization_id=organization_id)
+        else:
+            # Rows written since the project was archived join the earlier ones.
+            payload = decode(archive.data)
+            archived_tasks = _rows(payload, 'tasks', Task)
+            archived_comments = _rows(payload, 'comments', TaskComment)
+
+        # Ids come first in both column lists.
+        _delete(TaskComment, [row[0] for row in comments], organization_id)
+        _delete(Task, [row[0] for row in tasks], organization_id)
+
+        tasks = archived_tasks + tasks
+        comments = archived_comments + comments
+        task_ids = [row[0] for row in tasks]
+        archive.min_task_id = min(task_ids, default=None)
+        archive.max_task_id = max(task_ids, default=None)
+        archive.task_count = len(tasks)
+        archive.comment_count = len(comments)
+        archive.data = encode({
+            'tasks': (_columns(Task), tasks),
+            'comments': (_columns(TaskComment), comments),
+        })
+        archive.save()
+        project.archived_at = timezone.now()
+        Project.all_objects.filter(pk=locked.pk).update(archived_at=project.archived_at)
+    return archive
+
+
+def restore_project(project):
+    """
+    Move the archived rows of ``project`` back into the live tables. An
+    ``ARCHIVED`` project becomes ``ACTIVE`` again; a completed one starts its
+    retention period over. Returns the number of tasks restored.
+    """
+    with transaction.atomic():
+        archive = ProjectArchive.objects.select_for_update().filter(pk=project.pk).first()
+        restored = 0
+        if archive is not None:
+            payload = decode(archive.data)
+            insert_values(Task, _columns(Task), _rows(payload, 'tasks', Task))
+            insert_values(TaskComment, _columns(TaskComment), _rows(payload, 'comments', TaskComment))
+            restored = archive.task_count
+            archive.delete()
+        if project.status == 'ARCHIVED':
+            project.status = 'ACTIVE'
+        project.archived_at = None
+        project.save(update_fields=['status', 'archived_at', 'updated_at'])
+    return restored
+
+
+def archive_eligible(limit=None):
+    """Archive eligible projects, longest untouched first. Returns how many were archived."""
+    archived = 0
+    for project in eligible_projects().order_by('updated_at')[:limit]:
+        try:
+            if archive_project(project) is not None:
+                archived += 1
+        except Exception:
+            # Typically a comment written meanwhile; the next run retries.
+            logger.exception('Archiving project %s failed', project.pk)
+    return archived
+
+
+def _id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _archives(organization):
+    return ProjectArchive.objects.filter(
+        organization_id=organization.pk, project__deleting_at__isnull=True
+    ).select_related('project')
+
+
+def _newest_first(instance):
+    return (instance.created_at, instance.pk)
+
+
+def _load(archive):
+    """The archived tasks and comments, newest first, with their relations cached."""
+    payload = decode(archive.data)
+    tasks = [Task.from_db(None, _columns(Task), row) for row in _rows(payload, 'tasks', Task)]
+    by_id = {}
+    for task in tasks:
+        task.project = archive.project
+        by_id[task.pk] = task
+    comments = [TaskComment.from_db(None, _columns(TaskComment), row) for row in _rows(payload, 'comments', TaskComment)]
+    for comment in comments:
+        comment.task = by_id[comment.task_id]
+    return sorted(tasks, key=_newest_first, reverse=True), sorted(comments, key=_newest_first, reverse=True)
+
+
+def archived_rows(organization):
+    """The tasks and comments of each of the tenant's archives, one archive at a time, by project id."""
+    # Every archive holds a whole project's rows, so they are read one by one.
+    for archive in _archives(organization).order_by('pk').iterator(chunk_size=1):
+        yield _load(archive)
+
+
+def _holding(organization, task_id):
+    """The archives whose id range covers ``task_id``."""
+    return _archives(organization).filter(min_task_id__lte=task_id, max_task_id__gte=task_id)
+
+
+def archived_tasks(organization, project_id, status=None, assignee_email=None):
+    project_id = _id(project_id)
+    archive = _archives(organization).filter(project_id=project_id).first() if project_id else None
+    if archive is None:
+        return []
+    tasks, _ = _load(archive)
+    return [
+        task for task in tasks
+        if (not status or task.status == status) and (not assignee_email or task.assignee_email == assignee_email)
+    ]
+
+
+def archived_task(organization, task_id):
+    task_id = _id(task_id)
+    if task_id is None:
+        return None
+    for archive in _holding(organization, task_id):
+        tasks, _ = _load(archive)
+        for task in tasks:
+            if task.pk == task_id:
+                return task
+    return None
+
+
+def archived_comments(organization, task_id):
+    task_id = _id(task_id)
+    if task_id is None:
+        return []
+    for archive in _holding(organization, task_id):
+        tasks, comments = _load(archive)
+        if any(task.pk == task_id for task in tasks):
+            return [comment for comment in comments if comment.task_id == task_id]
+    return []
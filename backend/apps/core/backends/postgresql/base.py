@@ -0,0 +1,104 @@
+"""
+Django's PostgreSQL backend with a per-process connection pool.
+
+Set ``OPTIONS['pool']`` to the ``apps.core.pool.ConnectionPool`` options
+(``min_size``, ``max_size``, ``timeout``, ``check_interval``, ``max_idle``,
+``max_lifetime``) to enable it; without it this is Django's backend
+unchanged. Use it with ``CONN_MAX_AGE = 0``: Django then closes its
+connection at the end of each request, which hands it back to the pool.
+"""
+import threading
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.base import Database
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from apps.core.pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def close_pools(database_name=None):
+    """Close the idle connections of every pool, or of those for one database."""
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if database_name in (None, key[1])]
+    for pool in pools:
+        pool.close()
+
+
+def check_connection(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        connection.rollback()
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseCreation(base.DatabaseWrapper.creation_class):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the database from being dropped.
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    pool = None
+
+    @property
+    def pool_options(self):
+        return self.settings_dict['OPTIONS'].get('pool')
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_pool(self, conn_params):
+        key = (self.alias, *(conn_params.get(name) for name in ('dbname', 'host', 'port', 'user')))
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(
+                    self.alias,
+                    # Connections are opened by whichever thread's wrapper
+                    # created the pool; Django's setup only depends on the
+                    # settings, which every wrapper of the alias shares.
+                    connect=lambda: base.DatabaseWrapper.get_new_connection(self, conn_params),
+                    close=lambda connection: connection.close(),
+                    check=check_connection,
+                    **self.pool_options,
+                )
+        pool.fill()
+        return pool
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options:
+            return super().get_new_connection(conn_params)
+        # Django's get_new_connection sets this for each new connection.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        self.pool = self.get_pool(conn_params)
+        try:
+            return self.pool.acquire()
+        except PoolTimeout as e:
+            raise Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        connection = self.connection
+        # Django keeps using a connection closed inside atomic(); never share it.
+        discard = bool(connection.closed) or self.in_atomic_block
+        if not discard:
+            try:
+                # Back to the state of a fresh connection.
+                connection.rollback()
+            except Database.Error:
+                discard = True
+        self.pool.release(connection, discard=discard)
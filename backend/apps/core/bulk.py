@@ -0,0 +1,91 @@
+"""
+Fast multi-row inserts for loaders that bypass ``Model.save()``.
+
+On PostgreSQL rows are streamed with ``COPY ... FROM STDIN``; other backends
+get parameterized multi-row ``INSERT`` statements. Both write values exactly
+as given, so ``auto_now``/``auto_now_add`` timestamps and explicitly assigned
+primary keys are kept (``bulk_create`` would overwrite the former).
+
+``bulk_insert`` takes unsaved model instances. ``insert_values`` takes plain
+tuples and skips model instantiation entirely, for generators that produce
+millions of rows.
+"""
+import io
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+
+def _columns(model, instances):
+    # Primary keys are written only when every instance has one; the database
+    # assigns them otherwise, and they are not read back.
+    with_pk = all(instance.pk is not None for instance in instances)
+    return [
+        field for field in model._meta.concrete_fields
+        # search_vector columns are filled in by their database triggers.
+        if (with_pk or not field.primary_key) and field.name != 'search_vector'
+    ]
+
+
+def csv_field(value):
+    # Every value is quoted, so the unquoted empty field COPY reads as NULL
+    # stands for None alone; empty strings and a literal \N stay text.
+    if value is None:
+        return ''
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def copy_values(model, fields, rows):
+    """``COPY`` rows of Python values; PostgreSQL parses their text forms."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(csv_field(value) for value in row) + '\n')
+    buffer.seek(0)
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        connection.ops.quote_name(model._meta.db_table),
+        ', '.join(connection.ops.quote_name(field.column) for field in fields),
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+def insert_rows(model, fields, rows):
+    # Resolve the thread-local connection proxy once, not once per value.
+    db = connections[DEFAULT_DB_ALIAS]
+    placeholders = '({})'.format(', '.join(['%s'] * len(fields)))
+    prefix = 'INSERT INTO {} ({}) VALUES '.format(
+        db.ops.quote_name(model._meta.db_table),
+        ', '.join(db.ops.quote_name(field.column) for field in fields),
+    )
+    # Stay under the backend's limit on parameters per statement.
+    batch_size = db.ops.bulk_batch_size(fields, rows)
+    with db.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = [
+                field.get_db_prep_save(value, db)
+                for row in batch
+                for field, value in zip(fields, row)
+            ]
+            cursor.execute(prefix + ', '.join([placeholders] * len(batch)), params)
+
+
+def insert_values(model, field_names, rows):
+    """Insert ``rows``, tuples of values in ``field_names`` order (attnames for relations)."""
+    if not rows:
+        return
+    fields = [model._meta.get_field(name) for name in field_names]
+    if connection.vendor == 'postgresql':
+        copy_values(model, fields, rows)
+    else:
+        insert_rows(model, fields, rows)
+
+
+def bulk_insert(model, instances):
+    """Insert unsaved ``instances`` of ``model`` in one round of writes."""
+    if not instances:
+        return
+    fields = _columns(model, instances)
+    insert_values(
+        model,
+        [field.attname for field in fields],
+        [[field.value_from_object(instance) for field in fields] for instance in instances],
+    )
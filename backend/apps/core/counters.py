@@ -0,0 +1,218 @@
+"""
+Maintenance of the denormalized counter columns on Organization, Project and Task.
+
+Changes that move an organization-level figure also mark its stored
+dashboard rollup stale (see ``apps.organizations.stats``).
+
+Every write goes through an atomic ``F()`` update so concurrent requests never
+lose increments. Cached related instances are adjusted in memory as well, so
+objects returned from a mutation report the new counts without a reload.
+``reconcile`` recomputes all counters with set-based updates to repair drift
+left by paths that bypass the model hooks (raw SQL, ``QuerySet.update``).
+"""
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import add
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from apps.organizations import stats
+from apps.organizations.models import Organization, OrganizationStats
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+
+
+def _bump(model, pk, instance, **deltas):
+    model.objects.filter(pk=pk).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if instance is not None:
+        for field, delta in deltas.items():
+            setattr(instance, field, getattr(instance, field) + delta)
+
+
+def _cached(instance, field_name):
+    field = instance._meta.get_field(field_name)
+    return getattr(instance, field_name) if field.is_cached(instance) else None
+
+
+def _organization_id(project_id, project=None):
+    if project is not None:
+        return project.organization_id
+    return Project.objects.filter(pk=project_id).values_list('organization_id', flat=True).first()
+
+
+def _adjust_task(project_id, status, delta, project=None):
+    counter = Project.TASK_COUNTER_FIELDS.get(status)
+    if counter is None:
+        return
+    _bump(Project, project_id, project, **{counter: delta})
+    organization_id = _organization_id(project_id, project)
+    organization = _cached(project, 'organization') if project is not None else None
+    _bump(Organization, organization_id, organization, task_count=delta)
+    stats.mark_stale(organization_id)
+
+
+def task_added(task):
+    _adjust_task(task.project_id, task.status, 1, _cached(task, 'project'))
+
+
+def task_removed(task, status):
+    _adjust_task(task.project_id, status, -1, _cached(task, 'project'))
+
+
+def task_changed(task, old_project_id, old_status):
+    project = _cached(task, 'project')
+    old_counter = Project.TASK_COUNTER_FIELDS.get(old_status)
+    new_counter = Project.TASK_COUNTER_FIELDS.get(task.status)
+    if old_project_id == task.project_id and old_counter and new_counter:
+        # A status change within one project leaves the organization total alone.
+        if old_counter != new_counter:
+            _bump(Project, task.project_id, project, **{old_counter: -1, new_counter: 1})
+            if 'DONE' in (old_status, task.status):
+                stats.mark_stale(project_id=task.project_id)
+        return
+    old_project = project if old_project_id == task.project_id else None
+    _adjust_task(old_project_id, old_status, -1, old_project)
+    _adjust_task(task.project_id, task.status, 1, project)
+
+
+def comment_added(comment):
+    _bump(Task, comment.task_id, _cached(comment, 'task'), comment_count=1)
+
+
+def comment_removed(comment):
+    _bump(Task, comment.task_id, _cached(comment, 'task'), comment_count=-1)
+
+
+def project_added(project):
+    _bump(Organization, project.organization_id, _cached(project, 'organization'), project_count=1)
+    stats.mark_stale(project.organization_id)
+
+
+def project_changed(project):
+    # Project status feeds the active/completed rollups.
+    stats.mark_stale(project.organization_id)
+
+
+def project_removed(project, task_total):
+    _bump(
+        Organization,
+        project.organization_id,
+        _cached(project, 'organization'),
+        project_count=-1,
+        task_count=-task_total,
+    )
+    stats.mark_stale(project.organization_id)
+
+
+def tasks_bulk_changed(organization_id, deltas, projects=None):
+    """
+    Apply the net effect of a batched task write.
+
+    ``deltas`` maps ``(project_id, status)`` to a signed change in the number
+    of tasks. Each affected project gets one update and the organization one
+    more, however many rows the batch touched.
+    """
+    projects = projects or {}
+    per_project = defaultdict(Counter)
+    for (project_id, status), delta in deltas.items():
+        counter = Project.TASK_COUNTER_FIELDS.get(status)
+        if counter is not None and delta:
+            per_project[project_id][counter] += delta
+
+    total = 0
+    for project_id, changes in per_project.items():
+        changes = {counter: delta for counter, delta in changes.items() if delta}
+        if changes:
+            _bump(Project, project_id, projects.get(project_id), **changes)
+            total += sum(changes.values())
+    if total:
+        _bump(Organization, organization_id, None, task_count=total)
+    if per_project:
+        stats.mark_stale(organization_id)
+
+
+def comments_bulk_added(task_counts):
+    """
+    Add batched comments to their tasks' counters.
+
+    ``task_counts`` maps task ids to the number of comments added. Tasks that
+    gained the same number share one update.
+    """
+    by_count = defaultdict(list)
+    for task_id, count in task_counts.items():
+        if count:
+            by_count[count].append(task_id)
+    for count, task_ids in by_count.items():
+        Task.objects.filter(pk__in=task_ids).update(comment_count=F('comment_count') + count)
+
+
+def _archived_task_total():
+    task_total = reduce(add, (F(counter) for counter in Project.TASK_COUNTER_FIELDS.values()))
+    return Coalesce(
+        Subquery(
+            Project.objects.filter(organization=OuterRef('pk'), archived_at__isnull=False)
+            .order_by()
+            .values('organization')
+            .annotate(total=Sum(task_total))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def _count(queryset, key):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{key: OuterRef('pk')})
+            .order_by()
+            .values(key)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def reconcile(organization_ids=None):
+    """
+    Recompute every counter from the source tables.
+
+    Each model is repaired with a single ``UPDATE ... SET col = (subquery)``,
+    so the work stays in the database regardless of tenant size. Returns the
+    number of rows whose counters were rewritten per model.
+    """
+    organizations = Organization.objects.all()
+    projects = Project.objects.all()
+    # Tasks of projects being purged are already off the counters.
+    tasks = Task.objects.filter(project__deleting_at__isnull=True)
+    if organization_ids is not None:
+        organizations = organizations.filter(pk__in=organization_ids)
+        projects = projects.filter(organization_id__in=organization_ids)
+        tasks = tasks.filter(project__organization_id__in=organization_ids)
+
+    updated = {}
+    updated['tasks'] = tasks.update(comment_count=_count(TaskComment.objects.all(), 'task'))
+    # Archived projects keep the counts they were archived with (see
+    # apps.core.archive); their tasks are no longer in the tasks table.
+    updated['projects'] = projects.filter(archived_at__isnull=True).update(**{
+        counter: _count(Task.objects.filter(status=status), 'project')
+        for status, counter in Project.TASK_COUNTER_FIELDS.items()
+    })
+    updated['organizations'] = organizations.update(
+        project_count=_count(Project.objects.all(), 'organization'),
+        task_count=_count(
+            Task.objects.filter(
+                status__in=Project.TASK_COUNTER_FIELDS,
+                project__archived_at__isnull=True,
+                project__deleting_at__isnull=True,
+            ),
+            'organization',
+        ) + _archived_task_total(),
+    )
+    OrganizationStats.objects.filter(organization__in=organizations).update(
+        generation=F('generation') + 1
+    )
+    return updated
@@ -0,0 +1,270 @@
+"""
+Change events for projects and tasks, fanned out per organization.
+
+Writers call ``publish`` (the GraphQL mutations do). Events are sent once the
+surrounding transaction commits, so subscribers never hear about changes
+that were rolled back, and in one batch per transaction (per savepoint, when
+events are published at several levels), so a bulk mutation costs a single
+``pg_notify`` statement rather than one per row. Subscribers iterate ``get_broker().subscribe(org_id)``
+on an event loop and receive every event for that organization.
+
+Two brokers are available, picked by ``EVENT_BROKER``:
+
+``memory``
+    Fan-out within one process. Enough for a single ASGI worker.
+``postgres``
+    ``pg_notify`` on publish, one notification per event from a single
+    statement per batch, and one ``LISTEN`` connection per process, so
+    every worker sees the events of every other worker. Payloads carry ids
+    only, well under the 8000-byte ``NOTIFY`` limit. A dropped ``LISTEN``
+    connection is replaced with backoff; events sent while it was down are
+    not replayed.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CREATED = 'CREATED'
+UPDATED = 'UPDATED'
+DELETED = 'DELETED'
+
+CHANNEL = 'project_management_events'
+
+
+class ChangeEvent:
+    """A project or task was created, updated or deleted."""
+
+    def __init__(self, kind, action, organization_id, id, project_id):
+        self.kind = kind
+        self.action = action
+        self.organization_id = organization_id
+        self.id = id
+        self.project_id = project_id
+
+    def __repr__(self):
+        return f'<ChangeEvent {self.kind} {self.id} {self.action}>'
+
+    def to_json(self):
+        return json.dumps([self.kind, self.action, self.organization_id, self.id, self.project_id])
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls(*json.loads(payload))
+
+
+class InMemoryBroker:
+    """
+    Delivers events to subscribers in this process. ``publish`` may be called
+    from any thread; each subscriber has a bounded queue on its own event
+    loop, and a subscriber that falls ``MAX_PENDING`` events behind misses
+    the newest ones rather than growing without bound.
+    """
+
+    MAX_PENDING = 1000
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def publish(self, event):
+        self.publish_many([event])
+
+    def publish_many(self, events):
+        for event in events:
+            self.deliver(event)
+
+    def deliver(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event.organization_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has closed.
+                pass
+
+    def _put(self, queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def subscriber_count(self, organization_id=None):
+        with self._lock:
+            if organization_id is not None:
+                return len(self._subscribers.get(organization_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def listen(self):
+        """Hook for brokers that must start receiving before the first subscriber."""
+
+    async def subscribe(self, organization_id):
+        await self.listen()
+        entry = (asyncio.get_running_loop(), asyncio.Queue(self.MAX_PENDING))
+        with self._lock:
+            self._subscribers[organization_id].add(entry)
+        try:
+            while True:
+                yield await entry[1].get()
+        finally:
+            with self._lock:
+                self._subscribers[organization_id].discard(entry)
+                if not self._subscribers[organization_id]:
+                    del self._subscribers[organization_id]
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Publishes with ``pg_notify`` and, per process, listens on a dedicated
+    connection whose socket is watched by the event loop.
+    """
+
+    # Seconds before reconnecting a lost listener, doubling up to the maximum.
+    RECONNECT_DELAY = 1.0
+    MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, channel=CHANNEL):
+        super().__init__()
+        self.using = using
+        self.channel = channel
+        self._listeners = {}
+
+    def publish_many(self, events):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                [self.channel, [event.to_json() for event in events]],
+            )
+
+    async def listen(self):
+        loop = asyncio.get_running_loop()
+        listener = self._listeners.get(loop)
+        if listener is None:
+            listener = self._listeners[loop] = loop.create_task(self._start(loop))
+        try:
+            await asyncio.shield(listener)
+        except Exception:
+            # Let the next subscriber try again.
+            self._listeners.pop(loop, None)
+            raise
+
+    async def _start(self, loop):
+        listener = await asyncio.to_thread(self._connect)
+        fileno = listener.fileno()
+        loop.add_reader(fileno, self._receive, loop, fileno, listener)
+        return listener
+
+    async def _reconnect(self, loop):
+        delay = self.RECONNECT_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            if not self.subscriber_count():
+                # The next subscriber starts a listener again.
+                self._listeners.pop(loop, None)
+                return None
+            try:
+                return await self._start(loop)
+            except Exception:
+                logger.warning('Reconnecting the event listener failed', exc_info=True)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    def _lost(self, loop, fileno, listener):
+        loop.remove_reader(fileno)
+        try:
+            listener.close()
+        except Exception:
+            pass
+        self._listeners[loop] = loop.create_task(self._reconnect(loop))
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        params = connections[self.using].get_connection_params()
+        listener = psycopg2.connect(**params)
+        listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with listener.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.channel}')
+        return listener
+
+    def _receive(self, loop, fileno, listener):
+        import psycopg2
+
+        try:
+            listener.poll()
+        except psycopg2.Error:
+            logger.warning('Event listener connection lost, reconnecting', exc_info=True)
+            self._lost(loop, fileno, listener)
+            return
+        while listener.notifies:
+            notify = listener.notifies.pop(0)
+            try:
+                event = ChangeEvent.from_json(notify.payload)
+            except (TypeError, ValueError):
+                logger.warning('Ignoring malformed event %r', notify.payload)
+                continue
+            self.deliver(event)
+
+
+BROKERS = {
+    'memory': InMemoryBroker,
+    'postgres': PostgresBroker,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                name = getattr(settings, 'EVENT_BROKER', 'memory')
+                _broker = BROKERS[name]() if name in BROKERS else import_string(name)()
+    return _broker
+
+
+class EventBatch:
+    """``on_commit`` callback publishing the events of one transaction or savepoint."""
+
+    def __init__(self, savepoint_ids):
+        self.savepoint_ids = savepoint_ids
+        self.events = []
+
+    def __call__(self):
+        get_broker().publish_many(self.events)
+
+
+def publish(kind, action, organization_id, id, project_id, using=DEFAULT_DB_ALIAS):
+    """Publish a change once the current transaction (if any) commits."""
+    event = ChangeEvent(kind, action, organization_id, int(id), int(project_id))
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        get_broker().publish(event)
+        return
+    # Join the batch of the latest callback when it belongs to the same
+    # savepoint: rolling that back then drops the batch and its events with
+    # it, and events keep their order.
+    savepoint_ids = list(connection.savepoint_ids)
+    pending = connection.run_on_commit[-1][1] if connection.run_on_commit else None
+    if not isinstance(pending, EventBatch) or pending.savepoint_ids != savepoint_ids:
+        pending = EventBatch(savepoint_ids)
+        transaction.on_commit(pending, using=using)
+    pending.events.append(event)
+
+
+def task_changed(task, action, organization_id):
+    publish('task', action, organization_id, task.pk, task.project_id)
+
+
+def project_changed(project, action):
+    publish('project', action, project.organization_id, project.pk, project.pk)
@@ -0,0 +1,50 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from . import archive, purge
+from .models import Job, Purge
+from .queue import job
+
+# Rows per DELETE when clearing out finished jobs.
+CLEANUP_CHUNK = 1000
+
+
+@job(max_attempts=5)
+def run_purge(purge_id):
+    """Carry out one purge; a failed run is retried from where it stopped."""
+    Purge.objects.filter(pk=purge_id, status=Purge.FAILED).update(status=Purge.PENDING, error='')
+    claimed = purge.claim_next(Purge.objects.filter(pk=purge_id))
+    if claimed is None:
+        # Done already, or another worker has it.
+        return None
+    try:
+        purge.run(claimed)
+    except Exception as e:
+        purge.fail(claimed, e)
+        raise
+    return {
+        'projects_deleted': claimed.projects_deleted,
+        'tasks_deleted': claimed.tasks_deleted,
+        'comments_deleted': claimed.comments_deleted,
+    }
+
+
+@job(every=timedelta(minutes=5))
+def purge_deleted():
+    """Pick up purges whose process died mid-way."""
+    return {'completed': purge.run_pending()}
+
+
+@job(every=timedelta(hours=1))
+def archive_projects():
+    return {'archived': archive.archive_eligible()}
+
+
+@job(every=timedelta(days=1))
+def delete_finished_jobs():
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'JOB_KEEP_DAYS', 7))
+    finished = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], completed_at__lt=cutoff)
+    deleted = 0
+    while ids := list(finished.values_list('pk', flat=True)[:CLEANUP_CHUNK]):
+        deleted += Job.objects.filter(pk__in=ids).delete()[0]
+    return {'deleted': deleted}
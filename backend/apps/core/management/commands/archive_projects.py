@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.core import archive
+
+
+class Command(BaseCommand):
+    help = 'Move the tasks and comments of archived and long-completed projects to cold storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Archive at most this many projects per run')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the projects that would be archived')
+        parser.add_argument(
+            '--watch', type=float, metavar='SECONDS',
+            help='Keep running, checking for eligible projects this often',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            projects = archive.eligible_projects().order_by('updated_at')[:options['limit']]
+            for project in projects.select_related('organization'):
+                self.stdout.write(f'{project.organization.slug}: {project.name} ({project.status}, {project.task_count} tasks)')
+            return
+
+        while True:
+            archived = archive.archive_eligible(options['limit'])
+            if archived:
+                self.stdout.write(self.style.SUCCESS(f'Archived {archived} projects'))
+            if not options['watch']:
+                break
+            time.sleep(options['watch'])
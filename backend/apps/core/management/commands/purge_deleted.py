@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.core import purge
+from apps.core.models import Purge
+
+
+class Command(BaseCommand):
+    help = 'Delete the rows of projects and organizations scheduled for deletion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Rows per DELETE (default: PURGE_BATCH_SIZE)')
+        parser.add_argument('--pause', type=float, help='Seconds between batches (default: PURGE_PAUSE)')
+        parser.add_argument('--retry-failed', action='store_true', help='Run failed purges again')
+        parser.add_argument(
+            '--watch', type=float, metavar='SECONDS',
+            help='Keep running, checking for new purges this often',
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            retried = Purge.objects.filter(status=Purge.FAILED).update(status=Purge.PENDING, error='')
+            self.stdout.write(f'Retrying {retried} failed purges')
+
+        while True:
+            completed = purge.run_pending(options['batch_size'], options['pause'])
+            if completed:
+                self.stdout.write(self.style.SUCCESS(f'Completed {completed} purges'))
+            if not options['watch']:
+                break
+            time.sleep(options['watch'])
+
+        failed = Purge.objects.filter(status=Purge.FAILED).count()
+        if failed:
+            self.stderr.write(f'{failed} purges failed; see their error and run with --retry-failed')
@@ -0,0 +1,30 @@
+import signal
+from django.core.management.base import BaseCommand
+from apps.core import queue
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            help='Jobs run at once, one thread each (default: JOB_WORKER_CONCURRENCY)',
+        )
+        parser.add_argument('--poll-interval', type=float, help='Seconds between checks when idle (default: JOB_POLL_INTERVAL)')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        worker = queue.Worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+        )
+        self.stdout.write(f'Worker {worker.name} running {worker.concurrency} jobs at a time')
+        previous = worker.handle_signals()
+        try:
+            processed = worker.run()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+        self.stdout.write(self.style.SUCCESS(f'Ran {processed} jobs'))
@@ -1,23 +1,125 @@
-from django.http import JsonResponse
+import copy
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
 from apps.organizations.models import Organization
+from .cache import TTLCache
+from .routers import get_replicas, replica_session
+
+# Slug -> Organization (or None for unknown/inactive slugs), per process.
+organization_cache = TTLCache(
+    maxsize=getattr(settings, 'ORGANIZATION_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'ORGANIZATION_CACHE_TTL', 60),
+)
+
+_MISSING = object()
+
+
+def resolve_organization(slug):
+    organization = organization_cache.get(slug, _MISSING)
+    if organization is _MISSING:
+        organization = Organization.objects.filter(slug=slug, is_active=True).first()
+        organization_cache.set(slug, organization)
+    # Hand each request its own instance so per-request changes never leak.
+    return copy.copy(organization) if organization is not None else None
+
+
+async def aresolve_organization(slug):
+    organization = organization_cache.get(slug, _MISSING)
+    if organization is _MISSING:
+        organization = await Organization.objects.filter(slug=slug, is_active=True).afirst()
+        organization_cache.set(slug, organization)
+    return copy.copy(organization) if organization is not None else None
+
+
+def invalidate_organization(organization):
+    def discard():
+        organization_cache.discard(
+            lambda slug, cached: slug == organization.slug
+            or (cached is not None and cached.pk == organization.pk)
+        )
+
+    discard()
+    # Drop it again once the write is visible to other requests.
+    transaction.on_commit(discard)
 
 
 class OrganizationMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         organization_slug = request.headers.get('X-Organization-Slug')
         
         if organization_slug:
-            try:
-                organization = Organization.objects.get(slug=organization_slug, is_active=True)
-                request.organization = organization
-            except Organization.DoesNotExist:
-                # Don't fail for GraphQL requests - let the resolver handle it
-                request.organization = None
+            # Resolved on first access, so requests that never read the
+            # tenant (static files, admin, health checks) skip the lookup.
+            # Unknown slugs resolve to None and the resolvers handle it.
+            request.organization = SimpleLazyObject(
+                lambda: resolve_organization(organization_slug)
+            )
         else:
             request.organization = None
 
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+    async def __acall__(self, request):
+        organization_slug = request.headers.get('X-Organization-Slug')
+        # Async code cannot run the ORM lazily from an attribute access, so
+        # the tenant is resolved up front, from the cache when possible.
+        request.organization = await aresolve_organization(organization_slug) if organization_slug else None
+        return await self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """
+    Runs each request in a ``ReplicaSession`` (see ``apps.core.routers``),
+    pinned to the primary while the client's sticky cookie is fresh, and
+    refreshes the cookie whenever the request writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'use_primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def pinned(self, request):
+        try:
+            return float(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with replica_session(self.pinned(request)) as session:
+            response = self.get_response(request)
+        return self.process_response(session, response)
+
+    async def __acall__(self, request):
+        with replica_session(self.pinned(request)) as session:
+            response = await self.get_response(request)
+        return self.process_response(session, response)
+
+    def process_response(self, session, response):
+        if session.wrote and get_replicas():
+            seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+            response.set_cookie(
+                self.cookie_name, str(time.time() + seconds), max_age=seconds, httponly=True, samesite='Lax'
+            )
+        return response
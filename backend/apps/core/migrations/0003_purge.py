@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Purge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('PROJECT', 'Project'), ('ORGANIZATION', 'Organization')], max_length=20)),
+                ('target_id', models.BigIntegerField()),
+                ('organization_id', models.BigIntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('comments_total', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('tasks_total', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('projects_total', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('comments_deleted', models.PositiveBigIntegerField(default=0)),
+                ('tasks_deleted', models.PositiveBigIntegerField(default=0)),
+                ('projects_deleted', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'purges',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='purges_status_195cd9_idx'), models.Index(fields=['organization_id', '-created_at'], name='purges_organiz_59cf6c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_project_archived_at'),
+        ('core', '0003_purge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectArchive',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive', serialize=False, to='projects.project')),
+                ('organization_id', models.BigIntegerField()),
+                ('min_task_id', models.BigIntegerField(blank=True, null=True)),
+                ('max_task_id', models.BigIntegerField(blank=True, null=True)),
+                ('task_count', models.PositiveIntegerField(default=0)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'project_archives',
+                'indexes': [models.Index(fields=['organization_id', 'min_task_id'], name='project_arc_organiz_3f7565_idx')],
+            },
+        ),
+    ]
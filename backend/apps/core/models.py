@@ -0,0 +1,190 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class PersistedQuery(models.Model):
+    """GraphQL document registered by a client under its sha256 hash."""
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    query = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'persisted_queries'
+
+    def __str__(self):
+        return self.sha256
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of a resumable bulk import, committed with each batch."""
+
+    key = models.CharField(max_length=255, primary_key=True)
+    organization = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        related_name='import_checkpoints'
+    )
+    resource = models.CharField(max_length=20)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    rows_imported = models.PositiveBigIntegerField(default=0)
+    rows_failed = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'import_checkpoints'
+
+    def __str__(self):
+        return f"{self.key} ({self.rows_processed} rows)"
+
+
+class Purge(models.Model):
+    """
+    Background deletion of a project, or of an organization with all its
+    projects, in bounded chunks (see ``apps.core.purge``).
+    """
+
+    PROJECT = 'PROJECT'
+    ORGANIZATION = 'ORGANIZATION'
+    KIND_CHOICES = [
+        (PROJECT, 'Project'),
+        (ORGANIZATION, 'Organization'),
+    ]
+
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    target_id = models.BigIntegerField()
+    # Plain ids: the rows they point at are what gets deleted.
+    organization_id = models.BigIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    # Counted when the purge starts.
+    comments_total = models.PositiveBigIntegerField(null=True, blank=True)
+    tasks_total = models.PositiveBigIntegerField(null=True, blank=True)
+    projects_total = models.PositiveBigIntegerField(null=True, blank=True)
+    comments_deleted = models.PositiveBigIntegerField(default=0)
+    tasks_deleted = models.PositiveBigIntegerField(default=0)
+    projects_deleted = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'purges'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+            models.Index(fields=['organization_id', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.target_id} ({self.status})"
+
+    @property
+    def progress(self):
+        """Share of rows deleted so far, from 0 to 1 (None until counted)."""
+        if self.status == self.DONE:
+            return 1.0
+        if self.tasks_total is None:
+            return None
+        total = self.comments_total + self.tasks_total + self.projects_total
+        if not total:
+            return 0.0
+        return round((self.comments_deleted + self.tasks_deleted + self.projects_deleted) / total, 4)
+
+
+class ProjectArchive(models.Model):
+    """
+    Tasks and comments of a project moved out of the live tables into one
+    compressed row (see ``apps.core.archive``).
+    """
+
+    project = models.OneToOneField(
+        'projects.Project',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='archive'
+    )
+    organization_id = models.BigIntegerField()
+    # Narrow the archives to open when looking up a single task.
+    min_task_id = models.BigIntegerField(null=True, blank=True)
+    max_task_id = models.BigIntegerField(null=True, blank=True)
+    task_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # zlib-compressed JSON, one list of values per row.
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'project_archives'
+        indexes = [
+            models.Index(fields=['organization_id', 'min_task_id']),
+        ]
+
+    def __str__(self):
+        return f"Archive of project {self.project_id} ({self.task_count} tasks)"
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_workers`` (see ``apps.core.queue``)."""
+
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    ACTIVE = (PENDING, RUNNING)
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # Plain id, like Purge: the job may outlive the organization.
+    organization_id = models.BigIntegerField(null=True, blank=True)
+    # At most one pending or running job per key.
+    key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['organization_id', '-created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='jobs_active_key_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
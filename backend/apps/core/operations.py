@@ -0,0 +1,106 @@
+"""
+Migration operations that change a large table without blocking writes.
+
+Each wraps the ``AlterField`` that records the change in the migration
+state. Other databases run that ``AlterField``; PostgreSQL runs statements
+that never hold an ``ACCESS EXCLUSIVE`` lock while the table is scanned,
+one transaction each, so the migration needs ``atomic = False``. Every
+step first drops what an interrupted run may have left behind.
+"""
+from django.db import migrations
+from django.db.migrations.operations.base import Operation
+
+
+class OnlineAlterField(Operation):
+    reversible = True
+
+    def __init__(self, alter_field, forwards, backwards):
+        self.alter_field = alter_field
+        self.forwards = forwards
+        self.backwards = backwards
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.alter_field, self.forwards, self.backwards], {}
+
+    def state_forwards(self, app_label, state):
+        self.alter_field.state_forwards(app_label, state)
+
+    def _run(self, statements, app_label, schema_editor, state):
+        model = state.apps.get_model(app_label, self.alter_field.model_name)
+        for statement in statements(model._meta.db_table, model._meta.get_field(self.alter_field.name)):
+            schema_editor.execute(statement)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            self.alter_field.database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            self._run(self.forwards, app_label, schema_editor, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            self.alter_field.database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            self._run(self.backwards, app_label, schema_editor, from_state)
+
+    def describe(self):
+        return f'{self.alter_field.describe()} without blocking writes'
+
+
+def add_index_concurrently(model_name, name, field):
+    """Index the column of ``field`` with ``CREATE INDEX CONCURRENTLY``."""
+    def forwards(table, field):
+        index = f'{table}_{field.column}_idx'
+        return [
+            # A failed concurrent build leaves an invalid index behind.
+            f'DROP INDEX CONCURRENTLY IF EXISTS {index}',
+            f'CREATE INDEX CONCURRENTLY {index} ON {table} ({field.column})',
+        ]
+
+    def backwards(table, field):
+        return [f'DROP INDEX CONCURRENTLY IF EXISTS {table}_{field.column}_idx']
+
+    return OnlineAlterField(migrations.AlterField(model_name, name, field), forwards, backwards)
+
+
+def add_foreign_key(model_name, name, field):
+    """
+    Add the foreign key constraint of ``field`` ``NOT VALID``, which only
+    checks new rows, then validate the existing ones under a lock that lets
+    writes through.
+    """
+    def forwards(table, field):
+        constraint = f'{table}_{field.column}_fk'
+        target = field.target_field
+        return [
+            f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}',
+            f'ALTER TABLE {table} ADD CONSTRAINT {constraint} FOREIGN KEY ({field.column}) '
+            f'REFERENCES {target.model._meta.db_table} ({target.column}) DEFERRABLE INITIALLY DEFERRED NOT VALID',
+            f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}',
+        ]
+
+    def backwards(table, field):
+        return [f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{field.column}_fk']
+
+    return OnlineAlterField(migrations.AlterField(model_name, name, field), forwards, backwards)
+
+
+def set_not_null(model_name, name, field):
+    """
+    Make the column of ``field`` ``NOT NULL``. A validated ``CHECK`` proves
+    it first, so PostgreSQL (12 and later) skips its own full-table scan
+    under ``ACCESS EXCLUSIVE``; the check is dropped afterwards.
+    """
+    def forwards(table, field):
+        constraint = f'{table}_{field.column}_not_null'
+        return [
+            f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}',
+            f'ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({field.column} IS NOT NULL) NOT VALID',
+            f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}',
+            f'ALTER TABLE {table} ALTER COLUMN {field.column} SET NOT NULL',
+            f'ALTER TABLE {table} DROP CONSTRAINT {constraint}',
+        ]
+
+    def backwards(table, field):
+        return [f'ALTER TABLE {table} ALTER COLUMN {field.column} DROP NOT NULL']
+
+    return OnlineAlterField(migrations.AlterField(model_name, name, field), forwards, backwards)
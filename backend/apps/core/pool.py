@@ -0,0 +1,226 @@
+"""
+A bounded, thread-safe pool of database connections.
+
+Each process keeps one pool per database (see
+``apps.core.backends.postgresql``). Django threads check a connection out
+when they first need one and hand it back when Django closes it, which with
+``CONN_MAX_AGE = 0`` is at the end of every request, for WSGI and ASGI
+alike. When all ``max_size`` connections are checked out, ``acquire`` waits
+up to ``timeout`` seconds for one to come back and then raises
+``PoolTimeout``.
+
+Idle connections are checked with a cheap query before reuse once they have
+been idle for ``check_interval`` seconds, closed after ``max_idle`` seconds
+of idleness (down to ``min_size``), and replaced after ``max_lifetime``.
+"""
+import threading
+import time
+from collections import deque
+from apps.core.metrics import registry
+
+connections_gauge = registry.gauge(
+    'db_pool_connections', 'Open pooled database connections by state.', ('database', 'state')
+)
+max_size_gauge = registry.gauge('db_pool_max_size', 'Largest size a connection pool may grow to.', ('database',))
+checkouts_total = registry.counter('db_pool_checkouts_total', 'Connections checked out of the pool.', ('database',))
+timeouts_total = registry.counter(
+    'db_pool_timeouts_total', 'Checkouts that gave up waiting for a connection.', ('database',)
+)
+opened_total = registry.counter('db_pool_connections_opened_total', 'Database connections opened.', ('database',))
+closed_total = registry.counter(
+    'db_pool_connections_closed_total', 'Pooled connections closed, by reason.', ('database', 'reason')
+)
+wait_seconds = registry.histogram(
+    'db_pool_wait_seconds', 'Time spent waiting to check out a connection.', ('database',),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+_TIMED_OUT = object()
+
+
+class ConnectionPool:
+    def __init__(
+        self, name, connect, close, check=None, min_size=0, max_size=10, timeout=10.0,
+        check_interval=30.0, max_idle=600.0, max_lifetime=3600.0, timer=time.monotonic,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError(f'Invalid pool size {min_size}..{max_size}')
+        self.name = name
+        self._connect = connect
+        self._close = close
+        self._check = check
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._timer = timer
+        # (connection, opened_at, idle_since), most recently returned last.
+        self._idle = deque()
+        self._opened = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        max_size_gauge.set(max_size, name)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            }
+
+    def _report(self):
+        connections_gauge.set(len(self._idle), self.name, 'idle')
+        connections_gauge.set(self._size - len(self._idle), self.name, 'in_use')
+
+    def _open(self):
+        connection = self._connect()
+        opened_total.inc(self.name)
+        return connection
+
+    def _discard(self, connection, reason):
+        closed_total.inc(self.name, reason)
+        try:
+            self._close(connection)
+        except Exception:
+            pass
+
+    def _expired(self, opened_at, idle_since, now):
+        if now - opened_at >= self.max_lifetime:
+            return 'lifetime'
+        if now - idle_since >= self.max_idle and self._size > self.min_size:
+            return 'idle'
+        return None
+
+    def acquire(self, timeout=None):
+        """Check out a connection, opening one if the pool has room."""
+        timeout = self.timeout if timeout is None else timeout
+        started = self._timer()
+        while True:
+            connection, idle_since, stale = self._take(started + timeout)
+            for entry, reason in stale:
+                self._discard(entry, reason)
+            if connection is _TIMED_OUT:
+                timeouts_total.inc(self.name)
+                raise PoolTimeout(
+                    f'No connection available in pool {self.name!r} within {timeout}s '
+                    f'({self.max_size} in use)'
+                )
+
+            if connection is None:
+                wait_seconds.observe(self._timer() - started, self.name)
+                try:
+                    connection = self._open()
+                except BaseException:
+                    self._forget(None)
+                    raise
+            elif self._check and self._timer() - idle_since >= self.check_interval and not self._check(connection):
+                self._forget(connection)
+                self._discard(connection, 'broken')
+                continue
+            else:
+                wait_seconds.observe(self._timer() - started, self.name)
+
+            with self._condition:
+                self._opened.setdefault(id(connection), self._timer())
+            checkouts_total.inc(self.name)
+            return connection
+
+    def _take(self, deadline):
+        """
+        An idle connection, None with room reserved for a new one, or
+        ``_TIMED_OUT``; plus the expired idle connections to close.
+        """
+        stale = []
+        with self._condition:
+            while True:
+                now = self._timer()
+                # Close the longest idle connections first.
+                while self._idle and self._expired(*self._idle[0][1:], now) == 'idle':
+                    connection = self._idle.popleft()[0]
+                    self._size -= 1
+                    self._opened.pop(id(connection), None)
+                    stale.append((connection, 'idle'))
+                while self._idle:
+                    connection, opened_at, idle_since = self._idle.pop()
+                    reason = self._expired(opened_at, idle_since, now)
+                    if reason is None:
+                        self._report()
+                        return connection, idle_since, stale
+                    self._size -= 1
+                    self._opened.pop(id(connection), None)
+                    stale.append((connection, reason))
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._report()
+                    return None, now, stale
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._report()
+                    return _TIMED_OUT, None, stale
+                self._condition.wait(remaining)
+
+    def _forget(self, connection):
+        """Give up a reserved or checked out slot without returning a connection."""
+        with self._condition:
+            if connection is not None:
+                self._opened.pop(id(connection), None)
+            self._size -= 1
+            self._report()
+            self._condition.notify()
+
+    def release(self, connection, discard=False):
+        """Return a connection; ``discard`` closes it instead of reusing it."""
+        now = self._timer()
+        with self._condition:
+            opened_at = self._opened.get(id(connection), now)
+            if discard or now - opened_at >= self.max_lifetime:
+                self._opened.pop(id(connection), None)
+                self._size -= 1
+                reason = 'discarded' if discard else 'lifetime'
+            else:
+                self._idle.append((connection, opened_at, now))
+                reason = None
+            self._report()
+            self._condition.notify()
+        if reason:
+            self._discard(connection, reason)
+
+    def fill(self):
+        """Open connections until ``min_size`` are open."""
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self._open()
+            except BaseException:
+                self._forget(None)
+                raise
+            with self._condition:
+                now = self._timer()
+                self._opened[id(connection)] = now
+                self._idle.appendleft((connection, now, now))
+                self._report()
+                self._condition.notify()
+
+    def close(self):
+        """Close the idle connections."""
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            for connection, _, _ in idle:
+                self._opened.pop(id(connection), None)
+            self._report()
+        for connection, _, _ in idle:
+            self._discard(connection, 'closed')
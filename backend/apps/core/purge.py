@@ -0,0 +1,237 @@
+"""
+Background deletion of projects and organizations.
+
+Deleting a project through Django loads every task and comment to cascade
+and removes them in one long transaction. Instead, ``delete_project`` only
+hides the project (``deleting_at``), takes it out of the organization's
+counters and records a ``Purge``; ``delete_organization`` deactivates the
+organization and does the same for all of it. Both return at once.
+
+The purger then removes the comments, the tasks and finally the project
+with set-based ``DELETE ... WHERE id IN (SELECT ... LIMIT n)`` statements,
+``PURGE_BATCH_SIZE`` rows per transaction, pausing ``PURGE_PAUSE`` seconds
+between batches so other writers get the locks and replicas keep up. Each
+batch commits its progress on the ``Purge`` row, so an interrupted purge
+picks up where it stopped.
+
+Purges run in a background thread of the process that scheduled them
+(``PURGE_IN_BACKGROUND``), or else as ``run_purge`` jobs for
+``manage.py run_workers``. ``manage.py purge_deleted`` (and the periodic
+``purge_deleted`` job) runs whatever is left, including purges whose process
+died mid-way.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+from . import counters, queue
+from .models import ProjectArchive, Purge
+
+logger = logging.getLogger(__name__)
+
+# A running purge not updated for this long is taken to be abandoned.
+STALE_AFTER = timedelta(minutes=5)
+
+
+def get_batch_size():
+    return getattr(settings, 'PURGE_BATCH_SIZE', 1000)
+
+
+def get_pause():
+    return getattr(settings, 'PURGE_PAUSE', 0.05)
+
+
+def delete_project(project):
+    """Hide ``project`` and schedule its purge. Returns the ``Purge``."""
+    with transaction.atomic():
+        counts = (
+            Project.objects.select_for_update()
+            .filter(pk=project.pk)
+            .values_list(*Project.TASK_COUNTER_FIELDS.values())
+            .first()
+        )
+        if counts is None:
+            # Already being purged (or gone).
+            return Purge.objects.filter(kind=Purge.PROJECT, target_id=project.pk).last()
+        Project.all_objects.filter(pk=project.pk).update(deleting_at=timezone.now())
+        counters.project_removed(project, sum(counts))
+        purge = Purge.objects.create(
+            kind=Purge.PROJECT, target_id=project.pk, organization_id=project.organization_id
+        )
+        _start(purge)
+    return purge
+
+
+def delete_organization(organization):
+    """Deactivate ``organization`` and schedule the purge of all its data."""
+    with transaction.atomic():
+        organization.is_active = False
+        organization.save(update_fields=['is_active', 'updated_at'])
+        Project.all_objects.filter(organization=organization, deleting_at__isnull=True).update(
+            deleting_at=timezone.now()
+        )
+        purge = Purge.objects.create(
+            kind=Purge.ORGANIZATION, target_id=organization.pk, organization_id=organization.pk
+        )
+        _start(purge)
+    return purge
+
+
+def _start(purge):
+    if getattr(settings, 'PURGE_IN_BACKGROUND', True):
+        transaction.on_commit(purger.wake)
+    else:
+        # Queued in the same transaction as the purge itself.
+        queue.enqueue(
+            'run_purge', {'purge_id': purge.pk}, key=f'purge:{purge.pk}', organization_id=purge.organization_id
+        )
+
+
+def delete_batch(queryset, limit, organization_id):
+    """Delete up to ``limit`` rows of ``queryset`` in one statement."""
+    model = queryset.model
+    select, params = queryset.order_by().values('pk')[:limit].query.sql_with_params()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        # The organization_id condition confines the DELETE to one partition.
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE organization_id = %s AND {quote(model._meta.pk.column)} IN ({select})',
+            (organization_id, *params),
+        )
+        return cursor.rowcount
+
+
+def _project_ids(purge):
+    if purge.kind == Purge.PROJECT:
+        return [purge.target_id]
+    return list(Project.all_objects.filter(organization_id=purge.target_id).order_by('pk').values_list('pk', flat=True))
+
+
+def _count(purge, project_ids):
+    tasks = Task.objects.filter(organization_id=purge.organization_id, project_id__in=project_ids)
+    purge.projects_total = len(project_ids)
+    purge.tasks_total = tasks.count()
+    # The stored counters spare a join over every comment.
+    purge.comments_total = tasks.aggregate(total=Sum('comment_count'))['total'] or 0
+    Purge.objects.filter(pk=purge.pk).update(
+        projects_total=purge.projects_total,
+        tasks_total=purge.tasks_total,
+        comments_total=purge.comments_total,
+    )
+
+
+def _drain(purge, queryset, field, batch_size, pause):
+    while True:
+        with transaction.atomic():
+            deleted = delete_batch(queryset, batch_size, purge.organization_id)
+            if deleted:
+                Purge.objects.filter(pk=purge.pk).update(
+                    **{field: F(field) + deleted}, updated_at=timezone.now()
+                )
+        if not deleted:
+            return
+        setattr(purge, field, getattr(purge, field) + deleted)
+        if deleted < batch_size:
+            return
+        time.sleep(pause)
+
+
+def run(purge, batch_size=None, pause=None):
+    """Carry out a claimed purge to the end."""
+    batch_size = batch_size or get_batch_size()
+    pause = get_pause() if pause is None else pause
+    project_ids = _project_ids(purge)
+    if purge.tasks_total is None:
+        _count(purge, project_ids)
+
+    organization_id = purge.organization_id
+    for project_id in project_ids:
+        comments = TaskComment.objects.filter(
+            organization_id=organization_id, task__organization_id=organization_id, task__project_id=project_id
+        )
+        _drain(purge, comments, 'comments_deleted', batch_size, pause)
+        tasks = Task.objects.filter(organization_id=organization_id, project_id=project_id)
+        _drain(purge, tasks, 'tasks_deleted', batch_size, pause)
+        ProjectArchive.objects.filter(pk=project_id).delete()
+        _drain(purge, Project.all_objects.filter(pk=project_id), 'projects_deleted', batch_size, pause)
+
+    with transaction.atomic():
+        if purge.kind == Purge.ORGANIZATION:
+            # What is left (stats, import checkpoints) is small.
+            Organization.objects.filter(pk=purge.target_id).delete()
+        Purge.objects.filter(pk=purge.pk).update(status=Purge.DONE, completed_at=timezone.now())
+    purge.status = Purge.DONE
+
+
+def claim_next(purges=None):
+    """Take the oldest pending (or abandoned) purge of ``purges``, or return None."""
+    stale = timezone.now() - STALE_AFTER
+    candidates = (Purge.objects.all() if purges is None else purges).filter(
+        Q(status=Purge.PENDING) | Q(status=Purge.RUNNING, updated_at__lt=stale)
+    )
+    for purge in candidates.order_by('created_at')[:10]:
+        claimed = Purge.objects.filter(pk=purge.pk, status=purge.status, updated_at=purge.updated_at).update(
+            status=Purge.RUNNING, updated_at=timezone.now()
+        )
+        if claimed:
+            purge.status = Purge.RUNNING
+            return purge
+    return None
+
+
+def run_pending(batch_size=None, pause=None):
+    """Run purges until none are left. Returns how many were completed."""
+    completed = 0
+    while True:
+        purge = claim_next()
+        if purge is None:
+            return completed
+        try:
+            run(purge, batch_size, pause)
+            completed += 1
+        except Exception as e:
+            logger.exception('Purge %s failed', purge.pk)
+            fail(purge, e)
+
+
+def fail(purge, error):
+    Purge.objects.filter(pk=purge.pk).update(status=Purge.FAILED, error=str(error))
+    purge.status = Purge.FAILED
+
+
+class Purger:
+    """Runs pending purges on a daemon thread, started on demand."""
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='purger', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                run_pending()
+            except Exception:
+                logger.exception('Purger failed')
+            finally:
+                close_old_connections()
+
+
+purger = Purger()
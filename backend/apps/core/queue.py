@@ -0,0 +1,262 @@
+"""
+Database-backed background jobs.
+
+Functions registered with ``@job`` (in an app's ``jobs`` module, imported
+when Django starts) are queued with ``enqueue``, which inserts a ``Job``
+row. Enqueuing inside a transaction therefore commits or rolls back with
+the rest of it. ``manage.py run_workers`` runs them: each worker thread
+claims the oldest due job with ``SELECT ... FOR UPDATE SKIP LOCKED``, so
+workers never wait on each other's rows, and marks it running with a
+conditional update, which is what keeps two workers apart on databases
+without row locks (SQLite).
+
+A job that raises is retried after ``JOB_RETRY_BACKOFF`` seconds, doubling
+with each attempt up to ``JOB_RETRY_MAX_DELAY``, until it has been tried
+``max_attempts`` times. Jobs can be scheduled (``run_at`` or ``delay``),
+deduplicated (``key``: at most one pending or running job per key), and
+registered with ``every`` to run periodically: workers queue one run of
+each on start, and each run queues the next when it finishes. Workers
+refresh ``locked_at`` on the jobs they hold; a running job not refreshed
+for ``STALE_AFTER`` belongs to a dead worker and is claimed again.
+"""
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = timedelta(minutes=5)
+HEARTBEAT_INTERVAL = 30
+
+
+class Task:
+    """A function registered with ``@job``."""
+
+    def __init__(self, name, function, max_attempts=3, backoff=None, every=None):
+        self.name = name
+        self.function = function
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.every = every
+
+
+registry = {}
+
+
+def job(name=None, max_attempts=3, backoff=None, every=None):
+    """
+    Register the decorated function as a job. ``backoff`` overrides
+    ``JOB_RETRY_BACKOFF``; ``every`` (a timedelta) makes it periodic.
+    Arguments and return values go through JSON.
+    """
+    def register(function):
+        task_name = name or function.__name__
+        if task_name in registry and registry[task_name].function is not function:
+            raise ValueError(f'Job {task_name!r} is already registered')
+        registry[task_name] = Task(task_name, function, max_attempts, backoff, every)
+        return function
+    return register
+
+
+def get_concurrency():
+    return getattr(settings, 'JOB_WORKER_CONCURRENCY', 4)
+
+
+def get_poll_interval():
+    return getattr(settings, 'JOB_POLL_INTERVAL', 1.0)
+
+
+def retry_delay(attempts, backoff=None):
+    """Seconds before the next try of a job that failed ``attempts`` times."""
+    base = getattr(settings, 'JOB_RETRY_BACKOFF', 10) if backoff is None else backoff
+    delay = min(base * 2 ** (attempts - 1), getattr(settings, 'JOB_RETRY_MAX_DELAY', 3600))
+    # Spread out the retries of jobs that failed together.
+    return delay * random.uniform(1, 1.25)
+
+
+def enqueue(name, kwargs=None, run_at=None, delay=None, key=None, organization_id=None):
+    """
+    Queue the job registered as ``name``, to run with ``kwargs`` at
+    ``run_at`` or in ``delay`` seconds (default: now). With a ``key`` that
+    a pending or running job already has, that job is returned instead.
+    """
+    task = registry.get(name)
+    if task is None:
+        raise ValueError(f'Unknown job {name!r}')
+    if run_at is None:
+        run_at = timezone.now() + timedelta(seconds=delay or 0)
+    fields = dict(
+        name=name, kwargs=kwargs or {}, run_at=run_at, key=key,
+        organization_id=organization_id, max_attempts=task.max_attempts,
+    )
+    if key is None:
+        return Job.objects.create(**fields)
+    for _ in range(3):
+        try:
+            with transaction.atomic():
+                return Job.objects.create(**fields)
+        except IntegrityError:
+            existing = Job.objects.filter(key=key, status__in=Job.ACTIVE).first()
+            if existing is not None:
+                return existing
+            # It finished in between.
+    raise IntegrityError(f'Could not queue job with key {key!r}')
+
+
+def schedule_periodic():
+    """Make sure every periodic job has a run queued."""
+    for task in registry.values():
+        if task.every:
+            enqueue(task.name, key=f'periodic:{task.name}')
+
+
+def claim(worker):
+    """Take the oldest due job for ``worker`` and mark it running, or return None."""
+    while True:
+        now = timezone.now()
+        due = Job.objects.filter(
+            Q(status=Job.PENDING, run_at__lte=now) | Q(status=Job.RUNNING, locked_at__lt=now - STALE_AFTER)
+        )
+        with transaction.atomic():
+            # select_for_update is ignored where the database has no row locks.
+            job = due.select_for_update(skip_locked=True).order_by('run_at', 'pk').first()
+            if job is None:
+                return None
+            claimed = Job.objects.filter(
+                pk=job.pk, status=job.status, attempts=job.attempts, locked_at=job.locked_at
+            ).update(status=Job.RUNNING, attempts=job.attempts + 1, locked_by=worker, locked_at=now)
+        if not claimed:
+            continue
+        abandoned = job.status == Job.RUNNING
+        job.status, job.attempts, job.locked_by, job.locked_at = Job.RUNNING, job.attempts + 1, worker, now
+        if abandoned and job.attempts > job.max_attempts:
+            _finish(job, Job.FAILED, error='The worker running it stopped responding')
+            continue
+        return job
+
+
+def _finish(job, status, **fields):
+    """Record the outcome of ``job``, unless another worker has claimed it since."""
+    now = timezone.now()
+    if status != Job.PENDING:
+        fields['completed_at'] = now
+    with transaction.atomic():
+        updated = Job.objects.filter(pk=job.pk, locked_by=job.locked_by, attempts=job.attempts).update(
+            status=status, updated_at=now, **fields
+        )
+        job.status = status
+        task = registry.get(job.name)
+        if updated and status != Job.PENDING and task and task.every:
+            enqueue(task.name, run_at=now + task.every, key=f'periodic:{task.name}')
+
+
+def execute(job):
+    """Run a claimed job and record its result, or schedule its retry."""
+    task = registry.get(job.name)
+    try:
+        if task is None:
+            raise LookupError(f'Unknown job {job.name!r}')
+        result = task.function(**job.kwargs)
+    except Exception as e:
+        logger.exception('Job %s (%s) failed', job.pk, job.name)
+        error = f'{type(e).__name__}: {e}'
+        if task is not None and job.attempts < job.max_attempts:
+            run_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts, task.backoff))
+            _finish(job, Job.PENDING, error=error, run_at=run_at)
+        else:
+            _finish(job, Job.FAILED, error=error)
+    else:
+        _finish(job, Job.DONE, result=result, error='')
+
+
+def run_pending(worker='inline'):
+    """Run due jobs in this thread until none are left. Returns how many were run."""
+    count = 0
+    while (job := claim(worker)) is not None:
+        execute(job)
+        count += 1
+    return count
+
+
+class Worker:
+    """
+    Runs jobs on ``concurrency`` threads until stopped. The calling thread
+    is one of them. With ``burst`` each thread stops once nothing is due.
+    """
+
+    def __init__(self, concurrency=None, poll_interval=None, burst=False, name=None):
+        self.concurrency = max(concurrency or get_concurrency(), 1)
+        self.poll_interval = get_poll_interval() if poll_interval is None else poll_interval
+        self.burst = burst
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.processed = 0
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._holding = {}
+
+    def stop(self, *args):
+        self._stopping.set()
+
+    def run(self):
+        schedule_periodic()
+        threads = [
+            threading.Thread(target=self._work, args=(f'{self.name}-{i}',), name=f'job-worker-{i}', daemon=True)
+            for i in range(1, self.concurrency)
+        ]
+        threads.append(threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True))
+        for thread in threads:
+            thread.start()
+        self._work(f'{self.name}-0')
+        for thread in threads[:-1]:
+            thread.join()
+        self._stopping.set()
+        return self.processed
+
+    def _work(self, worker):
+        try:
+            while not self._stopping.is_set():
+                job = claim(worker)
+                if job is None:
+                    if self.burst:
+                        return
+                    self._stopping.wait(self.poll_interval)
+                    continue
+                with self._lock:
+                    self._holding[job.pk] = worker
+                try:
+                    execute(job)
+                except Exception:
+                    # Recording the outcome failed; the job is claimed again once stale.
+                    logger.exception('Worker %s failed on job %s', worker, job.pk)
+                finally:
+                    with self._lock:
+                        del self._holding[job.pk]
+                        self.processed += 1
+                    close_old_connections()
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    def _heartbeat(self):
+        try:
+            while not self._stopping.wait(HEARTBEAT_INTERVAL):
+                with self._lock:
+                    holding = dict(self._holding)
+                for pk, worker in holding.items():
+                    Job.objects.filter(pk=pk, locked_by=worker, status=Job.RUNNING).update(locked_at=timezone.now())
+                close_old_connections()
+        finally:
+            connection.close()
+
+    def handle_signals(self):
+        """Stop after the current jobs on SIGINT and SIGTERM. Returns the previous handlers."""
+        return {sig: signal.signal(sig, self.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
@@ -0,0 +1,134 @@
+"""
+Per-tenant cache of read-only GraphQL responses.
+
+Entries are keyed on (organization, document hash, variables, operation
+name) plus the organization's current version. Each mutation for a tenant
+bumps that version, so older entries are never read again and age out of
+the backend. Any Django cache backend works; ``GRAPHQL_RESPONSE_CACHE``
+picks the alias (see ``CACHES`` in settings for the local-memory, file and
+database variants).
+
+The versions are kept under ``VERSION_ALIAS`` (default: ``ALIAS``). Entries
+may stay in each process's memory, but the versions must be shared by every
+process serving GraphQL: a bump only one worker sees would leave the others
+serving stale entries. ``check_version_cache`` warns when they are not.
+"""
+import hashlib
+import json
+import threading
+import time
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from .routers import untracked_writes
+
+DEFAULTS = {
+    'ALIAS': 'graphql',
+    'VERSION_ALIAS': None,
+    'TIMEOUT': 300,
+}
+
+GLOBAL_SCOPE = 'global'
+
+
+def get_cache_settings():
+    options = dict(DEFAULTS)
+    options.update(getattr(settings, 'GRAPHQL_RESPONSE_CACHE', {}))
+    return options
+
+
+def get_version_alias():
+    options = get_cache_settings()
+    return options['VERSION_ALIAS'] or options['ALIAS']
+
+
+def check_version_cache(app_configs=None, **kwargs):
+    """System check: the response cache versions must not live in process memory."""
+    alias = get_version_alias()
+    if isinstance(caches[alias], LocMemCache):
+        return [checks.Warning(
+            f'The GraphQL response cache versions are kept in a local-memory cache ({alias!r})',
+            hint='With more than one process, a mutation only invalidates the responses cached by its own. '
+                 'Set GRAPHQL_RESPONSE_CACHE_VERSIONS to file or db.',
+            id='core.W001',
+        )]
+    return []
+
+
+class ResponseCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+
+    @property
+    def backend(self):
+        return caches[get_cache_settings()['ALIAS']]
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for stat in self.stats:
+                self.stats[stat] = 0
+
+    @property
+    def versions(self):
+        return caches[get_version_alias()]
+
+    def _version_key(self, scope):
+        return f'gql:version:{scope}'
+
+    def version(self, scope):
+        key = self._version_key(scope)
+        # Filling in a version is no reason to pin the client to the primary.
+        with untracked_writes():
+            version = self.versions.get(key)
+            if version is None:
+                # Start from the clock so a counter lost to eviction can never
+                # fall back to a version whose entries are still stored.
+                self.versions.add(key, time.time_ns(), timeout=None)
+                version = self.versions.get(key)
+        return version
+
+    def bump(self, scope):
+        self._count('invalidations')
+        try:
+            self.versions.incr(self._version_key(scope))
+        except ValueError:
+            self.versions.set(self._version_key(scope), time.time_ns(), timeout=None)
+
+    def key(self, organization_id, document_hash, variables, operation_name):
+        variables_hash = hashlib.sha256(
+            json.dumps(variables or {}, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return ':'.join([
+            'gql:response',
+            str(organization_id),
+            str(self.version(organization_id)),
+            str(self.version(GLOBAL_SCOPE)),
+            document_hash,
+            variables_hash,
+            operation_name or '',
+        ])
+
+    def get(self, key):
+        value = self.backend.get(key)
+        self._count('misses' if value is None else 'hits')
+        return value
+
+    def set(self, key, value, timeout=None):
+        self._count('stores')
+        self.backend.set(key, value, timeout=timeout or get_cache_settings()['TIMEOUT'])
+
+
+response_cache = ResponseCache()
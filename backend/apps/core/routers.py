@@ -0,0 +1,139 @@
+"""
+Read replica routing.
+
+Writes always go to the primary (``default``). Reads go to one of
+``DATABASE_REPLICAS`` only inside ``read_from_replicas()``, which the
+GraphQL views enter for query operations and ``ReplicaChangeListMixin``
+enters for admin list pages; everything else reads from the primary.
+
+Replicas lag behind the primary, so a client that has just written keeps
+reading from the primary: once a request runs an ``INSERT``, ``UPDATE`` or
+``DELETE`` (seen by ``record_writes`` on the primary's connections), the rest
+of it stays on the primary, and ``apps.core.middleware.ReplicaMiddleware`` sets a cookie that
+pins the client's requests to the primary for ``REPLICA_STICKY_SECONDS``. A
+request picks one replica and uses it throughout, so its reads never go back
+in time.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_reading_from_replicas = ContextVar('reading_from_replicas', default=False)
+_session = ContextVar('replica_session', default=None)
+_tracking_writes = ContextVar('tracking_writes', default=True)
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+class ReplicaSession:
+    """Routing state of one request."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+    def db_for_read(self):
+        if self.pinned or self.wrote:
+            return DEFAULT_DB_ALIAS
+        if self.replica is None:
+            replicas = get_replicas()
+            self.replica = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+        return self.replica
+
+    @property
+    def used_replica(self):
+        return self.replica not in (None, DEFAULT_DB_ALIAS)
+
+
+@contextmanager
+def replica_session(pinned=False):
+    session = ReplicaSession(pinned)
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
+
+
+@contextmanager
+def read_from_replicas(enabled=True):
+    """Let reads in the block go to a replica; yields the request's session."""
+    if not enabled:
+        yield None
+        return
+    session = _session.get()
+    session_token = None
+    if session is None:
+        session = ReplicaSession()
+        session_token = _session.set(session)
+    token = _reading_from_replicas.set(True)
+    try:
+        yield session
+    finally:
+        _reading_from_replicas.reset(token)
+        if session_token is not None:
+            _session.reset(session_token)
+
+
+@contextmanager
+def untracked_writes():
+    """Writes in the block, such as filling a cache row, do not pin the client to the primary."""
+    token = _tracking_writes.set(False)
+    try:
+        yield
+    finally:
+        _tracking_writes.reset(token)
+
+
+def _record_write(execute, sql, params, many, context):
+    session = _session.get()
+    if (
+        session is not None and not session.wrote and _tracking_writes.get()
+        and sql.lstrip()[:6].upper() in WRITE_STATEMENTS
+    ):
+        session.wrote = True
+    return execute(sql, params, many, context)
+
+
+def record_writes(sender, connection, **kwargs):
+    """``connection_created`` receiver marking the request's session when the primary is written to."""
+    if connection.alias == DEFAULT_DB_ALIAS and _record_write not in connection.execute_wrappers:
+        # First, so execute_wrapper() blocks, which pop the last one, leave it in place.
+        connection.execute_wrappers.insert(0, _record_write)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        session = _session.get()
+        # Database cache rows (such as the response cache versions) must not lag.
+        if session is None or not _reading_from_replicas.get() or model._meta.app_label == 'django_cache':
+            return DEFAULT_DB_ALIAS
+        return session.db_for_read()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaChangeListMixin:
+    """``ModelAdmin`` mixin serving list pages (not their bulk actions) from a replica."""
+
+    def changelist_view(self, request, extra_context=None):
+        with read_from_replicas(request.method == 'GET'):
+            response = super().changelist_view(request, extra_context)
+            # Render here so the template's queries use the replica too.
+            if hasattr(response, 'render'):
+                response.render()
+            return response
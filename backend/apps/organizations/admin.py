@@ -1,11 +1,21 @@
 from django.contrib import admin
+from apps.core import purge
+from apps.core.routers import ReplicaChangeListMixin
 from .models import Organization
 
 
 @admin.register(Organization)
-class OrganizationAdmin(admin.ModelAdmin):
+class OrganizationAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['name', 'slug', 'contact_email', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'contact_email']
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['created_at', 'updated_at']
+
+    def delete_model(self, request, obj):
+        purge.delete_organization(obj)
+
+    def delete_queryset(self, request, queryset):
+        # Deactivated now, purged in the background.
+        for obj in queryset:
+            purge.delete_organization(obj)
@@ -0,0 +1,21 @@
+from datetime import timedelta
+from django.db.models import F
+from apps.core.queue import job
+from .models import OrganizationStats
+from .sample_data import generate
+from .stats import get_stats
+
+
+@job(every=timedelta(minutes=1))
+def refresh_stats():
+    """Recompute stale dashboard rollups, so reads rarely have to."""
+    stale = OrganizationStats.objects.exclude(computed_generation=F('generation'))
+    organization_ids = list(stale.values_list('organization_id', flat=True))
+    for organization_id in organization_ids:
+        get_stats(organization_id)
+    return {'refreshed': len(organization_ids)}
+
+
+@job(max_attempts=1)
+def create_sample_data(**options):
+    return generate(**options)
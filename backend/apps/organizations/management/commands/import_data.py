@@ -0,0 +1,68 @@
+import os
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from apps.organizations.models import Organization
+from apps.tasks.importer import FORMATS, IMPORTERS, ImportFormatError, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream tasks or comments from a CSV or NDJSON file into an organization'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='File to import, or - for standard input')
+        parser.add_argument('--organization', required=True, metavar='SLUG')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Input format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            metavar='KEY',
+            help='Record progress under KEY; rerunning with the same key resumes',
+        )
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default: IMPORT_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(slug=options['organization'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Unknown organization slug: {options["organization"]}')
+
+        path = options['path']
+        format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if format not in FORMATS:
+            raise CommandError('Pass --format when the file extension is not .csv or .ndjson')
+
+        importer = IMPORTERS[options['resource']](
+            organization,
+            checkpoint_key=options['checkpoint'],
+            batch_size=options['batch_size'],
+            progress=self.report_progress,
+        )
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            report = importer.run(read_rows(stream, format))
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in report['errors']:
+            self.stderr.write(f'Row {error["line"]}: {error["message"]}')
+        if report['skipped']:
+            self.stdout.write(f'Resumed after {report["skipped"]} rows already imported')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {report["imported"]} {options["resource"]} '
+                f'({report["failed"]} rejected) in {report["elapsed"]}s, '
+                f'{report["rows_per_second"]} rows/s'
+            )
+        )
+
+    def report_progress(self, report):
+        self.stdout.write(
+            f'{report["imported"] + report["failed"]} rows, {report["rows_per_second"]} rows/s'
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.core import counters
+from apps.organizations.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored project, task and comment counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            action='append',
+            dest='organizations',
+            metavar='SLUG',
+            help='Only reconcile this organization (may be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        organization_ids = None
+        if options['organizations']:
+            slugs = options['organizations']
+            organization_ids = list(
+                Organization.objects.filter(slug__in=slugs).values_list('id', flat=True)
+            )
+            if len(organization_ids) != len(set(slugs)):
+                raise CommandError('Unknown organization slug in: ' + ', '.join(slugs))
+
+        with transaction.atomic():
+            updated = counters.reconcile(organization_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Reconciled counters:\n'
+                f'- {updated["organizations"]} organizations\n'
+                f'- {updated["projects"]} projects\n'
+                f'- {updated["tasks"]} tasks'
+            )
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationStats',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='organizations.organization')),
+                ('total_projects', models.PositiveIntegerField(default=0)),
+                ('active_projects', models.PositiveIntegerField(default=0)),
+                ('completed_projects', models.PositiveIntegerField(default=0)),
+                ('total_tasks', models.PositiveIntegerField(default=0)),
+                ('completed_tasks', models.PositiveIntegerField(default=0)),
+                ('generation', models.PositiveIntegerField(default=1)),
+                ('computed_generation', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'organization_stats',
+            },
+        ),
+    ]
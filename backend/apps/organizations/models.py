@@ -10,6 +10,8 @@ class Organization(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    project_count = models.PositiveIntegerField(default=0, editable=False)
+    task_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         db_table = 'organizations'
@@ -20,17 +22,54 @@ class Organization(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        from apps.core.middleware import invalidate_organization
+        from apps.core.response_cache import GLOBAL_SCOPE, response_cache
+
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+        invalidate_organization(self)
+        # Organization fields are readable from every tenant.
+        response_cache.bump(GLOBAL_SCOPE)
+
+    def delete(self, *args, **kwargs):
+        from apps.core.middleware import invalidate_organization
+        from apps.core.response_cache import GLOBAL_SCOPE, response_cache
+
+        result = super().delete(*args, **kwargs)
+        invalidate_organization(self)
+        response_cache.bump(GLOBAL_SCOPE)
+        return result
 
     def __str__(self):
         return self.name
 
-    @property
-    def project_count(self):
-        return self.projects.count()
+
+class OrganizationStats(models.Model):
+    """Stored dashboard rollup; stale whenever ``computed_generation`` lags."""
+
+    organization = models.OneToOneField(
+        Organization,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    total_projects = models.PositiveIntegerField(default=0)
+    active_projects = models.PositiveIntegerField(default=0)
+    completed_projects = models.PositiveIntegerField(default=0)
+    total_tasks = models.PositiveIntegerField(default=0)
+    completed_tasks = models.PositiveIntegerField(default=0)
+    generation = models.PositiveIntegerField(default=1)
+    computed_generation = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'organization_stats'
+
+    def __str__(self):
+        return f"Stats for {self.organization_id}"
 
     @property
-    def task_count(self):
-        return sum(project.tasks.count() for project in self.projects.all())
\ No newline at end of file
+    def completion_rate(self):
+        if self.total_tasks == 0:
+            return 0
+        return round((self.completed_tasks / self.total_tasks) * 100, 2)
\ No newline at end of file
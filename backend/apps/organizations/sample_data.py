@@ -0,0 +1,256 @@
+"""
+Synthetic tenant data at any scale.
+
+``generate`` creates organizations with projects, tasks and comments whose
+shape resembles production: task counts per project are skewed (a few large
+projects, many small ones), statuses and priorities follow fixed weights,
+a handful of assignees own most of the work, and due dates cluster around
+the creation date with a tail of overdue work. Everything is driven by one
+seeded ``random.Random``, so the same arguments always produce the same data.
+
+Tasks and comments are built as plain tuples, never model instances, and
+written in batches with ``apps.core.bulk.insert_values`` (``COPY`` on
+PostgreSQL). Primary keys are assigned up front, so comments can point at
+tasks without reading ids back. Counter columns are computed while
+generating, so no reconciliation pass is needed. Run it against an idle
+database: the primary key sequences are moved past the generated ids at the end.
+"""
+import math
+import random
+from bisect import bisect
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+from django.core.management.color import no_style
+from django.db import connection, reset_queries, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+from apps.core.bulk import bulk_insert, insert_values
+from apps.core.response_cache import GLOBAL_SCOPE, response_cache
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+from .models import Organization
+
+COMPANIES = [
+    'Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Vandelay', 'Stark', 'Wayne',
+    'Tyrell', 'Cyberdyne', 'Soylent', 'Wonka', 'Aperture', 'Massive Dynamic', 'Pied Piper',
+]
+INDUSTRIES = ['Corporation', 'Industries', 'Labs', 'Systems', 'Partners', 'Holdings']
+PROJECT_AREAS = [
+    'Website', 'Mobile App', 'Billing', 'Data Platform', 'Onboarding', 'Search', 'Reporting',
+    'Infrastructure', 'Security', 'Marketing Site', 'Design System', 'Customer Portal',
+]
+PROJECT_KINDS = ['Redesign', 'Migration', 'Launch', 'Overhaul', 'Rollout', 'Audit', 'Refresh']
+VERBS = [
+    'Implement', 'Design', 'Fix', 'Refactor', 'Test', 'Document', 'Review', 'Deploy',
+    'Investigate', 'Optimize', 'Update', 'Remove', 'Migrate', 'Configure',
+]
+OBJECTS = [
+    'login flow', 'checkout page', 'search index', 'API pagination', 'email templates',
+    'dashboard charts', 'CI pipeline', 'database indexes', 'error handling', 'user settings',
+    'notification service', 'cache layer', 'access controls', 'export job', 'onboarding tour',
+]
+ROLES = ['dev', 'design', 'qa', 'ops', 'pm', 'data', 'support']
+COMMENT_LINES = [
+    'Looks good to me.', 'Can we add tests for the edge cases?', 'Blocked on the API change.',
+    'Updated based on review feedback.', 'This needs a design pass first.',
+    'Deployed to staging, please verify.', 'Moving this to the next sprint.',
+    'Found the root cause, fix incoming.', 'Should we split this into smaller tasks?',
+]
+
+PROJECT_STATUS_WEIGHTS = {'ACTIVE': 60, 'COMPLETED': 25, 'ON_HOLD': 10, 'ARCHIVED': 5}
+TASK_STATUS_WEIGHTS = {'TODO': 35, 'IN_PROGRESS': 20, 'DONE': 38, 'BLOCKED': 7}
+# Work in finished projects is almost all done.
+FINISHED_TASK_STATUS_WEIGHTS = {'TODO': 2, 'IN_PROGRESS': 1, 'DONE': 96, 'BLOCKED': 1}
+PRIORITY_WEIGHTS = {'LOW': 25, 'MEDIUM': 45, 'HIGH': 22, 'URGENT': 8}
+
+# Tasks and comments are generated as tuples in this column order.
+TASK_COLUMNS = (
+    'id', 'project_id', 'organization_id', 'title', 'description', 'status', 'priority', 'assignee_email',
+    'due_date', 'created_at', 'updated_at', 'comment_count',
+)
+COMMENT_COLUMNS = ('id', 'task_id', 'organization_id', 'content', 'author_email', 'created_at', 'updated_at')
+
+UNASSIGNED_RATE = 0.1
+NO_DUE_DATE_RATE = 0.15
+HISTORY_DAYS = 365
+
+
+class Weighted:
+    """Weighted choice with the cumulative weights computed once."""
+
+    def __init__(self, options, weights):
+        self.options = list(options)
+        self.cumulative = list(accumulate(weights))
+
+    @classmethod
+    def from_dict(cls, weights):
+        return cls(weights.keys(), weights.values())
+
+    def pick(self, rng):
+        return self.options[bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+PROJECT_STATUSES = Weighted.from_dict(PROJECT_STATUS_WEIGHTS)
+TASK_STATUSES = Weighted.from_dict(TASK_STATUS_WEIGHTS)
+FINISHED_TASK_STATUSES = Weighted.from_dict(FINISHED_TASK_STATUS_WEIGHTS)
+PRIORITIES = Weighted.from_dict(PRIORITY_WEIGHTS)
+
+
+class Generator:
+    def __init__(self, seed=0, batch_size=10000, progress=None):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.progress = progress
+        self.now = timezone.now()
+        self.totals = Counter()
+        self.tasks = []
+        self.comments = []
+        self.next_ids = {
+            model: (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+            for model in (Project, Task, TaskComment)
+        }
+
+    def next_id(self, model):
+        pk = self.next_ids[model]
+        self.next_ids[model] += 1
+        return pk
+
+    def skewed_count(self, mean):
+        """Lognormal draw with the given mean: most values small, a few large."""
+        if mean <= 0:
+            return 0
+        sigma = 0.9
+        return int(round(self.random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)))
+
+    def past(self, days=HISTORY_DAYS):
+        return self.now - timedelta(seconds=self.random.uniform(0, days * 86400))
+
+    def assignees(self, organization, size):
+        people = [f'{self.random.choice(ROLES)}{n}@{organization.slug}.example.com' for n in range(size)]
+        # Zipf-like weights: the first few people own most of the tasks.
+        return Weighted(people, [1 / (rank + 1) ** 1.1 for rank in range(size)])
+
+    def organizations(self, count):
+        start = Organization.objects.count()
+        organizations = []
+        for index in range(count):
+            name = f'{self.random.choice(COMPANIES)} {self.random.choice(INDUSTRIES)} {start + index + 1}'
+            organizations.append(Organization(
+                name=name,
+                slug=slugify(name),
+                contact_email=f'admin@{slugify(name)}.example.com',
+            ))
+        return Organization.objects.bulk_create(organizations)
+
+    def projects(self, organization, count):
+        projects = []
+        for index in range(count):
+            created_at = self.past()
+            projects.append(Project(
+                pk=self.next_id(Project),
+                organization=organization,
+                # Names are unique per organization.
+                name=f'{self.random.choice(PROJECT_AREAS)} {self.random.choice(PROJECT_KINDS)} {index + 1}',
+                description=f'{self.random.choice(VERBS)} the {self.random.choice(OBJECTS)}.',
+                status=PROJECT_STATUSES.pick(self.random),
+                due_date=(created_at + timedelta(days=self.random.randint(14, 240))).date(),
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        with transaction.atomic():
+            bulk_insert(Project, projects)
+        return projects
+
+    def populate_project(self, project, tasks_mean, comments_mean, people):
+        statuses = (
+            FINISHED_TASK_STATUSES if project.status in ('COMPLETED', 'ARCHIVED')
+            else TASK_STATUSES
+        )
+        rng = self.random
+        counts = Counter()
+        for _ in range(self.skewed_count(tasks_mean)):
+            task_id = self.next_id(Task)
+            created_at = project.created_at + (self.now - project.created_at) * rng.random()
+            due_date = None
+            if rng.random() >= NO_DUE_DATE_RATE:
+                due_date = created_at + timedelta(days=rng.expovariate(1 / 21))
+            status = statuses.pick(rng)
+            counts[status] += 1
+            self.tasks.append((
+                task_id,
+                project.pk,
+                project.organization_id,
+                f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}',
+                f'{rng.choice(VERBS)} and verify the {rng.choice(OBJECTS)}.',
+                status,
+                PRIORITIES.pick(rng),
+                '' if rng.random() < UNASSIGNED_RATE else people.pick(rng),
+                due_date,
+                created_at,
+                created_at,
+                self.add_comments(task_id, project.organization_id, created_at, comments_mean, people),
+            ))
+            if len(self.tasks) + len(self.comments) >= self.batch_size:
+                self.flush()
+
+        for status, count in counts.items():
+            setattr(project, Project.TASK_COUNTER_FIELDS[status], count)
+        return sum(counts.values())
+
+    def add_comments(self, task_id, organization_id, task_created_at, mean, people):
+        count = self.skewed_count(mean) if mean else 0
+        for _ in range(count):
+            created_at = task_created_at + timedelta(hours=self.random.expovariate(1 / 48))
+            self.comments.append((
+                self.next_id(TaskComment),
+                task_id,
+                organization_id,
+                self.random.choice(COMMENT_LINES),
+                people.pick(self.random),
+                created_at,
+                created_at,
+            ))
+        return count
+
+    def flush(self):
+        with transaction.atomic():
+            insert_values(Task, TASK_COLUMNS, self.tasks)
+            insert_values(TaskComment, COMMENT_COLUMNS, self.comments)
+        self.totals['tasks'] += len(self.tasks)
+        self.totals['comments'] += len(self.comments)
+        self.tasks, self.comments = [], []
+        # With DEBUG on, every statement is kept in connection.queries.
+        reset_queries()
+        if self.progress:
+            self.progress(dict(self.totals))
+
+    def run(self, orgs, projects_per_org, tasks_per_project, comments_per_task):
+        for organization in self.organizations(orgs):
+            self.totals['organizations'] += 1
+            people = self.assignees(organization, max(5, int(math.sqrt(projects_per_org * tasks_per_project))))
+            projects = self.projects(organization, projects_per_org)
+            self.totals['projects'] += len(projects)
+            task_total = 0
+            for project in projects:
+                task_total += self.populate_project(project, tasks_per_project, comments_per_task, people)
+            self.flush()
+            Project.objects.bulk_update(projects, list(Project.TASK_COUNTER_FIELDS.values()))
+            Organization.objects.filter(pk=organization.pk).update(
+                project_count=len(projects), task_count=task_total
+            )
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Project, Task, TaskComment]):
+                cursor.execute(sql)
+        response_cache.bump(GLOBAL_SCOPE)
+        return dict(self.totals)
+
+
+def generate(orgs=2, projects_per_org=3, tasks_per_project=5, comments_per_task=1,
+             seed=0, batch_size=10000, progress=None):
+    """Create the requested data and return the number of rows per model."""
+    return Generator(seed, batch_size, progress).run(
+        orgs, projects_per_org, tasks_per_project, comments_per_task
+    )
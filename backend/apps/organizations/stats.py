@@ -0,0 +1,53 @@
+"""
+Rollup of the per-organization dashboard stats.
+
+``compute_stats`` answers every figure with one conditional-aggregation query
+over the organization's projects, reading the stored task counters instead of
+joining the tasks table. Results are kept in ``OrganizationStats``; writes bump
+its ``generation`` and the next read recomputes only organizations whose stored
+rollup is behind.
+"""
+from functools import reduce
+from operator import add
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from apps.core.routers import untracked_writes
+from apps.projects.models import Project
+from .models import OrganizationStats
+
+
+def compute_stats(organization_id):
+    task_total = reduce(add, (F(counter) for counter in Project.TASK_COUNTER_FIELDS.values()))
+    return Project.objects.filter(organization_id=organization_id).aggregate(
+        total_projects=Count('id'),
+        active_projects=Count('id', filter=Q(status='ACTIVE')),
+        completed_projects=Count('id', filter=Q(status='COMPLETED')),
+        total_tasks=Coalesce(Sum(task_total), 0),
+        completed_tasks=Coalesce(Sum('done_task_count'), 0),
+    )
+
+
+def get_stats(organization_id):
+    stats = OrganizationStats.objects.filter(organization_id=organization_id).first()
+    # Filling in the rollup is no write of the client's (see apps.core.routers).
+    with untracked_writes():
+        if stats is None:
+            stats, _ = OrganizationStats.objects.get_or_create(organization_id=organization_id)
+        if stats.computed_generation != stats.generation:
+            values = compute_stats(organization_id)
+            # Only store the rollup if no write has landed since it was read.
+            OrganizationStats.objects.filter(
+                pk=stats.pk, generation=stats.generation
+            ).update(computed_generation=stats.generation, **values)
+            for field, value in values.items():
+                setattr(stats, field, value)
+    return stats
+
+
+def mark_stale(organization_id=None, project_id=None):
+    stats = OrganizationStats.objects.all()
+    if organization_id is not None:
+        stats = stats.filter(organization_id=organization_id)
+    else:
+        stats = stats.filter(organization__projects=project_id)
+    stats.update(generation=F('generation') + 1)
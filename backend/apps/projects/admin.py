@@ -1,9 +1,11 @@
 from django.contrib import admin
+from apps.core import purge
+from apps.core.routers import ReplicaChangeListMixin
 from .models import Project
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['name', 'organization', 'status', 'due_date', 'task_count', 'completion_rate', 'created_at']
     list_filter = ['status', 'organization', 'due_date', 'created_at']
     search_fields = ['name', 'description', 'organization__name']
@@ -15,4 +17,12 @@ class ProjectAdmin(admin.ModelAdmin):
     
     def completion_rate(self, obj):
         return f"{obj.completion_rate}%"
-    completion_rate.short_description = 'Completion'
\ No newline at end of file
+    completion_rate.short_description = 'Completion'
+
+    def delete_model(self, request, obj):
+        purge.delete_project(obj)
+
+    def delete_queryset(self, request, queryset):
+        # Hidden now, purged in the background with counters adjusted.
+        for obj in queryset:
+            purge.delete_project(obj)
\ No newline at end of file
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='projects_organiz_cdc64f_idx'),
+        ),
+    ]
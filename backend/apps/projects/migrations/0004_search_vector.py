@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:30
+
+import django.contrib.postgres.search
+from django.db import migrations
+from apps.search.operations import install_search_vector
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        install_search_vector('projects', [('name', 'A'), ('description', 'B')]),
+    ]
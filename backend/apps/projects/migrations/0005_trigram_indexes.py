@@ -0,0 +1,15 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:31
+
+from django.db import migrations
+from apps.search.operations import install_trigram_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_search_vector'),
+    ]
+
+    operations = [
+        install_trigram_index('projects', 'name'),
+    ]
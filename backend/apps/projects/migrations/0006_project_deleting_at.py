@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:10
+
+from django.db import migrations, models
+import django.db.models.manager
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='project',
+            options={'base_manager_name': 'all_objects', 'ordering': ['-created_at']},
+        ),
+        migrations.AlterModelManagers(
+            name='project',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='deleting_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,8 +1,21 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import EmailValidator
+from django.contrib.postgres.search import SearchVectorField
 from apps.organizations.models import Organization
 
 
+class ProjectQuerySet(models.QuerySet):
+    def for_organization(self, organization):
+        return self.filter(organization=organization)
+
+
+class ProjectManager(models.Manager.from_queryset(ProjectQuerySet)):
+    """Leaves out projects waiting to be purged (see ``apps.core.purge``)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleting_at__isnull=True)
+
+
 class Project(models.Model):
     STATUS_CHOICES = [
         ('ACTIVE', 'Active'),
@@ -11,6 +24,16 @@ class Project(models.Model):
         ('ARCHIVED', 'Archived'),
     ]
 
+    SEARCH_FIELDS = [('name', 'A'), ('description', 'B')]
+
+    # Stored per-status task counters, keyed by Task status.
+    TASK_COUNTER_FIELDS = {
+        'TODO': 'todo_task_count',
+        'IN_PROGRESS': 'in_progress_task_count',
+        'DONE': 'done_task_count',
+        'BLOCKED': 'blocked_task_count',
+    }
+
     organization = models.ForeignKey(
         Organization, 
         on_delete=models.CASCADE, 
@@ -22,26 +45,74 @@ class Project(models.Model):
     due_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    todo_task_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_task_count = models.PositiveIntegerField(default=0, editable=False)
+    done_task_count = models.PositiveIntegerField(default=0, editable=False)
+    blocked_task_count = models.PositiveIntegerField(default=0, editable=False)
+    # Maintained by a database trigger on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set when the project is handed to the background purger.
+    deleting_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Set while its tasks and comments are in cold storage (see apps.core.archive).
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ProjectManager()
+    all_objects = ProjectQuerySet.as_manager()
 
     class Meta:
         db_table = 'projects'
+        base_manager_name = 'all_objects'
         ordering = ['-created_at']
         unique_together = ['organization', 'name']
         indexes = [
             models.Index(fields=['organization', 'status']),
+            models.Index(fields=['organization', '-created_at', '-id']),
             models.Index(fields=['due_date']),
         ]
 
     def __str__(self):
         return f"{self.organization.name} - {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_counted_state()
+        return instance
+
+    def _remember_counted_state(self):
+        # The status last written; only a change of it moves the stats rollup.
+        self._counted_status = self.__dict__.get('status')
+
+    def save(self, *args, **kwargs):
+        from apps.core import counters
+
+        adding = self._state.adding
+        old_status = getattr(self, '_counted_status', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                counters.project_added(self)
+            elif old_status is None or old_status != self.status:
+                counters.project_changed(self)
+        self._remember_counted_state()
+
+    def delete(self, *args, **kwargs):
+        from apps.core import counters
+
+        with transaction.atomic():
+            locked = Project.objects.select_for_update().filter(pk=self.pk).first()
+            result = super().delete(*args, **kwargs)
+            if locked is not None:
+                counters.project_removed(self, locked.task_count)
+        return result
+
     @property
     def task_count(self):
-        return self.tasks.count()
+        return sum(getattr(self, counter) for counter in self.TASK_COUNTER_FIELDS.values())
 
     @property
     def completed_tasks(self):
-        return self.tasks.filter(status='DONE').count()
+        return self.done_task_count
 
     @property
     def completion_rate(self):
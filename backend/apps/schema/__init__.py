@@ -1,3 +1,3 @@
-from .schema import schema
+from .schema import async_schema, schema
 
-__all__ = ['schema']
\ No newline at end of file
+__all__ = ['async_schema', 'schema']
@@ -0,0 +1,158 @@
+"""
+Static cost and depth analysis of GraphQL operations.
+
+Every selected field costs its configured weight, and the selections under a
+list field are multiplied by the list size the client asked for (``limit`` or
+``first``, falling back to ``DEFAULT_LIST_SIZE``). The total is an upper bound
+on the rows and resolver calls an operation can trigger, worked out from the
+document alone, so over-budget operations are rejected before any resolver runs.
+"""
+from django.conf import settings
+from graphql import (
+    FieldNode, FragmentDefinitionNode, FragmentSpreadNode, GraphQLError, InlineFragmentNode, ValidationRule,
+    get_named_type, is_list_type, is_object_type, is_interface_type, value_from_ast,
+)
+from graphql.type import get_nullable_type
+
+DEFAULTS = {
+    'MAX_COST': 5000,
+    'MAX_DEPTH': 10,
+    'DEFAULT_LIST_SIZE': 20,
+    'MAX_LIST_SIZE': 100,
+    # Extra weight for fields whose resolvers do more than a row fetch.
+    'FIELD_COSTS': {
+        'Query.search': 10,
+        'Query.suggest': 3,
+        'Query.projectStats': 2,
+    },
+}
+
+SIZE_ARGUMENTS = ('first', 'limit')
+
+
+def get_cost_settings():
+    options = dict(DEFAULTS)
+    options.update(getattr(settings, 'GRAPHQL_QUERY_COST', {}))
+    return options
+
+
+def clamp_list_size(value, options=None):
+    """The list size a ``limit``/``first`` of ``value`` is costed at, and served with."""
+    return max(0, min(value, (options or get_cost_settings())['MAX_LIST_SIZE']))
+
+
+class CostAnalysis:
+    def __init__(self, schema, fragments, variables=None, options=None):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.options = options or get_cost_settings()
+        self.max_depth = 0
+
+    def list_size(self, field_def, node):
+        for argument in node.arguments:
+            if argument.name.value in SIZE_ARGUMENTS:
+                arg_def = field_def.args.get(argument.name.value)
+                value = value_from_ast(argument.value, arg_def.type, self.variables) if arg_def else None
+                if isinstance(value, int):
+                    return clamp_list_size(value, self.options)
+        return None
+
+    def field_cost(self, parent_type, field_def, node):
+        named_type = get_named_type(field_def.type)
+        key = f'{parent_type.name}.{node.name.value}'
+        if key in self.options['FIELD_COSTS']:
+            return self.options['FIELD_COSTS'][key]
+        return 1 if is_object_type(named_type) or is_interface_type(named_type) else 0
+
+    def selection_set_cost(self, selection_set, parent_type, depth, pending_size=None, seen=frozenset()):
+        self.max_depth = max(self.max_depth, depth)
+        total = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                total += self.field_node_cost(selection, parent_type, depth, pending_size, seen)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                total += self.selection_set_cost(selection.selection_set, fragment_type, depth, pending_size, seen)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in seen:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                total += self.selection_set_cost(
+                    fragment.selection_set, fragment_type, depth, pending_size, seen | {name}
+                )
+        return total
+
+    def field_node_cost(self, node, parent_type, depth, pending_size, seen):
+        name = node.name.value
+        if name.startswith('__') or not hasattr(parent_type, 'fields'):
+            return 0
+        field_def = parent_type.fields.get(name)
+        if field_def is None:
+            return 0
+
+        cost = self.field_cost(parent_type, field_def, node)
+        if not node.selection_set:
+            return cost
+
+        size = self.list_size(field_def, node)
+        field_type = get_nullable_type(field_def.type)
+        children = self.selection_set_cost(
+            node.selection_set,
+            get_named_type(field_type),
+            depth + 1,
+            # Connections take ``first`` but return a list further down (edges).
+            pending_size=None if is_list_type(field_type) else size or pending_size,
+            seen=seen,
+        )
+        if is_list_type(field_type):
+            multiplier = size or pending_size or self.options['DEFAULT_LIST_SIZE']
+            return multiplier * (cost + children)
+        return cost + children
+
+    def operation_cost(self, operation):
+        root_type = self.schema.get_root_type(operation.operation)
+        return self.selection_set_cost(operation.selection_set, root_type, 1)
+
+
+def make_cost_rule(variables, operation_name, result):
+    """
+    Build a validation rule bound to this request's variables and operation.
+
+    ``result`` receives the computed ``cost`` and ``depth`` so the view can
+    report them in the response extensions.
+    """
+    options = get_cost_settings()
+
+    class QueryCostRule(ValidationRule):
+        def enter_operation_definition(self, operation, *args):
+            if operation_name and (not operation.name or operation.name.value != operation_name):
+                return
+            context = self.context
+            fragments = {
+                definition.name.value: definition
+                for definition in context.document.definitions
+                if isinstance(definition, FragmentDefinitionNode)
+            }
+            analysis = CostAnalysis(context.schema, fragments, variables, options)
+            cost = analysis.operation_cost(operation)
+            result['cost'] = result.get('cost', 0) + cost
+            result['depth'] = max(result.get('depth', 0), analysis.max_depth)
+            result['maxCost'] = options['MAX_COST']
+
+            if analysis.max_depth > options['MAX_DEPTH']:
+                context.report_error(GraphQLError(
+                    f"Query depth {analysis.max_depth} exceeds the maximum of {options['MAX_DEPTH']}.",
+                    operation,
+                ))
+            if cost > options['MAX_COST']:
+                context.report_error(GraphQLError(
+                    f"Query cost {cost} exceeds the maximum of {options['MAX_COST']}.",
+                    operation,
+                ))
+
+    return QueryCostRule
@@ -0,0 +1,112 @@
+"""
+Per-operation GraphQL metrics: latency, SQL statements, database time and
+errors, labelled by operation name and type.
+
+SQL is counted with ``connection.execute_wrapper``, which only times each
+statement; nothing about the statement itself is kept. Clients choose
+operation names, so only the first ``GRAPHQL_METRICS_MAX_OPERATIONS``
+distinct names get their own series and later ones are reported as
+``other``.
+"""
+import threading
+import time
+from contextlib import ExitStack
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from apps.core.metrics import registry
+
+ANONYMOUS = 'anonymous'
+OTHER = 'other'
+LABELS = ('operation', 'type')
+
+requests_total = registry.counter(
+    'graphql_requests_total', 'GraphQL operations executed.', LABELS + ('status',)
+)
+request_duration = registry.histogram(
+    'graphql_request_duration_seconds', 'Time to execute a GraphQL operation and encode the response.', LABELS
+)
+sql_queries = registry.histogram(
+    'graphql_sql_queries', 'SQL statements run per GraphQL operation.', LABELS,
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+db_duration = registry.histogram(
+    'graphql_db_duration_seconds', 'Time spent in SQL statements per GraphQL operation.', LABELS
+)
+
+_operations = set()
+_lock = threading.Lock()
+
+
+def operation_label(name):
+    if not name:
+        return ANONYMOUS
+    if name in _operations:
+        return name
+    with _lock:
+        if len(_operations) >= getattr(settings, 'GRAPHQL_METRICS_MAX_OPERATIONS', 500):
+            return OTHER
+        _operations.add(name)
+    return name
+
+
+def reset():
+    registry.reset()
+    with _lock:
+        _operations.clear()
+
+
+class SQLTimer:
+    """``execute_wrapper`` hook counting statements and their total time."""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.queries += 1
+
+
+class Observation:
+    """
+    Measures one operation. The view fills in ``name``, ``type`` and
+    ``failed`` once it knows them.
+
+    Database connections belong to a thread, so async views enter it with
+    ``async with``, which hooks the connections of the thread their
+    ORM calls run in.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.type = None
+        self.failed = False
+        self.sql = SQLTimer()
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self.sql))
+        self._started = time.perf_counter()
+        return self
+
+    async def __aenter__(self):
+        return await sync_to_async(self.__enter__)()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.__exit__(exc_type, exc, tb)
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        self._stack.close()
+        labels = (operation_label(self.name), self.type or 'unknown')
+        failed = self.failed or exc_type is not None
+        requests_total.inc(*labels, 'error' if failed else 'success')
+        request_duration.observe(duration, *labels)
+        sql_queries.observe(self.sql.queries, *labels)
+        db_duration.observe(self.sql.duration, *labels)
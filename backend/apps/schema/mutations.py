@@ -1,8 +1,14 @@
 import graphene
+from asgiref.sync import sync_to_async
 from django.utils import timezone
-from .types import OrganizationType, ProjectType, TaskType, TaskCommentType
+from apps.core import archive, events, purge
+from .types import (
+    OrganizationType, ProjectType, TaskType, TaskCommentType, DeletionType,
+    BulkItemErrorType, BulkTaskCreateInput, BulkTaskUpdateInput,
+)
 from apps.organizations.models import Organization
 from apps.projects.models import Project
+from apps.tasks import bulk
 from apps.tasks.models import Task, TaskComment
 
 
@@ -50,6 +56,7 @@ class CreateProject(graphene.Mutation):
                 status=status,
                 due_date=due_date
             )
+            events.project_changed(project, events.CREATED)
             return CreateProject(project=project, success=True, errors=[])
         except Exception as e:
             return CreateProject(project=None, success=False, errors=[str(e)])
@@ -80,6 +87,7 @@ class UpdateProject(graphene.Mutation):
                     setattr(project, field, value)
             
             project.save()
+            events.project_changed(project, events.UPDATED)
             return UpdateProject(project=project, success=True, errors=[])
         except Project.DoesNotExist:
             return UpdateProject(project=None, success=False, errors=['Project not found'])
@@ -117,6 +125,7 @@ class CreateTask(graphene.Mutation):
                 assignee_email=assignee_email,
                 due_date=due_date
             )
+            events.task_changed(task, events.CREATED, organization.pk)
             return CreateTask(task=task, success=True, errors=[])
         except Project.DoesNotExist:
             return CreateTask(task=None, success=False, errors=['Project not found'])
@@ -144,13 +153,14 @@ class UpdateTask(graphene.Mutation):
             return UpdateTask(task=None, success=False, errors=['Organization required'])
 
         try:
-            task = Task.objects.get(id=id, project__organization=organization)
+            task = Task.objects.for_organization(organization).get(id=id)
             
             for field, value in kwargs.items():
                 if value is not None:
                     setattr(task, field, value)
             
             task.save()
+            events.task_changed(task, events.UPDATED, organization.pk)
             return UpdateTask(task=task, success=True, errors=[])
         except Task.DoesNotExist:
             return UpdateTask(task=None, success=False, errors=['Task not found'])
@@ -174,12 +184,14 @@ class CreateTaskComment(graphene.Mutation):
             return CreateTaskComment(comment=None, success=False, errors=['Organization required'])
 
         try:
-            task = Task.objects.get(id=task_id, project__organization=organization)
+            task = Task.objects.for_organization(organization).get(id=task_id)
             comment = TaskComment.objects.create(
                 task=task,
                 content=content,
                 author_email=author_email
             )
+            # The task's comment count changed.
+            events.task_changed(task, events.UPDATED, organization.pk)
             return CreateTaskComment(comment=comment, success=True, errors=[])
         except Task.DoesNotExist:
             return CreateTaskComment(comment=None, success=False, errors=['Task not found'])
@@ -188,11 +200,14 @@ class CreateTaskComment(graphene.Mutation):
 
 
 class DeleteProject(graphene.Mutation):
+    """Hides the project at once; its tasks and comments are purged in the background."""
+
     class Arguments:
         id = graphene.ID(required=True)
 
     success = graphene.Boolean()
     errors = graphene.List(graphene.String)
+    deletion = graphene.Field(DeletionType, description='Follow it with the `deletion` query')
 
     def mutate(self, info, id):
         organization = getattr(info.context, 'organization', None)
@@ -201,14 +216,42 @@ class DeleteProject(graphene.Mutation):
 
         try:
             project = Project.objects.get(id=id, organization=organization)
-            project.delete()
-            return DeleteProject(success=True, errors=[])
+            deletion = purge.delete_project(project)
+            events.publish('project', events.DELETED, organization.pk, id, id)
+            return DeleteProject(success=True, errors=[], deletion=deletion)
         except Project.DoesNotExist:
             return DeleteProject(success=False, errors=['Project not found'])
         except Exception as e:
             return DeleteProject(success=False, errors=[str(e)])
 
 
+class RestoreProject(graphene.Mutation):
+    """Moves an archived project's tasks and comments back to the live tables, so they can be changed."""
+
+    class Arguments:
+        id = graphene.ID(required=True)
+
+    project = graphene.Field(ProjectType)
+    restored_tasks = graphene.Int()
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    def mutate(self, info, id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return RestoreProject(project=None, success=False, errors=['Organization required'])
+
+        try:
+            project = Project.objects.get(id=id, organization=organization)
+            restored = archive.restore_project(project)
+            events.project_changed(project, events.UPDATED)
+            return RestoreProject(project=project, restored_tasks=restored, success=True, errors=[])
+        except Project.DoesNotExist:
+            return RestoreProject(project=None, success=False, errors=['Project not found'])
+        except Exception as e:
+            return RestoreProject(project=None, success=False, errors=[str(e)])
+
+
 class DeleteTask(graphene.Mutation):
     class Arguments:
         id = graphene.ID(required=True)
@@ -222,8 +265,9 @@ class DeleteTask(graphene.Mutation):
             return DeleteTask(success=False, errors=['Organization required'])
 
         try:
-            task = Task.objects.get(id=id, project__organization=organization)
+            task = Task.objects.for_organization(organization).get(id=id)
             task.delete()
+            events.publish('task', events.DELETED, organization.pk, id, task.project_id)
             return DeleteTask(success=True, errors=[])
         except Task.DoesNotExist:
             return DeleteTask(success=False, errors=['Task not found'])
@@ -231,12 +275,118 @@ class DeleteTask(graphene.Mutation):
             return DeleteTask(success=False, errors=[str(e)])
 
 
+class BulkCreateTasks(graphene.Mutation):
+    class Arguments:
+        tasks = graphene.List(graphene.NonNull(BulkTaskCreateInput), required=True)
+
+    tasks = graphene.List(TaskType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+    item_errors = graphene.List(BulkItemErrorType)
+
+    def mutate(self, info, tasks):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return BulkCreateTasks(tasks=[], success=False, errors=['Organization required'], item_errors=[])
+
+        try:
+            created, item_errors = bulk.create_tasks(organization, tasks)
+            for task in created:
+                events.task_changed(task, events.CREATED, organization.pk)
+            return BulkCreateTasks(tasks=created, success=not item_errors, errors=[], item_errors=item_errors)
+        except Exception as e:
+            return BulkCreateTasks(tasks=[], success=False, errors=[str(e)], item_errors=[])
+
+
+class BulkUpdateTasks(graphene.Mutation):
+    class Arguments:
+        tasks = graphene.List(graphene.NonNull(BulkTaskUpdateInput), required=True)
+
+    tasks = graphene.List(TaskType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+    item_errors = graphene.List(BulkItemErrorType)
+
+    def mutate(self, info, tasks):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return BulkUpdateTasks(tasks=[], success=False, errors=['Organization required'], item_errors=[])
+
+        try:
+            updated, item_errors = bulk.update_tasks(organization, tasks)
+            for task in updated:
+                events.task_changed(task, events.UPDATED, organization.pk)
+            return BulkUpdateTasks(tasks=updated, success=not item_errors, errors=[], item_errors=item_errors)
+        except Exception as e:
+            return BulkUpdateTasks(tasks=[], success=False, errors=[str(e)], item_errors=[])
+
+
+class BulkDeleteTasks(graphene.Mutation):
+    class Arguments:
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+    deleted_ids = graphene.List(graphene.ID)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+    item_errors = graphene.List(BulkItemErrorType)
+
+    def mutate(self, info, ids):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return BulkDeleteTasks(deleted_ids=[], success=False, errors=['Organization required'], item_errors=[])
+
+        try:
+            deleted, item_errors = bulk.delete_tasks(organization, ids)
+            for pk, project_id in deleted.items():
+                events.publish('task', events.DELETED, organization.pk, pk, project_id)
+            return BulkDeleteTasks(deleted_ids=list(deleted), success=not item_errors, errors=[], item_errors=item_errors)
+        except Exception as e:
+            return BulkDeleteTasks(deleted_ids=[], success=False, errors=[str(e)], item_errors=[])
+
+
 class Mutation(graphene.ObjectType):
     create_organization = CreateOrganization.Field()
     create_project = CreateProject.Field()
     update_project = UpdateProject.Field()
     delete_project = DeleteProject.Field()
+    restore_project = RestoreProject.Field()
     create_task = CreateTask.Field()
     update_task = UpdateTask.Field()
     delete_task = DeleteTask.Field()
-    create_task_comment = CreateTaskComment.Field()
\ No newline at end of file
+    create_task_comment = CreateTaskComment.Field()
+    bulk_create_tasks = BulkCreateTasks.Field()
+    bulk_update_tasks = BulkUpdateTasks.Field()
+    bulk_delete_tasks = BulkDeleteTasks.Field()
+
+
+def async_field(mutation):
+    """
+    ``mutation.Field()`` with an async resolver for ``AsyncMutation``.
+
+    ``mutate`` runs in a thread: the mutations rely on ``transaction.atomic``
+    and counter updates, which Django only supports in synchronous code.
+    """
+    mutate = sync_to_async(mutation._meta.resolver)
+
+    async def resolve(root, info, **args):
+        return await mutate(root, info, **args)
+
+    return graphene.Field(mutation._meta.output, args=mutation._meta.arguments, resolver=resolve)
+
+
+class AsyncMutation(graphene.ObjectType):
+    class Meta:
+        name = 'Mutation'
+
+    create_organization = async_field(CreateOrganization)
+    create_project = async_field(CreateProject)
+    update_project = async_field(UpdateProject)
+    delete_project = async_field(DeleteProject)
+    restore_project = async_field(RestoreProject)
+    create_task = async_field(CreateTask)
+    update_task = async_field(UpdateTask)
+    delete_task = async_field(DeleteTask)
+    create_task_comment = async_field(CreateTaskComment)
+    bulk_create_tasks = async_field(BulkCreateTasks)
+    bulk_update_tasks = async_field(BulkUpdateTasks)
+    bulk_delete_tasks = async_field(BulkDeleteTasks)
@@ -0,0 +1,81 @@
+"""
+Keyset pagination over ``(created_at, id)`` for the connection root fields.
+
+Cursors are opaque base64 strings that encode the sort key of the last row a
+client saw. The next page is a range scan starting after that key, which
+costs the same however deep the client has paged.
+"""
+import base64
+from datetime import datetime
+from django.db.models import Q
+from graphene.relay import PageInfo
+from graphql import GraphQLError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(obj):
+    raw = f'{obj.created_at.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeError):
+        raise GraphQLError('Invalid cursor')
+
+
+def _page_queryset(queryset, first, after):
+    if first is None:
+        first = DEFAULT_PAGE_SIZE
+    if first < 0:
+        raise GraphQLError('first must be a non-negative integer')
+    first = min(first, MAX_PAGE_SIZE)
+
+    queryset = queryset.order_by('-created_at', '-id')
+    if after:
+        created_at, pk = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    # One extra row tells us whether another page follows.
+    return queryset[:first + 1], first
+
+
+def _connection(rows, connection_type, first, after):
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+
+    edges = [connection_type.Edge(node=row, cursor=encode_cursor(row)) for row in rows]
+    return connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=bool(after),
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
+
+
+def paginate(queryset, connection_type, first=None, after=None):
+    """Return one page of ``queryset`` (newest first) as ``connection_type``."""
+    page, first = _page_queryset(queryset, first, after)
+    return _connection(list(page), connection_type, first, after)
+
+
+async def apaginate(queryset, connection_type, first=None, after=None):
+    """``paginate`` for async resolvers, fetching the page with the async ORM."""
+    page, first = _page_queryset(queryset, first, after)
+    return _connection([row async for row in page], connection_type, first, after)
+
+
+def empty_page(connection_type):
+    return connection_type(
+        edges=[],
+        page_info=PageInfo(has_next_page=False, has_previous_page=False),
+    )
@@ -0,0 +1,91 @@
+"""
+Automatic persisted queries and the parsed-document cache.
+
+Clients following the Apollo APQ protocol send
+``extensions.persistedQuery.sha256Hash`` instead of the query text. Known
+hashes resolve through a per-process LRU of parsed, validated documents,
+backed by the ``PersistedQuery`` table that every worker shares. The same LRU
+serves full-text requests, so each distinct document is parsed and validated
+once per process.
+"""
+import hashlib
+import json
+from django.conf import settings
+from graphql import GraphQLError, parse, specified_rules, validate
+from apps.core.cache import TTLCache
+from apps.core.models import PersistedQuery
+
+document_cache = TTLCache(
+    maxsize=getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_TTL', 24 * 60 * 60),
+)
+
+NOT_FOUND = 'PersistedQueryNotFound'
+
+
+class PersistedQueryError(GraphQLError):
+    def __init__(self, message, code):
+        super().__init__(message, extensions={'code': code})
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def get_persisted_hash(request, data):
+    """Return the APQ hash sent with the request, if any."""
+    extensions = request.GET.get('extensions') or data.get('extensions')
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            return None
+    if not isinstance(extensions, dict):
+        return None
+    persisted = extensions.get('persistedQuery') or {}
+    if persisted.get('version') != 1:
+        return None
+    return persisted.get('sha256Hash')
+
+
+def resolve_query(sha256, query):
+    """
+    Return the query text for an APQ request.
+
+    Raises ``PersistedQueryError`` when the hash is unknown and no query was
+    sent (the client then retries with the full text), or when the text does
+    not hash to the value the client claimed.
+    """
+    if query:
+        if query_hash(query) != sha256:
+            raise PersistedQueryError('provided sha does not match query', 'INVALID_PERSISTED_QUERY')
+        return query
+
+    cached = document_cache.get(sha256)
+    if cached is not None:
+        return cached[0]
+    query = PersistedQuery.objects.filter(sha256=sha256).values_list('query', flat=True).first()
+    if query is None:
+        raise PersistedQueryError(NOT_FOUND, 'PERSISTED_QUERY_NOT_FOUND')
+    return query
+
+
+def get_document(schema, query, sha256=None, persist=False):
+    """
+    Parse and validate ``query`` against the specified rules, memoized by hash.
+
+    Returns ``(document, errors)``. Only valid documents are cached, and with
+    ``persist`` only valid documents are registered for other workers.
+    """
+    sha256 = sha256 or query_hash(query)
+    cached = document_cache.get(sha256)
+    if cached is not None:
+        return cached[1], []
+
+    document = parse(query)
+    errors = validate(schema, document, specified_rules)
+    if not errors:
+        if persist:
+            PersistedQuery.objects.get_or_create(sha256=sha256, defaults={'query': query})
+        document_cache.set(sha256, (query, document))
+    return document, errors
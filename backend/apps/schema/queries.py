@@ -1,12 +1,126 @@
 import graphene
+from asgiref.sync import sync_to_async
+from graphene_django.debug import DjangoDebug
 from graphene_django.filter import DjangoFilterConnectionField
 from django.db.models import Q, Count
-from .types import OrganizationType, ProjectType, TaskType, TaskCommentType, ProjectStatsType
+from .cost import clamp_list_size
+from .pagination import apaginate, empty_page, paginate
+from .types import (
+    OrganizationType, ProjectType, TaskType, TaskCommentType, ProjectStatsType, DeletionType, JobType,
+    ProjectConnection, TaskConnection, TaskCommentConnection, SearchResultsType,
+    SuggestFieldEnum, SuggestionType,
+)
+from apps.core import archive
+from apps.core.models import Job, Purge
 from apps.organizations.models import Organization
+from apps.organizations.stats import get_stats
 from apps.projects.models import Project
+from apps.search import get_search_backend
+from apps.search.suggest import suggest
 from apps.tasks.models import Task, TaskComment
 
 
+def filter_projects(organization, status=None, search=None):
+    queryset = Project.objects.filter(organization=organization).select_related('organization')
+
+    if status:
+        queryset = queryset.filter(status=status)
+
+    if search:
+        queryset = get_search_backend().search(queryset, search)
+
+    return queryset
+
+
+def filter_tasks(organization, project_id=None, status=None, assignee_email=None, search=None):
+    queryset = Task.objects.for_organization(organization).select_related('project')
+
+    if project_id:
+        queryset = queryset.filter(project_id=project_id)
+
+    if status:
+        queryset = queryset.filter(status=status)
+
+    if assignee_email:
+        queryset = queryset.filter(assignee_email=assignee_email)
+
+    if search:
+        queryset = get_search_backend().search(queryset, search)
+
+    return queryset
+
+
+def filter_comments(organization, task_id=None):
+    queryset = TaskComment.objects.for_organization(organization).select_related('task')
+
+    if task_id:
+        queryset = queryset.filter(task_id=task_id)
+
+    return queryset
+
+
+def archived_comments(organization, task_id):
+    """The comments of ``task_id`` kept in an archive; a live task's comments are all live too."""
+    if Task.objects.for_organization(organization).filter(pk=task_id).exists():
+        return []
+    return archive.archived_comments(organization, task_id)
+
+
+def reads_through(tasks):
+    """Whether a page of a project's tasks may be missing rows kept in its archive."""
+    return not tasks or tasks[0].project.archived_at is not None
+
+
+def with_archived_tasks(organization, tasks, project_id, status=None, assignee_email=None, limit=20, offset=0):
+    """The page of a project's tasks counting those in its archive (see ``apps.core.archive``)."""
+    archived = archive.archived_tasks(organization, project_id, status=status, assignee_email=assignee_email)
+    if not archived:
+        return tasks
+    live = list(filter_tasks(organization, project_id=project_id, status=status, assignee_email=assignee_email))
+    merged = sorted(live + archived, key=lambda task: (task.created_at, task.pk), reverse=True)
+    return merged[offset:offset + limit]
+
+
+def search_results(organization, query, limit):
+    backend = get_search_backend()
+    return SearchResultsType(
+        projects=list(backend.search(filter_projects(organization), query)[:limit]),
+        tasks=list(backend.search(filter_tasks(organization), query)[:limit]),
+        comments=list(backend.search(filter_comments(organization), query)[:limit])
+    )
+
+
+def project_stats(organization):
+    stats = get_stats(organization.pk)
+    return ProjectStatsType(
+        total_projects=stats.total_projects,
+        active_projects=stats.active_projects,
+        completed_projects=stats.completed_projects,
+        total_tasks=stats.total_tasks,
+        completed_tasks=stats.completed_tasks,
+        completion_rate=stats.completion_rate
+    )
+
+
+# Root fields reporting the progress of background work, which moves on
+# without any mutation bumping the tenant's cache version. Operations
+# selecting them bypass the response cache.
+UNCACHED_FIELDS = frozenset({'deletion', 'job'})
+
+EMPTY_STATS = dict(
+    total_projects=0,
+    active_projects=0,
+    completed_projects=0,
+    total_tasks=0,
+    completed_tasks=0,
+    completion_rate=0.0
+)
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+
 class Query(graphene.ObjectType):
     organization = graphene.Field(OrganizationType, slug=graphene.String(required=True))
     organizations = graphene.List(OrganizationType)
@@ -18,6 +132,12 @@ class Query(graphene.ObjectType):
         limit=graphene.Int(),
         offset=graphene.Int()
     )
+    projects_connection = graphene.Field(
+        ProjectConnection,
+        status=graphene.String(),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
     project = graphene.Field(ProjectType, id=graphene.ID(required=True))
     
     tasks = graphene.List(
@@ -29,11 +149,42 @@ class Query(graphene.ObjectType):
         limit=graphene.Int(),
         offset=graphene.Int()
     )
+    tasks_connection = graphene.Field(
+        TaskConnection,
+        project_id=graphene.ID(),
+        status=graphene.String(),
+        assignee_email=graphene.String(),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
     task = graphene.Field(TaskType, id=graphene.ID(required=True))
     
     task_comments = graphene.List(TaskCommentType, task_id=graphene.ID(required=True))
+    task_comments_connection = graphene.Field(
+        TaskCommentConnection,
+        task_id=graphene.ID(required=True),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
     
+    search = graphene.Field(
+        SearchResultsType,
+        query=graphene.String(required=True),
+        limit=graphene.Int()
+    )
+    suggest = graphene.List(
+        SuggestionType,
+        field=SuggestFieldEnum(required=True),
+        query=graphene.String(required=True),
+        limit=graphene.Int()
+    )
+
     project_stats = graphene.Field(ProjectStatsType)
+    deletion = graphene.Field(DeletionType, id=graphene.ID(required=True))
+    job = graphene.Field(JobType, id=graphene.ID(required=True))
+
+    # Filled in by DjangoDebugMiddleware when it runs (see GraphQLView).
+    debug = graphene.Field(DjangoDebug, name='_debug')
 
     def resolve_organization(self, info, slug):
         try:
@@ -49,18 +200,18 @@ class Query(graphene.ObjectType):
         if not organization:
             return []
 
-        queryset = Project.objects.filter(organization=organization)
-        
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(description__icontains=search)
-            )
-        
+        limit = clamp_list_size(limit)
+        queryset = filter_projects(organization, status=status, search=search)
         return queryset[offset:offset + limit]
 
+    def resolve_projects_connection(self, info, status=None, first=None, after=None):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return empty_page(ProjectConnection)
+
+        queryset = filter_projects(organization, status=status)
+        return paginate(queryset, ProjectConnection, first=first, after=after)
+
     def resolve_project(self, info, id):
         organization = getattr(info.context, 'organization', None)
         if not organization:
@@ -76,23 +227,31 @@ class Query(graphene.ObjectType):
         if not organization:
             return []
 
-        queryset = Task.objects.filter(project__organization=organization)
-        
-        if project_id:
-            queryset = queryset.filter(project_id=project_id)
-        
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        if assignee_email:
-            queryset = queryset.filter(assignee_email=assignee_email)
-        
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
-        
-        return queryset[offset:offset + limit]
+        limit = clamp_list_size(limit)
+        queryset = filter_tasks(
+            organization,
+            project_id=project_id,
+            status=status,
+            assignee_email=assignee_email,
+            search=search
+        )
+        tasks = list(queryset[offset:offset + limit])
+        if project_id and not search and reads_through(tasks):
+            tasks = with_archived_tasks(organization, tasks, project_id, status, assignee_email, limit, offset)
+        return tasks
+
+    def resolve_tasks_connection(self, info, project_id=None, status=None, assignee_email=None, first=None, after=None):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return empty_page(TaskConnection)
+
+        queryset = filter_tasks(
+            organization,
+            project_id=project_id,
+            status=status,
+            assignee_email=assignee_email
+        )
+        return paginate(queryset, TaskConnection, first=first, after=after)
 
     def resolve_task(self, info, id):
         organization = getattr(info.context, 'organization', None)
@@ -100,47 +259,195 @@ class Query(graphene.ObjectType):
             return None
 
         try:
-            return Task.objects.get(id=id, project__organization=organization)
+            return Task.objects.for_organization(organization).get(id=id)
         except Task.DoesNotExist:
-            return None
+            return archive.archived_task(organization, id)
 
     def resolve_task_comments(self, info, task_id):
         organization = getattr(info.context, 'organization', None)
         if not organization:
             return []
 
-        return TaskComment.objects.filter(
-            task_id=task_id,
-            task__project__organization=organization
-        )
+        return list(filter_comments(organization, task_id=task_id)) or archived_comments(organization, task_id)
+
+    def resolve_task_comments_connection(self, info, task_id, first=None, after=None):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return empty_page(TaskCommentConnection)
+
+        queryset = filter_comments(organization, task_id=task_id)
+        return paginate(queryset, TaskCommentConnection, first=first, after=after)
+
+    def resolve_search(self, info, query, limit=10):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return SearchResultsType(projects=[], tasks=[], comments=[])
+
+        return search_results(organization, query, clamp_list_size(limit))
+
+    def resolve_suggest(self, info, field, query, limit=10):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return []
+
+        return [
+            SuggestionType(value=value, score=score)
+            for value, score in suggest(organization.pk, field.value, query, clamp_list_size(limit))
+        ]
 
     def resolve_project_stats(self, info):
         organization = getattr(info.context, 'organization', None)
         if not organization:
-            return ProjectStatsType(
-                total_projects=0,
-                active_projects=0,
-                completed_projects=0,
-                total_tasks=0,
-                completed_tasks=0,
-                completion_rate=0.0
+            return ProjectStatsType(**EMPTY_STATS)
+
+        return project_stats(organization)
+
+    def resolve_deletion(self, info, id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return None
+
+        return Purge.objects.filter(id=id, organization_id=organization.pk).first()
+
+    def resolve_job(self, info, id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return None
+
+        return Job.objects.filter(id=id, organization_id=organization.pk).first()
+
+
+class AsyncQuery(Query):
+    """
+    ``Query`` with async resolvers, served by ``AsyncGraphQLView``.
+
+    Lists are fetched with the async ORM before they are returned, so the
+    field resolvers below them never touch the database from the event loop.
+    Search, suggestions and stats run several dependent queries (and the
+    in-memory search backend scans rows in Python), so they run in a thread.
+    """
+
+    class Meta:
+        name = 'Query'
+
+    async def resolve_organization(self, info, slug):
+        return await Organization.objects.filter(slug=slug, is_active=True).afirst()
+
+    async def resolve_organizations(self, info):
+        return await alist(Organization.objects.filter(is_active=True))
+
+    async def resolve_projects(self, info, status=None, search=None, limit=20, offset=0):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return []
+
+        limit = clamp_list_size(limit)
+        if search:
+            return await sync_to_async(list)(
+                filter_projects(organization, status=status, search=search)[offset:offset + limit]
             )
+        return await alist(filter_projects(organization, status=status)[offset:offset + limit])
+
+    async def resolve_projects_connection(self, info, status=None, first=None, after=None):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return empty_page(ProjectConnection)
+
+        queryset = filter_projects(organization, status=status)
+        return await apaginate(queryset, ProjectConnection, first=first, after=after)
+
+    async def resolve_project(self, info, id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return None
+
+        return await Project.objects.filter(id=id, organization=organization).afirst()
+
+    async def resolve_tasks(self, info, project_id=None, status=None, assignee_email=None, search=None, limit=20, offset=0):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return []
+
+        limit = clamp_list_size(limit)
+        filters = dict(project_id=project_id, status=status, assignee_email=assignee_email)
+        if search:
+            return await sync_to_async(list)(
+                filter_tasks(organization, search=search, **filters)[offset:offset + limit]
+            )
+        tasks = await alist(filter_tasks(organization, **filters)[offset:offset + limit])
+        if project_id and reads_through(tasks):
+            tasks = await sync_to_async(with_archived_tasks)(organization, tasks, limit=limit, offset=offset, **filters)
+        return tasks
+
+    async def resolve_tasks_connection(self, info, project_id=None, status=None, assignee_email=None, first=None, after=None):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return empty_page(TaskConnection)
+
+        queryset = filter_tasks(
+            organization,
+            project_id=project_id,
+            status=status,
+            assignee_email=assignee_email
+        )
+        return await apaginate(queryset, TaskConnection, first=first, after=after)
+
+    async def resolve_task(self, info, id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return None
+
+        task = await Task.objects.for_organization(organization).filter(id=id).afirst()
+        return task or await sync_to_async(archive.archived_task)(organization, id)
+
+    async def resolve_task_comments(self, info, task_id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return []
+
+        comments = await alist(filter_comments(organization, task_id=task_id))
+        return comments or await sync_to_async(archived_comments)(organization, task_id)
+
+    async def resolve_task_comments_connection(self, info, task_id, first=None, after=None):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return empty_page(TaskCommentConnection)
+
+        queryset = filter_comments(organization, task_id=task_id)
+        return await apaginate(queryset, TaskCommentConnection, first=first, after=after)
+
+    async def resolve_search(self, info, query, limit=10):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return SearchResultsType(projects=[], tasks=[], comments=[])
+
+        return await sync_to_async(search_results)(organization, query, clamp_list_size(limit))
+
+    async def resolve_suggest(self, info, field, query, limit=10):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return []
+
+        results = await sync_to_async(suggest)(organization.pk, field.value, query, clamp_list_size(limit))
+        return [SuggestionType(value=value, score=score) for value, score in results]
+
+    async def resolve_project_stats(self, info):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return ProjectStatsType(**EMPTY_STATS)
+
+        return await sync_to_async(project_stats)(organization)
+
+    async def resolve_deletion(self, info, id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return None
+
+        return await Purge.objects.filter(id=id, organization_id=organization.pk).afirst()
+
+    async def resolve_job(self, info, id):
+        organization = getattr(info.context, 'organization', None)
+        if not organization:
+            return None
 
-        projects = Project.objects.filter(organization=organization)
-        total_projects = projects.count()
-        active_projects = projects.filter(status='ACTIVE').count()
-        completed_projects = projects.filter(status='COMPLETED').count()
-
-        tasks = Task.objects.filter(project__organization=organization)
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(status='DONE').count()
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-
-        return ProjectStatsType(
-            total_projects=total_projects,
-            active_projects=active_projects,
-            completed_projects=completed_projects,
-            total_tasks=total_tasks,
-            completed_tasks=completed_tasks,
-            completion_rate=round(completion_rate, 2)
-        )
\ No newline at end of file
+        return await Job.objects.filter(id=id, organization_id=organization.pk).afirst()
@@ -1,5 +1,9 @@
 import graphene
-from .queries import Query
-from .mutations import Mutation
+from .queries import AsyncQuery, Query
+from .mutations import AsyncMutation, Mutation
+from .subscriptions import Subscription
 
-schema = graphene.Schema(query=Query, mutation=Mutation)
\ No newline at end of file
+schema = graphene.Schema(query=Query, mutation=Mutation, subscription=Subscription)
+
+# The same API with async resolvers, for AsyncGraphQLView.
+async_schema = graphene.Schema(query=AsyncQuery, mutation=AsyncMutation, subscription=Subscription)
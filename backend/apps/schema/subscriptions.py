@@ -0,0 +1,86 @@
+"""
+GraphQL subscriptions for project and task changes.
+
+Each event names the row that changed and how. The current row is loaded
+once per event and process, however many subscribers receive it, and is
+null for deletions. Deleting a project deletes its tasks without a
+``taskChanged`` event per task; clients drop them on the ``projectChanged``
+deletion. Subscriptions are served over WebSocket (``apps.schema.websocket``).
+"""
+import asyncio
+import graphene
+from graphql import GraphQLError
+from apps.core import events
+from apps.projects.models import Project
+from apps.tasks.models import Task
+from .types import ProjectType, TaskType
+
+
+class ChangeActionEnum(graphene.Enum):
+    CREATED = events.CREATED
+    UPDATED = events.UPDATED
+    DELETED = events.DELETED
+
+
+async def load(event, queryset):
+    """The changed row, fetched once and shared by every subscriber on this loop."""
+    if event.action == events.DELETED:
+        return None
+    loop = asyncio.get_running_loop()
+    cached = getattr(event, 'row', None)
+    if cached is None or cached[0] is not loop:
+        cached = event.row = (loop, asyncio.ensure_future(queryset.filter(pk=event.id).afirst()))
+    return await cached[1]
+
+
+class TaskChangedEvent(graphene.ObjectType):
+    action = ChangeActionEnum()
+    task_id = graphene.ID()
+    project_id = graphene.ID()
+    task = graphene.Field(TaskType, description='The task after the change; null once deleted')
+
+    def resolve_task_id(event, info):
+        return event.id
+
+    async def resolve_task(event, info):
+        return await load(event, Task.objects.select_related('project'))
+
+
+class ProjectChangedEvent(graphene.ObjectType):
+    action = ChangeActionEnum()
+    project_id = graphene.ID()
+    project = graphene.Field(ProjectType, description='The project after the change; null once deleted')
+
+    def resolve_project_id(event, info):
+        return event.id
+
+    async def resolve_project(event, info):
+        return await load(event, Project.objects.select_related('organization'))
+
+
+def _organization(info):
+    organization = getattr(info.context, 'organization', None)
+    if not organization:
+        raise GraphQLError('Organization required')
+    return organization
+
+
+async def _changes(organization_id, kind, project_id=None):
+    async for event in events.get_broker().subscribe(organization_id):
+        if event.kind == kind and (project_id is None or event.project_id == project_id):
+            yield event
+
+
+class Subscription(graphene.ObjectType):
+    task_changed = graphene.Field(
+        TaskChangedEvent,
+        project_id=graphene.ID(description='Only tasks of this project'),
+    )
+    project_changed = graphene.Field(ProjectChangedEvent)
+
+    def subscribe_task_changed(root, info, project_id=None):
+        organization = _organization(info)
+        return _changes(organization.pk, 'task', int(project_id) if project_id else None)
+
+    def subscribe_project_changed(root, info):
+        return _changes(_organization(info).pk, 'project')
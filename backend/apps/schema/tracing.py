@@ -0,0 +1,362 @@
+"""
+Per-resolver tracing for GraphQL operations.
+
+An operation is traced when it is sampled (``GRAPHQL_TRACING['SAMPLE_RATE']``,
+or a sampled W3C ``traceparent`` header) or when the client asks for timings
+with ``X-GraphQL-Trace: 1``. Untraced operations run without the middleware,
+so they pay nothing.
+
+``TracingMiddleware`` times every field resolution, including the trivial
+attribute resolvers and the model-property ones on ``ProjectType``. A
+resolver that returns a lazy queryset is timed up to the return; the
+queries themselves show up under the fields that iterate it. Requested
+traces are attached to the response as Apollo tracing (``extensions.tracing``).
+Traces are exported as OTLP/JSON spans, appended one line per trace to a file
+or posted to an OTLP/HTTP collector from a background thread, so requests never
+wait on the sink.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from inspect import isawaitable
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SAMPLE_RATE': 0.0,
+    # '', 'file' or 'otlp'
+    'EXPORTER': '',
+    'FILE': 'graphql-traces.jsonl',
+    'OTLP_ENDPOINT': 'http://localhost:4318/v1/traces',
+    # "key=value,key2=value2", as in OTEL_EXPORTER_OTLP_HEADERS
+    'OTLP_HEADERS': '',
+    'OTLP_TIMEOUT': 5,
+    'SERVICE_NAME': 'project-management-api',
+    'MAX_QUEUE': 1000,
+}
+
+TRACE_HEADER = 'X-GraphQL-Trace'
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_ERROR = 2
+
+
+def get_tracing_settings():
+    options = dict(DEFAULTS)
+    options.update(getattr(settings, 'GRAPHQL_TRACING', {}))
+    return options
+
+
+def _iso(unix_ns):
+    return datetime.fromtimestamp(unix_ns / 1e9, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _attributes(values):
+    return [{'key': key, 'value': {'stringValue': str(value)}} for key, value in values.items()]
+
+
+class Trace:
+    def __init__(self, requested=False, trace_id=None, parent_span_id=None):
+        self.requested = requested
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.parent_span_id = parent_span_id
+        self.span_id = secrets.token_hex(8)
+        self.start_unix = time.time_ns()
+        self._start = time.perf_counter_ns()
+        self.end_unix = None
+        self.duration = None
+        self.phases = {}
+        self.resolvers = []
+        self.operation_name = None
+        self.operation_type = None
+
+    def offset(self):
+        return time.perf_counter_ns() - self._start
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add_resolver(self, info, start_offset, duration, error=None):
+        self.resolvers.append({
+            'path': info.path.as_list(),
+            'parentType': info.parent_type.name,
+            'fieldName': info.field_name,
+            'returnType': str(info.return_type),
+            'startOffset': start_offset,
+            'duration': duration,
+            'error': error,
+        })
+
+    def finish(self, operation_name=None, operation_type=None):
+        self.duration = self.offset()
+        self.end_unix = self.start_unix + self.duration
+        self.operation_name = operation_name
+        self.operation_type = operation_type
+
+    def apollo(self):
+        """The trace in the Apollo tracing format (version 1)."""
+        return {
+            'version': 1,
+            'startTime': _iso(self.start_unix),
+            'endTime': _iso(self.end_unix),
+            'duration': self.duration,
+            **{
+                phase: {'startOffset': start, 'duration': duration}
+                for phase, (start, duration) in self.phases.items()
+            },
+            'execution': {
+                'resolvers': [
+                    {key: value for key, value in resolver.items() if key != 'error'}
+                    for resolver in self.resolvers
+                ],
+            },
+        }
+
+    def spans(self):
+        """The trace as OTLP spans: the operation, its phases and one span per resolver."""
+        name = f'{self.operation_type or "graphql"} {self.operation_name or "anonymous"}'
+        root = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': name,
+            'kind': SPAN_KIND_SERVER,
+            'startTimeUnixNano': str(self.start_unix),
+            'endTimeUnixNano': str(self.end_unix),
+            'attributes': _attributes({
+                'graphql.operation.name': self.operation_name or '',
+                'graphql.operation.type': self.operation_type or '',
+            }),
+        }
+        if self.parent_span_id:
+            root['parentSpanId'] = self.parent_span_id
+        spans = [root]
+
+        def child(parent_id, name, start_offset, duration, attributes, error=None):
+            span = {
+                'traceId': self.trace_id,
+                'spanId': secrets.token_hex(8),
+                'parentSpanId': parent_id,
+                'name': name,
+                'kind': SPAN_KIND_INTERNAL,
+                'startTimeUnixNano': str(self.start_unix + start_offset),
+                'endTimeUnixNano': str(self.start_unix + start_offset + duration),
+                'attributes': _attributes(attributes),
+            }
+            if error:
+                span['status'] = {'code': STATUS_ERROR, 'message': error}
+            spans.append(span)
+            return span['spanId']
+
+        for phase, (start, duration) in self.phases.items():
+            child(self.span_id, f'graphql.{phase}', start, duration, {})
+
+        # A field's parent is the closest enclosing field, skipping list indices.
+        span_ids = {(): self.span_id}
+        for resolver in self.resolvers:
+            path = tuple(resolver['path'])
+            parent = path[:-1]
+            while parent and isinstance(parent[-1], int):
+                parent = parent[:-1]
+            span_ids[path] = child(
+                span_ids.get(parent, self.span_id),
+                f'{resolver["parentType"]}.{resolver["fieldName"]}',
+                resolver['startOffset'],
+                resolver['duration'],
+                {
+                    'graphql.field.path': '.'.join(str(key) for key in path),
+                    'graphql.field.name': resolver['fieldName'],
+                    'graphql.field.parent_type': resolver['parentType'],
+                    'graphql.field.type': resolver['returnType'],
+                },
+                resolver['error'],
+            )
+        return spans
+
+
+class _Phase:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.trace.offset()
+
+    def __exit__(self, *exc_info):
+        self.trace.phases[self.name] = (self.start, self.trace.offset() - self.start)
+
+
+class TracingMiddleware:
+    """Graphene middleware recording the timing of every resolver into ``trace``."""
+
+    def __init__(self, trace):
+        self.trace = trace
+
+    def resolve(self, next, root, info, **args):
+        start = self.trace.offset()
+        try:
+            result = next(root, info, **args)
+        except Exception as e:
+            self.trace.add_resolver(info, start, self.trace.offset() - start, error=str(e))
+            raise
+        if isawaitable(result):
+            return self.resolve_async(result, info, start)
+        self.trace.add_resolver(info, start, self.trace.offset() - start)
+        return result
+
+    async def resolve_async(self, result, info, start):
+        try:
+            result = await result
+        except Exception as e:
+            self.trace.add_resolver(info, start, self.trace.offset() - start, error=str(e))
+            raise
+        self.trace.add_resolver(info, start, self.trace.offset() - start)
+        return result
+
+
+def start_trace(request):
+    """Return a ``Trace`` when this operation should be traced, otherwise None."""
+    requested = request.headers.get(TRACE_HEADER, '') in ('1', 'true')
+    trace_id = parent_span_id = None
+    sampled = False
+    match = TRACEPARENT.match(request.headers.get('traceparent', ''))
+    if match:
+        trace_id, parent_span_id, flags = match.groups()
+        sampled = bool(int(flags, 16) & 1)
+    if not sampled:
+        rate = get_tracing_settings()['SAMPLE_RATE']
+        sampled = rate > 0 and random.random() < rate
+    if not (requested or sampled):
+        return None
+    return Trace(requested=requested, trace_id=trace_id, parent_span_id=parent_span_id)
+
+
+def otlp_payload(spans, service_name):
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _attributes({'service.name': service_name})},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+        }],
+    }
+
+
+class FileSink:
+    """Appends one OTLP/JSON document per trace, the OpenTelemetry file exporter format."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, payloads):
+        with open(self.path, 'a') as f:
+            for payload in payloads:
+                f.write(json.dumps(payload, separators=(',', ':')) + '\n')
+
+
+class OTLPSink:
+    """Posts batches of traces to an OTLP/HTTP collector as JSON."""
+
+    def __init__(self, endpoint, headers='', timeout=5):
+        self.endpoint = endpoint
+        self.headers = {'Content-Type': 'application/json'}
+        for pair in filter(None, headers.split(',')):
+            key, _, value = pair.partition('=')
+            self.headers[key.strip()] = value.strip()
+        self.timeout = timeout
+
+    def __call__(self, payloads):
+        body = {'resourceSpans': [rs for payload in payloads for rs in payload['resourceSpans']]}
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(body).encode(), headers=self.headers, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BackgroundExporter:
+    """
+    Converts finished traces to spans and hands them to ``sink`` from a daemon
+    thread. When the queue is full, traces are dropped (and counted) rather
+    than slowing requests down.
+    """
+
+    batch_size = 100
+
+    def __init__(self, sink, service_name, max_queue=1000):
+        self.sink = sink
+        self.service_name = service_name
+        self.queue = queue.Queue(max_queue)
+        self.dropped = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, trace):
+        self._ensure_worker()
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until every submitted trace has reached the sink."""
+        self.queue.join()
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so each worker process starts its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                threading.Thread(target=self._run, name='graphql-trace-export', daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.sink([otlp_payload(trace.spans(), self.service_name) for trace in batch])
+            except Exception:
+                logger.exception('Exporting %d GraphQL traces failed', len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+_exporters = {}
+
+
+def get_exporter():
+    options = get_tracing_settings()
+    if options['EXPORTER'] == 'file':
+        key = ('file', options['FILE'])
+    elif options['EXPORTER'] == 'otlp':
+        key = ('otlp', options['OTLP_ENDPOINT'], options['OTLP_HEADERS'], options['OTLP_TIMEOUT'])
+    else:
+        return None
+    exporter = _exporters.get(key)
+    if exporter is None:
+        sink = FileSink(options['FILE']) if key[0] == 'file' else OTLPSink(*key[1:])
+        exporter = _exporters.setdefault(
+            key, BackgroundExporter(sink, options['SERVICE_NAME'], options['MAX_QUEUE'])
+        )
+    return exporter
+
+
+def export(trace):
+    exporter = get_exporter()
+    if exporter is not None:
+        exporter.submit(trace)
@@ -1,27 +1,48 @@
+import asyncio
 import graphene
+from asgiref.sync import sync_to_async
 from graphene_django import DjangoObjectType
+from apps.core.models import Job, Purge
 from apps.organizations.models import Organization
 from apps.projects.models import Project
 from apps.tasks.models import Task, TaskComment
 
 
-class OrganizationType(DjangoObjectType):
-    project_count = graphene.Int()
-    task_count = graphene.Int()
+def resolve_related(instance, name):
+    """
+    Follow a foreign key. Under async execution an uncached relation is
+    loaded in a thread (the caller awaits it) instead of on the event loop.
+    """
+    if instance._meta.get_field(name).is_cached(instance):
+        return getattr(instance, name)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return getattr(instance, name)
+    return sync_to_async(getattr)(instance, name)
+
 
+class OrganizationType(DjangoObjectType):
     class Meta:
         model = Organization
-        fields = ('id', 'name', 'slug', 'contact_email', 'created_at', 'is_active')
+        fields = ('id', 'name', 'slug', 'contact_email', 'created_at', 'is_active', 'project_count', 'task_count')
         convert_choices_to_enum = False
 
-    def resolve_project_count(self, info):
-        return self.project_count
 
-    def resolve_task_count(self, info):
-        return self.task_count
+class SearchFieldsMixin:
+    search_rank = graphene.Float(description='Relevance when the row came from a search')
+    search_headline = graphene.String(
+        description='Matching excerpt with terms wrapped in <b></b>, when the row came from a search'
+    )
 
+    def resolve_search_rank(self, info):
+        return getattr(self, 'search_rank', None)
 
-class ProjectType(DjangoObjectType):
+    def resolve_search_headline(self, info):
+        return getattr(self, 'search_headline', None)
+
+
+class ProjectType(SearchFieldsMixin, DjangoObjectType):
     task_count = graphene.Int()
     completed_tasks = graphene.Int()
     completion_rate = graphene.Float()
@@ -29,7 +50,12 @@ class ProjectType(DjangoObjectType):
 
     class Meta:
         model = Project
-        fields = ('id', 'name', 'description', 'status', 'due_date', 'created_at', 'updated_at', 'organization')
+        fields = (
+            'id', 'name', 'description', 'status', 'due_date', 'created_at', 'updated_at', 'organization', 'archived_at',
+        )
+
+    def resolve_organization(self, info):
+        return resolve_related(self, 'organization')
 
     def resolve_task_count(self, info):
         return self.task_count
@@ -44,26 +70,91 @@ class ProjectType(DjangoObjectType):
         return self.is_overdue
 
 
-class TaskType(DjangoObjectType):
+class TaskType(SearchFieldsMixin, DjangoObjectType):
     is_overdue = graphene.Boolean()
-    comment_count = graphene.Int()
 
     class Meta:
         model = Task
-        fields = ('id', 'title', 'description', 'status', 'priority', 'assignee_email', 'due_date', 'created_at', 'updated_at', 'project')
+        fields = ('id', 'title', 'description', 'status', 'priority', 'assignee_email', 'due_date', 'created_at', 'updated_at', 'project', 'comment_count')
+
+    def resolve_project(self, info):
+        return resolve_related(self, 'project')
 
     def resolve_is_overdue(self, info):
         return self.is_overdue
 
-    def resolve_comment_count(self, info):
-        return self.comment_count
-
 
-class TaskCommentType(DjangoObjectType):
+class TaskCommentType(SearchFieldsMixin, DjangoObjectType):
     class Meta:
         model = TaskComment
         fields = ('id', 'content', 'author_email', 'created_at', 'updated_at', 'task')
 
+    def resolve_task(self, info):
+        return resolve_related(self, 'task')
+
+
+class DeletionType(DjangoObjectType):
+    """Progress of a background project or organization deletion."""
+
+    progress = graphene.Float(description='Share of rows deleted, 0 to 1; null until counted')
+
+    class Meta:
+        model = Purge
+        name = 'Deletion'
+        fields = (
+            'id', 'kind', 'target_id', 'status', 'comments_total', 'tasks_total', 'projects_total',
+            'comments_deleted', 'tasks_deleted', 'projects_deleted', 'error', 'created_at', 'completed_at',
+        )
+        convert_choices_to_enum = False
+
+    def resolve_progress(self, info):
+        return self.progress
+
+
+class JobType(DjangoObjectType):
+    """A background job run on the organization's behalf."""
+
+    class Meta:
+        model = Job
+        name = 'Job'
+        fields = (
+            'id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'result', 'error',
+            'created_at', 'completed_at',
+        )
+        convert_choices_to_enum = False
+
+
+class ProjectConnection(graphene.relay.Connection):
+    class Meta:
+        node = ProjectType
+
+
+class TaskConnection(graphene.relay.Connection):
+    class Meta:
+        node = TaskType
+
+
+class TaskCommentConnection(graphene.relay.Connection):
+    class Meta:
+        node = TaskCommentType
+
+
+class SearchResultsType(graphene.ObjectType):
+    projects = graphene.List(ProjectType)
+    tasks = graphene.List(TaskType)
+    comments = graphene.List(TaskCommentType)
+
+
+class SuggestFieldEnum(graphene.Enum):
+    TASK_TITLE = 'TASK_TITLE'
+    ASSIGNEE_EMAIL = 'ASSIGNEE_EMAIL'
+    PROJECT_NAME = 'PROJECT_NAME'
+
+
+class SuggestionType(graphene.ObjectType):
+    value = graphene.String()
+    score = graphene.Float()
+
 
 class ProjectStatsType(graphene.ObjectType):
     total_projects = graphene.Int()
@@ -71,4 +162,30 @@ class ProjectStatsType(graphene.ObjectType):
     completed_projects = graphene.Int()
     total_tasks = graphene.Int()
     completed_tasks = graphene.Int()
-    completion_rate = graphene.Float()
\ No newline at end of file
+    completion_rate = graphene.Float()
+
+
+class BulkItemErrorType(graphene.ObjectType):
+    index = graphene.Int(description='Position of the rejected item in the request')
+    id = graphene.ID()
+    message = graphene.String()
+
+
+class BulkTaskCreateInput(graphene.InputObjectType):
+    project_id = graphene.ID(required=True)
+    title = graphene.String(required=True)
+    description = graphene.String()
+    status = graphene.String()
+    priority = graphene.String()
+    assignee_email = graphene.String()
+    due_date = graphene.DateTime()
+
+
+class BulkTaskUpdateInput(graphene.InputObjectType):
+    id = graphene.ID(required=True)
+    title = graphene.String()
+    description = graphene.String()
+    status = graphene.String()
+    priority = graphene.String()
+    assignee_email = graphene.String()
+    due_date = graphene.DateTime()
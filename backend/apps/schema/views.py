@@ -0,0 +1,409 @@
+from contextlib import nullcontext
+from inspect import isawaitable
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotAllowed, HttpResponseBadRequest
+from django.middleware.csrf import get_token
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.debug import DjangoDebugMiddleware
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from apps.core.response_cache import response_cache
+from apps.core.routers import read_from_replicas
+from graphql import (
+    ExecutionResult, FieldNode, FragmentDefinitionNode, FragmentSpreadNode, GraphQLError, InlineFragmentNode,
+    OperationType, execute, get_operation_ast, validate,
+)
+from .cost import make_cost_rule
+from .metrics import Observation
+from .tracing import TracingMiddleware, export as export_trace, start_trace
+from .persisted import get_document, get_persisted_hash, query_hash, resolve_query
+from .queries import UNCACHED_FIELDS
+from .schema import async_schema
+
+
+def root_fields(document, operation):
+    """Names of the root fields ``operation`` selects, through fragments too."""
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    names, pending, seen = set(), [operation.selection_set], set()
+    while pending:
+        for selection in pending.pop().selections:
+            if isinstance(selection, FieldNode):
+                names.add(selection.name.value)
+            elif isinstance(selection, InlineFragmentNode):
+                pending.append(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode) and selection.name.value not in seen:
+                seen.add(selection.name.value)
+                if selection.name.value in fragments:
+                    pending.append(fragments[selection.name.value].selection_set)
+    return names
+
+
+class PreparedOperation:
+    """A validated operation, ready for ``graphql.execute``."""
+
+    def __init__(self, options, type, cache_key, extensions):
+        self.options = options
+        self.type = type
+        self.cache_key = cache_key
+        self.extensions = extensions
+        # The ReplicaSession of a query operation, once executed.
+        self.replica_session = None
+
+    def read_from_replicas(self):
+        return read_from_replicas(self.type == OperationType.QUERY)
+
+
+class GraphQLView(BaseGraphQLView):
+    """
+    GraphQL endpoint with persisted queries and a parsed-document cache.
+
+    The spec validation rules run once per distinct document (see
+    ``apps.schema.persisted``). The query cost rule depends on the variables,
+    so it runs on every request, and over-budget operations are rejected
+    before execution. The computed cost is reported under ``extensions.cost``.
+
+    Query operations for a tenant are served from the response cache when
+    possible, unless they select one of ``UNCACHED_FIELDS``. Mutations bump
+    the tenant's cache version afterwards. Query operations read from the
+    database replicas, if any (see ``apps.core.routers``).
+
+    Every operation is measured by ``apps.schema.metrics``. The SQL-capturing
+    ``DjangoDebugMiddleware`` (the ``_debug`` field) only runs under DEBUG or
+    when the ``X-GraphQL-Debug`` header carries ``GRAPHQL_DEBUG_TOKEN``.
+    Sampled or requested operations are traced per resolver (see
+    ``apps.schema.tracing``).
+    """
+
+    observation = None
+    trace = None
+
+    def debug_enabled(self, request):
+        if settings.DEBUG:
+            return True
+        token = getattr(settings, 'GRAPHQL_DEBUG_TOKEN', '')
+        return bool(token) and constant_time_compare(request.headers.get('X-GraphQL-Debug', ''), token)
+
+    def get_middleware(self, request):
+        middleware = list(self.middleware or [])
+        if self.debug_enabled(request):
+            middleware.append(DjangoDebugMiddleware())
+        if self.trace:
+            middleware.append(TracingMiddleware(self.trace))
+        return middleware
+
+    def phase(self, name):
+        return self.trace.phase(name) if self.trace else nullcontext()
+
+    def get_validation_rules(self, request, variables, operation_name, extensions):
+        cost = extensions.setdefault('cost', {})
+        return [make_cost_rule(variables, operation_name, cost)]
+
+    def get_cache_organization(self, request):
+        if 'no-cache' in request.headers.get('Cache-Control', '') or self.debug_enabled(request):
+            return None
+        if self.trace and self.trace.requested:
+            return None
+        return getattr(request, 'organization', None) or None
+
+    def prepare_operation(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """
+        Everything before execution: persisted query lookup, parsing,
+        validation, the cost check and the response cache lookup.
+
+        Returns a ``PreparedOperation``, or the ``ExecutionResult`` (or None,
+        to show GraphiQL) that ends the request early.
+        """
+        sha256 = get_persisted_hash(request, data)
+        register = bool(sha256 and query)
+        if sha256:
+            try:
+                query = resolve_query(sha256, query)
+            except GraphQLError as e:
+                return ExecutionResult(errors=[e])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+        try:
+            # Spec validation is part of parsing: both are cached per document.
+            with self.phase('parsing'):
+                document, validation_errors = get_document(schema, query, sha256, persist=register)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+        operation_ast = get_operation_ast(document, operation_name)
+        if self.observation and operation_ast:
+            self.observation.type = operation_ast.operation.value
+            if not self.observation.name and operation_ast.name:
+                self.observation.name = operation_ast.name.value
+        if validation_errors:
+            return ExecutionResult(errors=validation_errors)
+        if operation_ast and operation_ast.operation == OperationType.SUBSCRIPTION:
+            return ExecutionResult(errors=[GraphQLError('Subscriptions are only available over WebSocket.')])
+        if request.method.lower() == "get":
+            if operation_ast and operation_ast.operation != OperationType.QUERY:
+                if show_graphiql:
+                    return None
+
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["POST"],
+                        "Can only perform a {} operation from a POST request.".format(
+                            operation_ast.operation.value
+                        ),
+                    )
+                )
+
+        extensions = {}
+        rules = self.get_validation_rules(request, variables, operation_name, extensions)
+        with self.phase('validation'):
+            validation_errors = validate(schema, document, rules)
+        if validation_errors:
+            return ExecutionResult(errors=validation_errors, extensions=extensions)
+
+        operation_type = operation_ast.operation if operation_ast else None
+        cache_organization = self.get_cache_organization(request)
+        cache_key = None
+        if (
+            operation_type == OperationType.QUERY and cache_organization
+            and not root_fields(document, operation_ast) & UNCACHED_FIELDS
+        ):
+            cache_key = response_cache.key(
+                cache_organization.pk, sha256 or query_hash(query), variables, operation_name
+            )
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return ExecutionResult(data=cached, extensions={**extensions, 'responseCache': 'HIT'})
+            extensions['responseCache'] = 'MISS'
+
+        options = {
+            "schema": schema,
+            "document": document,
+            "root_value": self.get_root_value(request),
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "context_value": self.get_context(request),
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            options["execution_context_class"] = self.execution_context_class
+        return PreparedOperation(options, operation_type, cache_key, extensions)
+
+    def complete_operation(self, request, operation, result):
+        if operation.cache_key and not result.errors:
+            timeout = None
+            if operation.replica_session and operation.replica_session.used_replica:
+                # A replica may not have caught up with the latest mutation
+                # yet; keep its data no longer than writers stick to the primary.
+                timeout = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+            response_cache.set(operation.cache_key, result.data, timeout)
+        # Bump even when this request bypassed the cache for reading.
+        organization = getattr(request, 'organization', None)
+        if operation.type == OperationType.MUTATION and organization:
+            response_cache.bump(organization.pk)
+
+        result.extensions = {**(result.extensions or {}), **operation.extensions}
+        return result
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        operation = self.prepare_operation(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if not isinstance(operation, PreparedOperation):
+            return operation
+
+        try:
+            if operation.type == OperationType.MUTATION and (
+                graphene_settings.ATOMIC_MUTATIONS is True
+                or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+            ):
+                with transaction.atomic():
+                    result = execute(**operation.options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+            else:
+                with operation.read_from_replicas() as operation.replica_session:
+                    result = execute(**operation.options)
+        except Exception as e:
+            return ExecutionResult(errors=[e], extensions=operation.extensions)
+
+        return self.complete_operation(request, operation, result)
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        self.trace = start_trace(request)
+        with Observation(operation_name) as self.observation:
+            try:
+                execution_result = self.execute_graphql_request(
+                    request, data, query, variables, operation_name, show_graphiql
+                )
+            finally:
+                self.release_debug(request)
+            result, status_code = self.encode_response(request, execution_result, id, show_graphiql)
+        if self.trace:
+            export_trace(self.trace)
+        return result, status_code
+
+    def release_debug(self, request):
+        debug = getattr(request, 'django_debug', None)
+        if debug:
+            # Unwrap the cursors even when no ``_debug`` field was resolved.
+            debug.disable_instrumentation()
+            del request.django_debug
+
+    def encode_response(self, request, execution_result, id, show_graphiql):
+        self.observation.failed = bool(execution_result and execution_result.errors)
+        if self.trace:
+            self.trace.finish(self.observation.name, self.observation.type)
+            if self.trace.requested and execution_result:
+                execution_result.extensions = {
+                    **(execution_result.extensions or {}), 'tracing': self.trace.apollo()
+                }
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if execution_result.extensions:
+                response["extensions"] = execution_result.extensions
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+
+class AsyncGraphQLView(GraphQLView):
+    """
+    ``GraphQLView`` for ASGI workers, executing ``apps.schema.async_schema``.
+
+    The request waits on the database without holding the worker: the async
+    resolvers await the ORM, and the independent root fields of a query run
+    concurrently. Django runs a request's synchronous ORM calls on one
+    thread with one connection, so those fields' SQL statements take turns
+    on that connection rather than overlapping. Preparation (persisted
+    queries, parsing, validation, the response cache) and completion run in
+    that thread too.
+
+    Mutation fields still run one after another, each ``mutate`` in its own
+    thread call, and ``ATOMIC_MUTATIONS`` does not apply: Django has no async
+    transactions. ``DjangoDebugMiddleware`` is never added, as it can only
+    instrument the connections of the thread it runs in.
+    """
+
+    view_is_async = True
+
+    def __init__(self, schema=None, **kwargs):
+        super().__init__(schema=schema or async_schema, **kwargs)
+
+    def debug_enabled(self, request):
+        return False
+
+    async def dispatch(self, request, *args, **kwargs):
+        # ensure_csrf_cookie is sync-only in this Django version; this is
+        # what it does, with CsrfViewMiddleware setting the cookie.
+        get_token(request)
+        organization = getattr(request, 'organization', None)
+        if isinstance(organization, SimpleLazyObject):
+            # Under WSGI OrganizationMiddleware ran synchronously and left the
+            # tenant lazy; load it here, as the resolvers cannot.
+            await sync_to_async(bool)(organization)
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                    )
+                )
+
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return super().dispatch(request, *args, **kwargs)
+
+            if self.batch:
+                responses = [await self.get_response(request, entry) for entry in data]
+                result = "[{}]".format(",".join([response[0] for response in responses]))
+                status_code = (
+                    responses
+                    and max(responses, key=lambda response: response[1])[1]
+                    or 200
+                )
+            else:
+                result, status_code = await self.get_response(request, data)
+
+            return HttpResponse(status=status_code, content=result, content_type="application/json")
+
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(request, {"errors": [self.format_error(e)]})
+            return response
+
+    async def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        self.trace = start_trace(request)
+        async with Observation(operation_name) as self.observation:
+            execution_result = await self.execute_graphql_request(
+                request, data, query, variables, operation_name, show_graphiql
+            )
+            result, status_code = self.encode_response(request, execution_result, id, show_graphiql)
+        if self.trace:
+            export_trace(self.trace)
+        return result, status_code
+
+    async def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        operation = await sync_to_async(self.prepare_operation)(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if not isinstance(operation, PreparedOperation):
+            return operation
+
+        try:
+            with operation.read_from_replicas() as operation.replica_session:
+                result = execute(**operation.options)
+                if isawaitable(result):
+                    result = await result
+        except Exception as e:
+            return ExecutionResult(errors=[e], extensions=operation.extensions)
+
+        return await sync_to_async(self.complete_operation)(request, operation, result)
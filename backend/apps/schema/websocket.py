@@ -0,0 +1,183 @@
+"""
+GraphQL subscriptions over WebSocket, speaking the ``graphql-transport-ws``
+protocol (the one implemented by the ``graphql-ws`` client library).
+
+``GraphQLWebSocketApp`` is a plain ASGI application; ``project_management.asgi``
+routes WebSocket connections for ``/graphql/`` to it. The tenant comes from
+the ``organizationSlug`` field of the ``connection_init`` payload (browsers
+cannot set headers on a WebSocket) or from the ``X-Organization-Slug``
+header. Only subscription operations are accepted; queries and mutations
+stay on HTTP.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from graphql import ExecutionResult, GraphQLError, OperationType, get_operation_ast, subscribe, validate
+from apps.core.middleware import aresolve_organization
+from .cost import make_cost_rule
+from .persisted import get_document
+from .schema import async_schema
+
+PROTOCOL = 'graphql-transport-ws'
+
+# Close codes defined by the protocol.
+BAD_REQUEST = 4400
+UNAUTHORIZED = 4401
+FORBIDDEN = 4403
+SUBPROTOCOL_NOT_ACCEPTABLE = 4406
+INIT_TIMEOUT = 4408
+SUBSCRIBER_EXISTS = 4409
+TOO_MANY_INITS = 4429
+
+
+class Close(Exception):
+    def __init__(self, code, reason):
+        self.code = code
+        self.reason = reason
+
+
+class GraphQLWebSocketApp:
+    def __init__(self, schema=None, init_timeout=10):
+        self.schema = schema or async_schema
+        self.init_timeout = init_timeout
+
+    async def __call__(self, scope, receive, send):
+        await Connection(self, scope, receive, send).run()
+
+
+class Connection:
+    def __init__(self, app, scope, receive, send):
+        self.app = app
+        self.scope = scope
+        self.receive = receive
+        self._send = send
+        self.context = None
+        self.initialised = False
+        self.subscriptions = {}
+
+    @property
+    def schema(self):
+        return self.app.schema.graphql_schema
+
+    def header(self, name):
+        name = name.lower().encode()
+        for key, value in self.scope.get('headers', []):
+            if key == name:
+                return value.decode('latin-1')
+        return None
+
+    async def send(self, message):
+        await self._send({'type': 'websocket.send', 'text': json.dumps(message)})
+
+    async def run(self):
+        if (await self.receive())['type'] != 'websocket.connect':
+            return
+        if PROTOCOL not in self.scope.get('subprotocols', []):
+            await self._send({'type': 'websocket.close', 'code': SUBPROTOCOL_NOT_ACCEPTABLE})
+            return
+        await self._send({'type': 'websocket.accept', 'subprotocol': PROTOCOL})
+
+        deadline = asyncio.get_running_loop().time() + self.app.init_timeout
+        try:
+            while True:
+                if self.context is None:
+                    timeout = deadline - asyncio.get_running_loop().time()
+                    try:
+                        message = await asyncio.wait_for(self.receive(), max(timeout, 0))
+                    except asyncio.TimeoutError:
+                        raise Close(INIT_TIMEOUT, 'Connection initialisation timeout')
+                else:
+                    message = await self.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                if message['type'] == 'websocket.receive':
+                    await self.handle(message.get('text') or message.get('bytes'))
+        except Close as e:
+            await self._send({'type': 'websocket.close', 'code': e.code, 'reason': e.reason})
+        finally:
+            for task in list(self.subscriptions.values()):
+                task.cancel()
+
+    async def handle(self, raw):
+        try:
+            message = json.loads(raw)
+            type = message['type']
+        except (TypeError, ValueError, KeyError):
+            raise Close(BAD_REQUEST, 'Invalid message received')
+
+        if type == 'connection_init':
+            await self.init(message.get('payload') or {})
+        elif type == 'ping':
+            await self.send({'type': 'pong'})
+        elif type == 'pong':
+            pass
+        elif type == 'subscribe':
+            if self.context is None:
+                raise Close(UNAUTHORIZED, 'Unauthorized')
+            id = message.get('id')
+            if not isinstance(id, str) or not isinstance(message.get('payload'), dict):
+                raise Close(BAD_REQUEST, 'Invalid message received')
+            if id in self.subscriptions:
+                raise Close(SUBSCRIBER_EXISTS, f'Subscriber for {id} already exists')
+            self.subscriptions[id] = asyncio.ensure_future(self.subscribe(id, message['payload']))
+        elif type == 'complete':
+            task = self.subscriptions.pop(message.get('id'), None)
+            if task:
+                task.cancel()
+        else:
+            raise Close(BAD_REQUEST, 'Invalid message received')
+
+    async def init(self, payload):
+        if self.initialised:
+            raise Close(TOO_MANY_INITS, 'Too many initialisation requests')
+        self.initialised = True
+        slug = payload.get('organizationSlug') or self.header('X-Organization-Slug')
+        organization = await aresolve_organization(slug) if slug else None
+        if slug and organization is None:
+            raise Close(FORBIDDEN, 'Forbidden')
+        self.context = SimpleNamespace(organization=organization, scope=self.scope)
+        await self.send({'type': 'connection_ack'})
+
+    async def subscribe(self, id, payload):
+        try:
+            result = await self.execute(payload)
+            if isinstance(result, ExecutionResult):
+                await self.send({'id': id, 'type': 'error', 'payload': [e.formatted for e in result.errors]})
+                return
+            try:
+                async for item in result:
+                    await self.send({'id': id, 'type': 'next', 'payload': item.formatted})
+            finally:
+                await result.aclose()
+            await self.send({'id': id, 'type': 'complete'})
+        finally:
+            if self.subscriptions.get(id) is asyncio.current_task():
+                del self.subscriptions[id]
+
+    async def execute(self, payload):
+        query = payload.get('query')
+        variables = payload.get('variables') or {}
+        operation_name = payload.get('operationName')
+        if not isinstance(query, str):
+            return ExecutionResult(errors=[GraphQLError('Must provide query string.')])
+
+        try:
+            document, errors = get_document(self.schema, query)
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e])
+        if errors:
+            return ExecutionResult(errors=errors)
+        operation = get_operation_ast(document, operation_name)
+        if operation is None or operation.operation != OperationType.SUBSCRIPTION:
+            return ExecutionResult(errors=[GraphQLError('Only subscriptions are served over WebSocket.')])
+        errors = validate(self.schema, document, [make_cost_rule(variables, operation_name, {})])
+        if errors:
+            return ExecutionResult(errors=errors)
+
+        return await subscribe(
+            self.schema,
+            document,
+            context_value=self.context,
+            variable_values=variables,
+            operation_name=operation_name,
+        )
@@ -0,0 +1,148 @@
+"""
+Ranked full-text search over Project, Task and TaskComment.
+
+Each searchable model declares ``SEARCH_FIELDS`` as ``(field, weight)`` pairs
+with PostgreSQL weights ``'A'``..``'D'``. A backend takes a queryset of one of
+those models and returns it filtered to matches, annotated with
+``search_rank`` and ``search_headline`` and ordered best match first.
+"""
+import math
+import re
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, FloatField, TextField, Value, When
+from django.db.models.functions import Concat
+from django.utils.module_loading import import_string
+
+HIGHLIGHT_START = '<b>'
+HIGHLIGHT_STOP = '</b>'
+
+# Same relative weights PostgreSQL's ts_rank uses for D, C, B, A.
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+
+def _document(model):
+    fields = [F(field) for field, _ in model.SEARCH_FIELDS]
+    if len(fields) == 1:
+        return fields[0]
+    separated = []
+    for field in fields:
+        separated.extend([field, Value(' ')])
+    return Concat(*separated[:-1], output_field=TextField())
+
+
+class SearchBackend:
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Queries the trigger-maintained ``search_vector`` column through its GIN index."""
+
+    config = 'english'
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, search_type='websearch', config=self.config)
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(
+                search_rank=SearchRank(F('search_vector'), search_query),
+                search_headline=SearchHeadline(
+                    _document(queryset.model),
+                    search_query,
+                    config=self.config,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                ),
+            )
+            .order_by('-search_rank', '-created_at')
+        )
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+class InMemorySearchBackend(SearchBackend):
+    """
+    Inverted index built per call over the queryset's rows.
+
+    Used where PostgreSQL is not available (SQLite in tests and local
+    development). Every query term must match the start of a token,
+    which stands in for PostgreSQL's stemming.
+    """
+
+    headline_words = 35
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        model = queryset.model
+        if not terms:
+            return queryset.none()
+
+        index = defaultdict(lambda: defaultdict(float))
+        documents = {}
+        for row in queryset.values_list('pk', *(field for field, _ in model.SEARCH_FIELDS)):
+            pk, values = row[0], row[1:]
+            documents[pk] = ' '.join(value or '' for value in values)
+            for (field, weight), value in zip(model.SEARCH_FIELDS, values):
+                tokens = tokenize(value)
+                norm = 1 + math.log(1 + len(tokens))
+                for token in tokens:
+                    index[token][pk] += WEIGHTS[weight] / norm
+
+        scores = None
+        for term in terms:
+            matched = defaultdict(float)
+            for token, postings in index.items():
+                if token.startswith(term):
+                    for pk, score in postings.items():
+                        matched[pk] += score
+            if scores is None:
+                scores = matched
+            else:
+                scores = {pk: scores[pk] + score for pk, score in matched.items() if pk in scores}
+        if not scores:
+            return queryset.none()
+
+        ranks = [When(pk=pk, then=Value(score)) for pk, score in scores.items()]
+        headlines = [
+            When(pk=pk, then=Value(self.headline(documents[pk], terms)))
+            for pk in scores
+        ]
+        return (
+            queryset.filter(pk__in=list(scores))
+            .annotate(
+                search_rank=Case(*ranks, output_field=FloatField()),
+                search_headline=Case(*headlines, output_field=TextField()),
+            )
+            .order_by('-search_rank', '-created_at')
+        )
+
+    def headline(self, text, terms):
+        words = text.split()
+        matches = {
+            index for index, word in enumerate(words)
+            if any(token.startswith(term) for token in tokenize(word) for term in terms)
+        }
+        start = max(min(matches) - 5, 0) if matches else 0
+        window = words[start:start + self.headline_words]
+        return ' '.join(
+            f'{HIGHLIGHT_START}{word}{HIGHLIGHT_STOP}' if start + offset in matches else word
+            for offset, word in enumerate(window)
+        )
+
+
+def get_search_backend():
+    backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return InMemorySearchBackend()
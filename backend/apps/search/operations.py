@@ -0,0 +1,69 @@
+from django.db import migrations
+
+
+def _vector_expression(weighted_fields, config, row='NEW'):
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}', coalesce({row}.{field}, '')), '{weight}')"
+        for field, weight in weighted_fields
+    )
+
+
+def install_search_vector(table, weighted_fields, config='english'):
+    """
+    Maintain ``<table>.search_vector`` with a trigger and index it with GIN.
+
+    Only runs on PostgreSQL; other backends keep the column empty and are
+    served by the in-memory search backend.
+    """
+    columns = ', '.join(field for field, _ in weighted_fields)
+    forward_sql = f"""
+        CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {_vector_expression(weighted_fields, config)};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {columns} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update();
+
+        UPDATE {table} SET search_vector = {_vector_expression(weighted_fields, config, row=table)};
+
+        CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector);
+    """
+    reverse_sql = f"""
+        DROP INDEX IF EXISTS {table}_search_vector_gin;
+        DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table};
+        DROP FUNCTION IF EXISTS {table}_search_vector_update();
+    """
+
+    def forward(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(forward_sql)
+
+    def reverse(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(reverse_sql)
+
+    return migrations.RunPython(forward, reverse)
+
+
+def install_trigram_index(table, column):
+    """Create a pg_trgm GIN index on ``table.column`` (PostgreSQL only)."""
+    index = f'{table}_{column}_trgm'
+    forward_sql = f"""
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX {index} ON {table} USING gin ({column} gin_trgm_ops);
+    """
+    reverse_sql = f'DROP INDEX IF EXISTS {index};'
+
+    def forward(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(forward_sql)
+
+    def reverse(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(reverse_sql)
+
+    return migrations.RunPython(forward, reverse)
@@ -0,0 +1,73 @@
+"""
+Typeahead suggestions for task titles, assignee emails and project names.
+
+On PostgreSQL each lookup is one ``<%`` (word similarity) query served by a
+pg_trgm GIN index. Results are cached per organization for a few seconds,
+which absorbs the burst of identical requests a typing user produces.
+"""
+from difflib import SequenceMatcher
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from apps.core.cache import TTLCache
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+FIELDS = {
+    'TASK_TITLE': (Task, 'title'),
+    'ASSIGNEE_EMAIL': (Task, 'assignee_email'),
+    'PROJECT_NAME': (Project, 'name'),
+}
+
+MAX_SUGGESTIONS = 25
+
+suggestion_cache = TTLCache(
+    maxsize=getattr(settings, 'SUGGEST_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'SUGGEST_CACHE_TTL', 5),
+)
+
+
+def _postgres_suggest(queryset, field, query, limit):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    rows = (
+        queryset.filter(**{f'{field}__trigram_word_similar': query})
+        .values(field)
+        .annotate(score=Max(TrigramWordSimilarity(query, field)))
+        .order_by('-score', field)[:limit]
+    )
+    return [(row[field], row['score']) for row in rows]
+
+
+def _simple_suggest(queryset, field, query, limit):
+    needle = query.lower()
+    values = queryset.filter(**{f'{field}__icontains': query}).order_by().values_list(field, flat=True).distinct()
+    scored = [
+        (value, SequenceMatcher(None, needle, value.lower()).ratio())
+        for value in values
+    ]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+
+def suggest(organization_id, field, query, limit=10):
+    """Return up to ``limit`` ``(value, score)`` pairs, best match first."""
+    query = query.strip()
+    limit = max(0, min(limit, MAX_SUGGESTIONS))
+    if not query or not limit:
+        return []
+
+    key = (organization_id, field, query.lower(), limit)
+    cached = suggestion_cache.get(key)
+    if cached is not None:
+        return cached
+
+    model, column = FIELDS[field]
+    queryset = model.objects.for_organization(organization_id).exclude(**{column: ''})
+    if connection.vendor == 'postgresql':
+        results = _postgres_suggest(queryset, column, query, limit)
+    else:
+        results = _simple_suggest(queryset, column, query, limit)
+
+    suggestion_cache.set(key, results)
+    return results
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.core.routers import ReplicaChangeListMixin
 from .models import Task, TaskComment
 
 
@@ -9,7 +10,7 @@ class TaskCommentInline(admin.TabularInline):
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['title', 'project', 'status', 'priority', 'assignee_email', 'due_date', 'is_overdue', 'created_at']
     list_filter = ['status', 'priority', 'project__organization', 'project', 'due_date', 'created_at']
     search_fields = ['title', 'description', 'assignee_email', 'project__name']
@@ -25,10 +26,19 @@ class TaskAdmin(admin.ModelAdmin):
         return obj.comment_count
     comment_count.short_description = 'Comments'
 
+    def delete_queryset(self, request, queryset):
+        # Delete one by one so project and organization counters follow.
+        for obj in queryset:
+            obj.delete()
+
 
 @admin.register(TaskComment)
-class TaskCommentAdmin(admin.ModelAdmin):
+class TaskCommentAdmin(ReplicaChangeListMixin, admin.ModelAdmin):
     list_display = ['task', 'author_email', 'created_at']
     list_filter = ['created_at', 'task__project__organization']
     search_fields = ['content', 'author_email', 'task__title']
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['created_at', 'updated_at']
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            obj.delete()
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+Batched task writes for the bulk mutations.
+
+Each operation checks tenancy with one query over all the ids it was given,
+validates every item in memory, and writes the valid ones together inside a
+single transaction: ``bulk_create`` for inserts, one ``UPDATE ... WHERE id IN``
+when every item makes the same change (``bulk_update`` otherwise), and one
+``DELETE`` for removals. Items that fail are reported by position and skipped,
+so a bad row never blocks the rest of the batch.
+
+These paths skip ``Task.save()``/``delete()``, so the counter columns are
+adjusted here with one net update per affected project.
+"""
+from collections import Counter
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from apps.core import counters
+from apps.projects.models import Project
+from .models import Task
+
+EDITABLE_FIELDS = ('title', 'description', 'status', 'priority', 'assignee_email', 'due_date')
+
+
+class BatchTooLarge(ValueError):
+    pass
+
+
+def get_max_batch_size():
+    return getattr(settings, 'BULK_TASK_MAX_ITEMS', 500)
+
+
+def _check_size(items):
+    max_batch_size = get_max_batch_size()
+    if len(items) > max_batch_size:
+        raise BatchTooLarge(f'At most {max_batch_size} tasks can be changed at once')
+
+
+def _item_error(index, message, id=None):
+    return {'index': index, 'id': id, 'message': message}
+
+
+def format_validation_error(error):
+    if hasattr(error, 'message_dict'):
+        return '; '.join(
+            f'{field}: {" ".join(messages)}' for field, messages in error.message_dict.items()
+        )
+    return ' '.join(error.messages)
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _validate(task, fields=None):
+    # Both come from a project already checked to belong to the tenant.
+    exclude = ['project', 'organization']
+    if fields is not None:
+        exclude += [field.name for field in Task._meta.fields if field.name not in fields]
+    task.clean_fields(exclude=exclude)
+
+
+def create_tasks(organization, items):
+    """
+    Insert ``items`` (dicts with ``project_id`` and task fields).
+
+    Returns ``(tasks, errors)``; ``errors`` holds one entry per rejected item.
+    """
+    _check_size(items)
+    project_ids = {_parse_id(item.get('project_id')) for item in items}
+    projects = Project.objects.filter(organization=organization, pk__in=project_ids).in_bulk()
+
+    tasks, errors = [], []
+    for index, item in enumerate(items):
+        project = projects.get(_parse_id(item.get('project_id')))
+        if project is None:
+            errors.append(_item_error(index, 'Project not found'))
+            continue
+        task = Task(project=project, organization_id=organization.pk, **{
+            field: item[field] for field in EDITABLE_FIELDS if item.get(field) is not None
+        })
+        try:
+            _validate(task)
+        except ValidationError as e:
+            errors.append(_item_error(index, format_validation_error(e)))
+            continue
+        tasks.append(task)
+
+    if tasks:
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            counters.tasks_bulk_changed(
+                organization.pk, Counter((task.project_id, task.status) for task in tasks), projects
+            )
+    return tasks, errors
+
+
+def update_tasks(organization, items):
+    """
+    Apply per-item changes to existing tasks (dicts with ``id`` and the fields to set).
+
+    Returns ``(tasks, errors)``; each task appears once however many items named it.
+    """
+    _check_size(items)
+    ids = {_parse_id(item.get('id')) for item in items}
+    existing = (
+        Task.objects.for_organization(organization).filter(pk__in=ids)
+        .select_related('project')
+        .in_bulk()
+    )
+
+    now = timezone.now()
+    updated, errors, changes, deltas = {}, [], set(), Counter()
+    for index, item in enumerate(items):
+        task = existing.get(_parse_id(item.get('id')))
+        if task is None:
+            errors.append(_item_error(index, 'Task not found', item.get('id')))
+            continue
+        values = {field: item[field] for field in EDITABLE_FIELDS if item.get(field) is not None}
+        previous = {field: getattr(task, field) for field in values}
+        for field, value in values.items():
+            setattr(task, field, value)
+        try:
+            _validate(task, values)
+        except ValidationError as e:
+            for field, value in previous.items():
+                setattr(task, field, value)
+            errors.append(_item_error(index, format_validation_error(e), item.get('id')))
+            continue
+        if task.status != previous.get('status', task.status):
+            deltas[(task.project_id, previous['status'])] -= 1
+            deltas[(task.project_id, task.status)] += 1
+        task.updated_at = now
+        changes.add(tuple(sorted(values.items())))
+        updated[task.pk] = task
+
+    tasks = list(updated.values())
+    if not tasks:
+        return tasks, errors
+    with transaction.atomic():
+        if len(changes) == 1:
+            # Every task gets the same values: a single UPDATE ... WHERE id IN.
+            Task.objects.filter(organization=organization, pk__in=updated).update(updated_at=now, **dict(next(iter(changes))))
+        else:
+            fields = {field for change in changes for field, _ in change}
+            Task.objects.bulk_update(tasks, sorted(fields) + ['updated_at'])
+        counters.tasks_bulk_changed(organization.pk, deltas, {task.project_id: task.project for task in tasks})
+    for task in tasks:
+        task._remember_counted_state()
+    return tasks, errors
+
+
+def delete_tasks(organization, ids):
+    """
+    Delete the tasks with ``ids`` along with their comments.
+
+    Returns ``(deleted, errors)``, ``deleted`` mapping each deleted id to its
+    project id.
+    """
+    _check_size(ids)
+    rows = {
+        pk: (project_id, status)
+        for pk, project_id, status in Task.objects.for_organization(organization).filter(
+            pk__in={_parse_id(id) for id in ids},
+        ).values_list('pk', 'project_id', 'status')
+    }
+
+    deleted, errors = {}, []
+    for index, id in enumerate(ids):
+        pk = _parse_id(id)
+        if pk not in rows:
+            errors.append(_item_error(index, 'Task not found', id))
+        else:
+            deleted[pk] = rows[pk]
+
+    if deleted:
+        with transaction.atomic():
+            Task.objects.filter(organization=organization, pk__in=deleted).delete()
+            deltas = Counter()
+            for key in deleted.values():
+                deltas[key] -= 1
+            counters.tasks_bulk_changed(organization.pk, deltas)
+    return {pk: project_id for pk, (project_id, status) in deleted.items()}, errors
@@ -0,0 +1,278 @@
+"""
+Streaming bulk import of tasks and comments into one organization.
+
+Input is CSV (with a header row) or NDJSON, read lazily from any iterable of
+text lines, so file size never affects memory. Rows are taken in batches:
+each batch resolves its project names or task ids with one query, validates
+every row against the model's field choices and validators, and writes the
+valid rows with ``COPY`` on PostgreSQL or a multi-row ``INSERT`` elsewhere
+(see ``apps.core.bulk``).
+
+Every batch commits together with its counter updates and the import's
+``ImportCheckpoint``. An interrupted import run again under the same
+checkpoint key skips the rows already committed and carries on.
+"""
+import csv
+import json
+import time
+from collections import Counter
+from itertools import islice
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.core import counters
+from apps.core.bulk import bulk_insert
+from apps.core.models import ImportCheckpoint
+from apps.core.response_cache import response_cache
+from apps.projects.models import Project
+from .bulk import format_validation_error
+from .models import Task, TaskComment
+
+# Errors kept for the report; the count of failed rows is always exact.
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = ('csv', 'ndjson')
+
+
+def get_batch_size():
+    return getattr(settings, 'IMPORT_BATCH_SIZE', 5000)
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def read_rows(lines, format):
+    """Yield one dict per input row from an iterable of text lines."""
+    if format == 'csv':
+        yield from csv.DictReader(lines)
+    elif format == 'ndjson':
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ImportFormatError(f'Line {number} is not valid JSON: {e}')
+            if not isinstance(row, dict):
+                raise ImportFormatError(f'Line {number} is not a JSON object')
+            yield row
+    else:
+        raise ImportFormatError(f'Format must be one of: {", ".join(FORMATS)}')
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Importer:
+    """
+    Base class for one import resource.
+
+    Subclasses name the ``model`` and its importable ``fields`` and implement
+    ``resolve`` (batch lookups of parents) and ``build`` (one unsaved
+    instance per row).
+    """
+
+    model = None
+    fields = ()
+
+    def __init__(self, organization, checkpoint_key=None, batch_size=None, progress=None):
+        self.organization = organization
+        self.checkpoint_key = checkpoint_key
+        self.batch_size = batch_size or get_batch_size()
+        self.progress = progress
+        self.errors = []
+        self.imported = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def resolve(self, rows):
+        return None
+
+    def build(self, row, resolved):
+        raise NotImplementedError
+
+    def counters_changed(self, instances):
+        pass
+
+    def clean_value(self, field, value):
+        if value is None or value == '':
+            if field.null:
+                return None
+            if field.has_default():
+                return field.get_default()
+        return value
+
+    def instance(self, row, **parents):
+        now = timezone.now()
+        values = {}
+        for name in self.fields:
+            field = self.model._meta.get_field(name)
+            value = self.clean_value(field, row.get(name))
+            if value is not None:
+                values[field.attname] = value
+        instance = self.model(**parents, **values)
+        instance.clean_fields(exclude=[
+            field.name for field in self.model._meta.fields
+            if field.is_relation or field.name in ('created_at', 'updated_at')
+        ])
+        for name in ('created_at', 'updated_at'):
+            raw = row.get(name)
+            value = self.model._meta.get_field(name).to_python(raw) if raw else now
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            setattr(instance, name, value)
+        return instance
+
+    def record_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'message': message})
+
+    def run(self, rows):
+        started = time.monotonic()
+        checkpoint = self.load_checkpoint()
+        position = checkpoint.rows_processed if checkpoint else 0
+        if position:
+            rows = islice(rows, position, None)
+            self.skipped = position
+
+        for batch in _batches(rows, self.batch_size):
+            resolved = self.resolve(batch)
+            instances = []
+            for offset, row in enumerate(batch):
+                # Line numbers count data rows from 1, after any header.
+                line = position + offset + 1
+                try:
+                    instances.append(self.build(row, resolved))
+                except ValidationError as e:
+                    self.record_error(line, format_validation_error(e))
+                except LookupError as e:
+                    self.record_error(line, str(e.args[0]))
+            position += len(batch)
+            failed = len(batch) - len(instances)
+
+            with transaction.atomic():
+                self.write(instances)
+                self.counters_changed(instances)
+                self.save_checkpoint(checkpoint, position, len(instances), failed)
+            self.imported += len(instances)
+            if self.progress:
+                self.progress(self.report(started))
+
+        if checkpoint:
+            checkpoint.completed_at = timezone.now()
+            checkpoint.save(update_fields=['completed_at'])
+        response_cache.bump(self.organization.pk)
+        return self.report(started)
+
+    def report(self, started):
+        elapsed = time.monotonic() - started
+        processed = self.imported + self.failed
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'elapsed': round(elapsed, 3),
+            'rows_per_second': round(processed / elapsed, 1) if elapsed else 0.0,
+            'errors': self.errors,
+        }
+
+    def load_checkpoint(self):
+        if not self.checkpoint_key:
+            return None
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            key=self.checkpoint_key,
+            defaults={'organization': self.organization, 'resource': self.resource},
+        )
+        if checkpoint.organization_id != self.organization.pk or checkpoint.resource != self.resource:
+            raise ImportFormatError(f'Checkpoint {self.checkpoint_key!r} belongs to another import')
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint, position, imported, failed):
+        if checkpoint is None:
+            return
+        ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(
+            rows_processed=position,
+            rows_imported=F('rows_imported') + imported,
+            rows_failed=F('rows_failed') + failed,
+        )
+
+    def write(self, instances):
+        bulk_insert(self.model, instances)
+
+
+class TaskImporter(Importer):
+    """
+    Columns: ``project`` (name) or ``project_id``, ``title``, ``description``,
+    ``status``, ``priority``, ``assignee_email``, ``due_date`` and optionally
+    ``created_at``/``updated_at``.
+    """
+
+    model = Task
+    resource = 'tasks'
+    fields = ('title', 'description', 'status', 'priority', 'assignee_email', 'due_date')
+
+    def resolve(self, rows):
+        names = {row.get('project') for row in rows if row.get('project')}
+        ids = {str(row['project_id']) for row in rows if row.get('project_id')}
+        projects = Project.objects.filter(organization=self.organization)
+        by_name = dict(projects.filter(name__in=names).values_list('name', 'pk'))
+        by_id = {str(pk) for pk in projects.filter(pk__in=[i for i in ids if i.isdigit()]).values_list('pk', flat=True)}
+        return by_name, by_id
+
+    def build(self, row, resolved):
+        by_name, by_id = resolved
+        if row.get('project_id'):
+            project_id = str(row['project_id'])
+            if project_id not in by_id:
+                raise LookupError(f'Project {project_id} not found')
+        else:
+            if row.get('project') not in by_name:
+                raise LookupError(f'Project {row.get("project")!r} not found')
+            project_id = by_name[row['project']]
+        return self.instance(row, project_id=int(project_id), organization_id=self.organization.pk)
+
+    def counters_changed(self, tasks):
+        counters.tasks_bulk_changed(
+            self.organization.pk, Counter((task.project_id, task.status) for task in tasks)
+        )
+
+
+class CommentImporter(Importer):
+    """Columns: ``task_id``, ``content``, ``author_email`` and optionally ``created_at``/``updated_at``."""
+
+    model = TaskComment
+    resource = 'comments'
+    fields = ('content', 'author_email')
+
+    def resolve(self, rows):
+        ids = {str(row['task_id']) for row in rows if str(row.get('task_id', '')).isdigit()}
+        return {
+            str(pk) for pk in Task.objects.for_organization(self.organization).filter(
+                pk__in=ids
+            ).values_list('pk', flat=True)
+        }
+
+    def build(self, row, resolved):
+        task_id = str(row.get('task_id') or '')
+        if task_id not in resolved:
+            raise LookupError(f'Task {task_id or "(missing)"} not found')
+        return self.instance(row, task_id=int(task_id), organization_id=self.organization.pk)
+
+    def counters_changed(self, comments):
+        counters.comments_bulk_added(Counter(comment.task_id for comment in comments))
+
+
+IMPORTERS = {
+    TaskImporter.resource: TaskImporter,
+    CommentImporter.resource: CommentImporter,
+}
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.tasks import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Hash-partition the tasks and task_comments tables by organization, online'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            action='append',
+            dest='tables',
+            choices=partitioning.TABLES,
+            help='Only partition this table (default: tasks, then task_comments)',
+        )
+        parser.add_argument('--partitions', type=int, default=16, help='Number of hash partitions (default 16)')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Ids per copy batch (default 10000)')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds between batches (default 0.05)')
+        parser.add_argument(
+            '--start-after',
+            type=int,
+            default=0,
+            metavar='ID',
+            help='Resume an interrupted copy after this id (with a single --table)',
+        )
+        parser.add_argument(
+            '--no-swap',
+            action='store_false',
+            dest='swap',
+            help='Copy and keep in sync, but leave the swap for a later run',
+        )
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or partitioning.TABLES
+        if options['start_after'] and len(tables) != 1:
+            raise CommandError('--start-after needs a single --table')
+
+        for table in tables:
+            self.stdout.write(f'Partitioning {table}')
+            try:
+                partitioned = partitioning.partition(
+                    table,
+                    partitions=options['partitions'],
+                    batch_size=options['batch_size'],
+                    pause=options['pause'],
+                    start_after=options['start_after'],
+                    progress=self.report_progress,
+                    finish=options['swap'],
+                )
+            except partitioning.PartitioningError as e:
+                raise CommandError(str(e))
+            if not partitioned:
+                self.stdout.write(f'{table} is already partitioned')
+            elif options['swap']:
+                self.stdout.write(self.style.SUCCESS(f'{table} is now partitioned'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{table} copied; run again without --no-swap to switch'))
+                # task_comments can only follow once tasks is swapped in.
+                break
+
+    def report_progress(self, position, last_id):
+        self.stdout.write(f'  copied up to id {position} of {last_id}')
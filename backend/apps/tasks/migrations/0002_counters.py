@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+TASK_COUNTER_FIELDS = {
+    'TODO': 'todo_task_count',
+    'IN_PROGRESS': 'in_progress_task_count',
+    'DONE': 'done_task_count',
+    'BLOCKED': 'blocked_task_count',
+}
+
+
+def _count(queryset, key):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{key: OuterRef('pk')})
+            .order_by()
+            .values(key)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def populate_counters(apps, schema_editor):
+    Organization = apps.get_model('organizations', 'Organization')
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    TaskComment = apps.get_model('tasks', 'TaskComment')
+
+    Task.objects.update(comment_count=_count(TaskComment.objects.all(), 'task'))
+    Project.objects.update(**{
+        counter: _count(Task.objects.filter(status=status), 'project')
+        for status, counter in TASK_COUNTER_FIELDS.items()
+    })
+    Organization.objects.update(
+        project_count=_count(Project.objects.all(), 'organization'),
+        task_count=_count(
+            Task.objects.filter(status__in=TASK_COUNTER_FIELDS),
+            'project__organization',
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0002_counters'),
+        ('projects', '0002_counters'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
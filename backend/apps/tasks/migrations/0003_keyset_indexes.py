@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taskcomment',
+            name='task_commen_task_id_413a08_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='tasks_project_9f348e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at', '-id'], name='tasks_created_07ab2f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['task', '-created_at', '-id'], name='task_commen_task_id_24adfe_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Nullable, without an index or constraint, so adding the column rewrites
+    # nothing; 0007 to 0010 fill it in, index it and constrain it.
+
+    dependencies = [
+        ('organizations', '0003_organization_stats'),
+        ('tasks', '0005_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='organization',
+            field=models.ForeignKey(editable=False, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+        migrations.AddField(
+            model_name='taskcomment',
+            name='organization',
+            field=models.ForeignKey(editable=False, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def _fill(queryset, **values):
+    # One short transaction per batch, so writers are never held up for long.
+    last = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            return
+        queryset.filter(pk__in=ids).update(**values)
+        last = ids[-1]
+
+
+def copy_organization(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    TaskComment = apps.get_model('tasks', 'TaskComment')
+    db = schema_editor.connection.alias
+    _fill(
+        Task.objects.using(db).filter(organization__isnull=True),
+        organization_id=Subquery(Project.objects.filter(pk=OuterRef('project_id')).values('organization_id')),
+    )
+    _fill(
+        TaskComment.objects.using(db).filter(organization__isnull=True),
+        organization_id=Subquery(Task.objects.filter(pk=OuterRef('task_id')).values('organization_id')),
+    )
+
+
+class Migration(migrations.Migration):
+    # Each batch of the backfill commits on its own.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0006_organization_partition_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_organization, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from apps.core.operations import add_index_concurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0007_fill_organization'),
+    ]
+
+    operations = [
+        add_index_concurrently(
+            model_name='task',
+            name='organization',
+            field=models.ForeignKey(editable=False, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+        add_index_concurrently(
+            model_name='taskcomment',
+            name='organization',
+            field=models.ForeignKey(editable=False, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from apps.core.operations import add_foreign_key
+
+
+class Migration(migrations.Migration):
+    # Validating runs in its own transaction, after the constraint is added.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0008_organization_index'),
+    ]
+
+    operations = [
+        add_foreign_key(
+            model_name='task',
+            name='organization',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+        add_foreign_key(
+            model_name='taskcomment',
+            name='organization',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+    ]
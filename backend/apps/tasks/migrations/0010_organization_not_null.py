@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from apps.core.operations import set_not_null
+
+
+class Migration(migrations.Migration):
+    # Validating runs in its own transaction, after the check is added.
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0009_organization_foreign_key'),
+    ]
+
+    operations = [
+        set_not_null(
+            model_name='task',
+            name='organization',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+        set_not_null(
+            model_name='taskcomment',
+            name='organization',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='organizations.organization'),
+        ),
+    ]
@@ -1,8 +1,30 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import EmailValidator
+from django.contrib.postgres.search import SearchVectorField
+from apps.organizations.models import Organization
 from apps.projects.models import Project
 
 
+def copy_organization(instances, parent):
+    """Set the partition key of ``instances`` that lack one from their ``parent``."""
+    for instance in instances:
+        if instance.organization_id is None:
+            instance.organization_id = getattr(instance, parent).organization_id
+
+
+class TaskQuerySet(models.QuerySet):
+    def for_organization(self, organization):
+        """The tenant's tasks, leaving out those of projects being purged."""
+        # Filtering on the task's own organization_id lets PostgreSQL prune
+        # a partitioned table to a single partition.
+        return self.filter(organization=organization, project__deleting_at__isnull=True)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        copy_organization(objs, 'project')
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('TODO', 'To Do'),
@@ -18,11 +40,20 @@ class Task(models.Model):
         ('URGENT', 'Urgent'),
     ]
 
+    SEARCH_FIELDS = [('title', 'A'), ('description', 'B')]
+
     project = models.ForeignKey(
         Project, 
         on_delete=models.CASCADE, 
         related_name='tasks'
     )
+    # Copied from the project: the partition key (see apps.tasks.partitioning).
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='+',
+        editable=False
+    )
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='TODO')
@@ -31,12 +62,19 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Maintained by a database trigger on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         db_table = 'tasks'
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['project', 'status']),
+            models.Index(fields=['project', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id']),
             models.Index(fields=['assignee_email']),
             models.Index(fields=['due_date']),
             models.Index(fields=['priority']),
@@ -45,6 +83,40 @@ class Task(models.Model):
     def __str__(self):
         return f"{self.project.name} - {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_counted_state()
+        return instance
+
+    def _remember_counted_state(self):
+        # The project and status last written, so counter moves can be undone.
+        self._counted_state = (self.__dict__.get('project_id'), self.__dict__.get('status'))
+
+    def save(self, *args, **kwargs):
+        from apps.core import counters
+
+        adding = self._state.adding
+        copy_organization([self], 'project')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                counters.task_added(self)
+            else:
+                old_project_id, old_status = getattr(self, '_counted_state', (None, None))
+                if old_status is not None and (old_project_id, old_status) != (self.project_id, self.status):
+                    counters.task_changed(self, old_project_id, old_status)
+        self._remember_counted_state()
+
+    def delete(self, *args, **kwargs):
+        from apps.core import counters
+
+        _, status = getattr(self, '_counted_state', (None, self.status))
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            counters.task_removed(self, status or self.status)
+        return result
+
     @property
     def is_overdue(self):
         if not self.due_date or self.status == 'DONE':
@@ -52,29 +124,71 @@ class Task(models.Model):
         from django.utils import timezone
         return timezone.now() > self.due_date
 
-    @property
-    def comment_count(self):
-        return self.comments.count()
+
+class TaskCommentQuerySet(models.QuerySet):
+    def for_organization(self, organization):
+        """The tenant's comments, leaving out those of projects being purged."""
+        return self.filter(
+            organization=organization,
+            task__organization=organization,
+            task__project__deleting_at__isnull=True,
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        copy_organization(objs, 'task')
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class TaskComment(models.Model):
+    SEARCH_FIELDS = [('content', 'A')]
+
     task = models.ForeignKey(
         Task, 
         on_delete=models.CASCADE, 
         related_name='comments'
     )
+    # Copied from the task: the partition key (see apps.tasks.partitioning).
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='+',
+        editable=False
+    )
     content = models.TextField()
     author_email = models.EmailField(validators=[EmailValidator()])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskCommentQuerySet.as_manager()
 
     class Meta:
         db_table = 'task_comments'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['task', 'created_at']),
+            models.Index(fields=['task', '-created_at', '-id']),
             models.Index(fields=['author_email']),
         ]
 
     def __str__(self):
-        return f"Comment on {self.task.title} by {self.author_email}"
\ No newline at end of file
+        return f"Comment on {self.task.title} by {self.author_email}"
+
+    def save(self, *args, **kwargs):
+        from apps.core import counters
+
+        adding = self._state.adding
+        copy_organization([self], 'task')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                counters.comment_added(self)
+
+    def delete(self, *args, **kwargs):
+        from apps.core import counters
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            counters.comment_removed(self)
+        return result
\ No newline at end of file
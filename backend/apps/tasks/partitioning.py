@@ -0,0 +1,262 @@
+"""
+Hash partitioning of ``tasks`` and ``task_comments`` by organization.
+
+Both tables carry the tenant's ``organization_id``, and tenant queries
+filter on it (``for_organization``), so once a table is partitioned
+``PARTITION BY HASH (organization_id)`` PostgreSQL prunes them to a single
+partition. ``partition`` converts an existing table online, in three steps
+that each check the catalog first, so an interrupted run can be resumed:
+
+1. ``prepare`` creates ``<table>_partitioned`` with the same columns,
+   indexes and foreign keys and its partitions, and a trigger on the old
+   table that mirrors every insert, update and delete into it. PostgreSQL
+   requires the partition key in the primary key, which becomes
+   ``(id, organization_id)``.
+2. ``copy`` copies the existing rows in primary key ranges, one short
+   transaction per batch. Rows are read ``FOR SHARE``, so a concurrent
+   update waits for the batch and its trigger then replaces the copy.
+3. ``swap`` takes a brief exclusive lock, drops the old table and renames
+   the new one into its place, carrying over the id sequence, the triggers
+   and the foreign keys pointing at it.
+
+``tasks`` has to go first: foreign keys to a partitioned table must include
+the partition key, so ``task_comments`` then references
+``tasks (id, organization_id)``. Requires PostgreSQL 13 or later.
+"""
+import re
+import time
+from django.db import connection, transaction
+
+TABLES = ('tasks', 'task_comments')
+PARTITION_KEY = 'organization_id'
+SUFFIX = '_partitioned'
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def _fetch(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _execute(*statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def exists(table):
+    return _fetch('SELECT to_regclass(%s) IS NOT NULL', [table])[0][0]
+
+
+def is_partitioned(table):
+    return bool(_fetch('SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [table]))
+
+
+def _indexes(table):
+    """``(name, definition)`` of the indexes of ``table`` but its primary key."""
+    return _fetch(
+        """
+        SELECT index.relname, pg_get_indexdef(index.oid)
+        FROM pg_index JOIN pg_class index ON index.oid = pg_index.indexrelid
+        WHERE pg_index.indrelid = %s::regclass AND NOT pg_index.indisprimary
+        ORDER BY index.relname
+        """,
+        [table],
+    )
+
+
+def _foreign_keys(table):
+    """``(name, definition)`` of the foreign keys declared on ``table``."""
+    return _fetch(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f' AND conparentid = 0
+        ORDER BY conname
+        """,
+        [table],
+    )
+
+
+def _referencing(table):
+    """``(table, name, definition)`` of other tables' foreign keys to ``table``."""
+    return _fetch(
+        """
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE confrelid = %s::regclass AND conrelid <> confrelid AND contype = 'f' AND conparentid = 0
+        """,
+        [table],
+    )
+
+
+def _triggers(table):
+    """``(name, definition)`` of the user triggers on ``table`` but the sync trigger."""
+    return _fetch(
+        """
+        SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger
+        WHERE tgrelid = %s::regclass AND NOT tgisinternal AND tgname <> %s
+        """,
+        [table, table + SUFFIX + '_sync'],
+    )
+
+
+def temporary_index_name(name):
+    # Index names share a namespace; the new table's are renamed at the swap.
+    return name[:58] + '_part'
+
+
+def index_on(definition, name, table):
+    """Rewrite a ``pg_get_indexdef`` definition to create the index on ``table``."""
+    definition = definition.replace(f'INDEX {name} ', f'INDEX {temporary_index_name(name)} ', 1)
+    return re.sub(r' ON (ONLY )?\S+ USING ', f' ON {table} USING ', definition, count=1)
+
+
+def with_partition_key(definition):
+    """Extend a foreign key definition with the partition key on both sides."""
+    if PARTITION_KEY in definition:
+        return definition
+    return re.sub(
+        r'^FOREIGN KEY \((.+?)\) REFERENCES (\S+?)\((.+?)\)',
+        rf'FOREIGN KEY (\1, {PARTITION_KEY}) REFERENCES \2(\3, {PARTITION_KEY})',
+        definition,
+    )
+
+
+def _check(table):
+    if connection.vendor != 'postgresql':
+        raise PartitioningError('Partitioning needs PostgreSQL')
+    if table not in TABLES:
+        raise PartitioningError(f'Unknown table {table!r}')
+    for earlier in TABLES[:TABLES.index(table)]:
+        if not is_partitioned(earlier):
+            raise PartitioningError(f'Partition {earlier} before {table}')
+
+
+def prepare(table, partitions):
+    """Create the partitioned copy of ``table`` and start mirroring writes into it."""
+    new = table + SUFFIX
+    statements = [
+        f'CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS INCLUDING STORAGE) '
+        f'PARTITION BY HASH ({PARTITION_KEY})',
+        f'ALTER TABLE {new} ADD CONSTRAINT {new}_pkey PRIMARY KEY (id, {PARTITION_KEY})',
+    ]
+    statements += [
+        f'CREATE TABLE {new}_p{remainder} PARTITION OF {new} '
+        f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        for remainder in range(partitions)
+    ]
+    statements += [index_on(definition, name, new) for name, definition in _indexes(table)]
+    # The new table is empty, so its foreign keys are valid from the start.
+    statements += [
+        f'ALTER TABLE {new} ADD CONSTRAINT {name} {definition.replace(" NOT VALID", "")}'
+        for name, definition in _foreign_keys(table)
+    ]
+    statements += [
+        f"""
+        CREATE FUNCTION {new}_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                DELETE FROM {new} WHERE id = OLD.id AND {PARTITION_KEY} = OLD.{PARTITION_KEY};
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                INSERT INTO {new} SELECT NEW.*;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f'CREATE TRIGGER {new}_sync AFTER INSERT OR UPDATE OR DELETE ON {table} '
+        f'FOR EACH ROW EXECUTE FUNCTION {new}_sync()',
+    ]
+    with transaction.atomic():
+        _execute(*statements)
+
+
+def copy(table, batch_size=10000, pause=0.0, start_after=0, progress=None):
+    """
+    Copy the rows of ``table`` with ids above ``start_after`` into its
+    partitioned copy. ``progress`` is called with the last id copied and
+    the highest id to copy after each batch. Returns the rows copied.
+    """
+    new = table + SUFFIX
+    last_id = _fetch(f'SELECT max(id) FROM {table}')[0][0] or 0
+    position, copied = start_after, 0
+    while position < last_id:
+        end = min(position + batch_size, last_id)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {new} SELECT * FROM {table} WHERE id > %s AND id <= %s FOR SHARE '
+                f'ON CONFLICT DO NOTHING',
+                [position, end],
+            )
+            copied += cursor.rowcount
+        position = end
+        if progress:
+            progress(position, last_id)
+        if position < last_id:
+            time.sleep(pause)
+    _execute(f'ANALYZE {new}')
+    return copied
+
+
+def swap(table):
+    """Replace ``table`` with its partitioned copy."""
+    new = table + SUFFIX
+    with transaction.atomic():
+        _execute(f'LOCK TABLE {table}, {new} IN ACCESS EXCLUSIVE MODE')
+        sequence = _fetch("SELECT pg_get_serial_sequence(%s, 'id')", [table])[0][0]
+        next_id = _fetch('SELECT nextval(%s)', [sequence])[0][0]
+        referencing = _referencing(table)
+        triggers = _triggers(table)
+        indexes = _indexes(table)
+        partitions = _fetch('SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass', [new])
+
+        statements = [
+            f'ALTER TABLE {referrer} DROP CONSTRAINT {name}' for referrer, name, _ in referencing
+        ]
+        statements += [
+            f'DROP TABLE {table}',
+            f'DROP FUNCTION {new}_sync()',
+            f'ALTER TABLE {new} RENAME TO {table}',
+            f'ALTER TABLE {table} RENAME CONSTRAINT {new}_pkey TO {table}_pkey',
+        ]
+        statements += [
+            f'ALTER TABLE {partition} RENAME TO {table}{partition[len(new):]}' for (partition,) in partitions
+        ]
+        statements += [f'ALTER INDEX {temporary_index_name(name)} RENAME TO {name}' for name, _ in indexes]
+        statements += [
+            f'CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id',
+            f"SELECT setval('{table}_id_seq', {next_id}, false)",
+            f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')",
+        ]
+        statements += [definition for _, definition in triggers]
+        # Validated below, without blocking writes to the referencing table.
+        statements += [
+            f'ALTER TABLE {referrer} ADD CONSTRAINT {name} {with_partition_key(definition)} NOT VALID'
+            for referrer, name, definition in referencing
+        ]
+        _execute(*statements)
+
+    _execute(*(
+        f'ALTER TABLE {referrer} VALIDATE CONSTRAINT {name}' for referrer, name, _ in referencing
+    ))
+
+
+def partition(table, partitions=16, batch_size=10000, pause=0.0, start_after=0, progress=None, finish=True):
+    """
+    Partition ``table``, resuming wherever an earlier run stopped. With
+    ``finish`` false the copy is left in sync but not swapped in. Returns
+    False when the table was already partitioned.
+    """
+    _check(table)
+    if is_partitioned(table):
+        return False
+    if not exists(table + SUFFIX):
+        prepare(table, partitions)
+    copy(table, batch_size, pause, start_after, progress)
+    if finish:
+        swap(table)
+    return True
@@ -13,7 +13,7 @@ python manage.py migrate --noinput
 
 # Create sample data if it doesn't exist
 echo "Creating sample data..."
-python manage.py create_sample_data || echo "Sample data already exists or command not available"
+python manage.py create_sample_data --if-empty || echo "Sample data could not be created"
 
 # Collect static files
 echo "Collecting static files..."
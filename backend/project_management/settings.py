@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -17,6 +17,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -27,6 +28,7 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    'apps.core',
     'apps.organizations',
     'apps.projects',
     'apps.tasks',
@@ -38,6 +40,7 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'apps.core.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -47,6 +50,14 @@ MIDDLEWARE = [
     'apps.core.middleware.OrganizationMiddleware',
 ]
 
+# Per-process cache of X-Organization-Slug lookups
+ORGANIZATION_CACHE_SIZE = config('ORGANIZATION_CACHE_SIZE', default=1024, cast=int)
+ORGANIZATION_CACHE_TTL = config('ORGANIZATION_CACHE_TTL', default=60, cast=int)
+
+# Per-process cache of typeahead suggestions, per organization
+SUGGEST_CACHE_SIZE = config('SUGGEST_CACHE_SIZE', default=4096, cast=int)
+SUGGEST_CACHE_TTL = config('SUGGEST_CACHE_TTL', default=5, cast=int)
+
 ROOT_URLCONF = 'project_management.urls'
 
 TEMPLATES = [
@@ -67,17 +78,49 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'project_management.wsgi.application'
 
+# Each process pools its connections (apps.core.backends.postgresql) and a
+# request hands its connection back when it finishes. DB_POOL_MAX_SIZE=0
+# turns pooling off; connections then persist for DB_CONN_MAX_AGE seconds.
+# Either way idle connections are health-checked before reuse.
+DB_POOL = {
+    'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+    'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+    'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+    'max_idle': config('DB_POOL_MAX_IDLE', default=600.0, cast=float),
+    'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600.0, cast=float),
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'apps.core.backends.postgresql',
         'NAME': config('DB_NAME', default='project_management'),
         'USER': config('DB_USER', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL['max_size'] else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'pool': DB_POOL} if DB_POOL['max_size'] else {},
     }
 }
 
+# Read replicas: comma-separated `host` or `host:port` entries serving
+# DB_REPLICA_NAME with the primary's credentials. GraphQL queries and admin
+# list pages read from them, except for REPLICA_STICKY_SECONDS after the same
+# client wrote (see apps.core.routers). Tests use the primary for them.
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv())):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['apps.core.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -119,9 +162,127 @@ REST_FRAMEWORK = {
 
 GRAPHENE = {
     'SCHEMA': 'apps.schema.schema',
-    'MIDDLEWARE': [
-        'graphene_django.debug.DjangoDebugMiddleware',
-    ],
+    # DjangoDebugMiddleware is added per request by GraphQLView, see below.
+    'MIDDLEWARE': [],
+}
+
+# Outside DEBUG, requests whose X-GraphQL-Debug header matches this token get
+# the `_debug` SQL trace. Empty disables it.
+GRAPHQL_DEBUG_TOKEN = config('GRAPHQL_DEBUG_TOKEN', default='')
+
+# Distinct operation names tracked by /api/metrics/; later ones count as "other"
+GRAPHQL_METRICS_MAX_OPERATIONS = config('GRAPHQL_METRICS_MAX_OPERATIONS', default=500, cast=int)
+
+# Per-resolver tracing: share of operations sampled and where spans go
+# ('file' appends OTLP/JSON lines, 'otlp' posts to an OTLP/HTTP collector).
+# Clients can also ask for Apollo tracing with `X-GraphQL-Trace: 1`.
+GRAPHQL_TRACING = {
+    'SAMPLE_RATE': config('GRAPHQL_TRACE_SAMPLE_RATE', default=0.0, cast=float),
+    'EXPORTER': config('GRAPHQL_TRACE_EXPORTER', default=''),
+    'FILE': config('GRAPHQL_TRACE_FILE', default=os.path.join(BASE_DIR, 'graphql-traces.jsonl')),
+    'OTLP_ENDPOINT': config('OTEL_EXPORTER_OTLP_TRACES_ENDPOINT', default='http://localhost:4318/v1/traces'),
+    'OTLP_HEADERS': config('OTEL_EXPORTER_OTLP_HEADERS', default=''),
+    'SERVICE_NAME': config('OTEL_SERVICE_NAME', default='project-management-api'),
+}
+
+# Serve /graphql/ with AsyncGraphQLView (async resolvers). Meant for ASGI
+# workers, e.g. `gunicorn -k uvicorn.workers.UvicornWorker project_management.asgi:application`
+GRAPHQL_ASYNC = config('GRAPHQL_ASYNC', default=False, cast=bool)
+
+# Deleted projects and organizations are purged in the background, in
+# batches of PURGE_BATCH_SIZE rows with PURGE_PAUSE seconds between them.
+# With PURGE_IN_BACKGROUND off, purges are queued as jobs for `manage.py run_workers`.
+PURGE_BATCH_SIZE = config('PURGE_BATCH_SIZE', default=1000, cast=int)
+PURGE_PAUSE = config('PURGE_PAUSE', default=0.05, cast=float)
+PURGE_IN_BACKGROUND = config('PURGE_IN_BACKGROUND', default=True, cast=bool)
+
+# Tasks and comments of ARCHIVED projects, and of COMPLETED ones untouched for
+# this many days, go to cold storage (`manage.py archive_projects`).
+ARCHIVE_COMPLETED_AFTER_DAYS = config('ARCHIVE_COMPLETED_AFTER_DAYS', default=90, cast=int)
+
+# Background jobs, run by `manage.py run_workers`. A failed job is retried after
+# JOB_RETRY_BACKOFF seconds, doubling each time up to JOB_RETRY_MAX_DELAY.
+# Finished jobs are deleted after JOB_KEEP_DAYS.
+JOB_WORKER_CONCURRENCY = config('JOB_WORKER_CONCURRENCY', default=4, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=1.0, cast=float)
+JOB_RETRY_BACKOFF = config('JOB_RETRY_BACKOFF', default=10, cast=float)
+JOB_RETRY_MAX_DELAY = config('JOB_RETRY_MAX_DELAY', default=3600, cast=float)
+JOB_KEEP_DAYS = config('JOB_KEEP_DAYS', default=7, cast=int)
+
+# Fan-out for GraphQL subscription events: 'memory' (single process) or
+# 'postgres' (LISTEN/NOTIFY, shared by every worker).
+EVENT_BROKER = config('EVENT_BROKER', default='memory')
+
+# Static cost limits applied to every GraphQL operation before execution
+GRAPHQL_QUERY_COST = {
+    'MAX_COST': config('GRAPHQL_MAX_COST', default=5000, cast=int),
+    'MAX_DEPTH': config('GRAPHQL_MAX_DEPTH', default=10, cast=int),
+}
+
+# Per-process cache of parsed and validated GraphQL documents
+GRAPHQL_DOCUMENT_CACHE_SIZE = config('GRAPHQL_DOCUMENT_CACHE_SIZE', default=1000, cast=int)
+
+# Largest batch accepted by the bulk task mutations
+BULK_TASK_MAX_ITEMS = config('BULK_TASK_MAX_ITEMS', default=500, cast=int)
+
+# Rows fetched per round trip by the streaming export
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Rows validated and written per transaction by the bulk importer
+IMPORT_BATCH_SIZE = config('IMPORT_BATCH_SIZE', default=5000, cast=int)
+
+# Response cache for read-only GraphQL operations: locmem, file or db.
+# The db variants (here and below) need `python manage.py createcachetable`.
+GRAPHQL_RESPONSE_CACHE_BACKEND = config('GRAPHQL_RESPONSE_CACHE_BACKEND', default='locmem')
+
+GRAPHQL_RESPONSE_CACHES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'graphql-responses',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('GRAPHQL_RESPONSE_CACHE_LOCATION', default=os.path.join(BASE_DIR, '.cache', 'graphql')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'graphql_response_cache',
+    },
+}
+
+# Per-tenant response cache versions: file or db. Every process serving
+# GraphQL must see each bump, so they never live in a per-process cache.
+GRAPHQL_RESPONSE_CACHE_VERSIONS = config('GRAPHQL_RESPONSE_CACHE_VERSIONS', default='file')
+
+GRAPHQL_RESPONSE_VERSION_CACHES = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config(
+            'GRAPHQL_RESPONSE_CACHE_VERSIONS_LOCATION', default=os.path.join(BASE_DIR, '.cache', 'graphql-versions')
+        ),
+        # One entry per tenant.
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'graphql_response_versions',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'graphql': GRAPHQL_RESPONSE_CACHES[GRAPHQL_RESPONSE_CACHE_BACKEND],
+    'graphql_versions': GRAPHQL_RESPONSE_VERSION_CACHES[GRAPHQL_RESPONSE_CACHE_VERSIONS],
+}
+
+GRAPHQL_RESPONSE_CACHE = {
+    'ALIAS': 'graphql',
+    'VERSION_ALIAS': 'graphql_versions',
+    'TIMEOUT': config('GRAPHQL_RESPONSE_CACHE_TIMEOUT', default=300, cast=int),
 }
 
 CORS_ALLOWED_ORIGINS = config(
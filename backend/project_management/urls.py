@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
+from apps.schema.views import AsyncGraphQLView, GraphQLView
+
+GraphQLEndpoint = AsyncGraphQLView if settings.GRAPHQL_ASYNC else GraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('graphql/', csrf_exempt(GraphQLEndpoint.as_view(graphiql=True))),
     path('api/', include('apps.api.urls')),
 ]
\ No newline at end of file
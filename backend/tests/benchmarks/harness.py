@@ -0,0 +1,139 @@
+"""
+Measurement and baseline comparison for the GraphQL benchmarks.
+
+Each operation is measured for SQL query count, rows loaded into model
+instances and median wall time, and compared with ``baselines.json``.
+Query and row counts depend on the code, not the database, so they are
+kept per tenant size under ``counts`` and checked on every backend. The
+few operations whose plan differs by backend (``vendor_specific``) keep
+theirs per vendor under ``vendor_counts``. Wall times are only comparable
+on the same database and are kept per vendor under ``wall_time_ms``; with
+none recorded for the current vendor, only the counts are checked.
+
+Environment variables:
+
+- ``BENCHMARK_SIZE``: tenant size to seed, ``small`` (default) or ``large``.
+- ``BENCHMARK_REPEAT``: timed runs per operation (default 5).
+- ``BENCHMARK_TIME_TOLERANCE``: allowed wall-time growth as a fraction of
+  the baseline (default 1.0, i.e. twice as slow). Slowdowns under
+  ``BENCHMARK_TIME_FLOOR_MS`` (default 5) are ignored as noise.
+- ``BENCHMARK_UPDATE_BASELINES=1``: record the current numbers as the new
+  baselines instead of comparing.
+"""
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test.utils import CaptureQueriesContext
+
+BASELINES_PATH = Path(__file__).with_name('baselines.json')
+
+SIZES = {
+    'small': {'projects_per_org': 5, 'tasks_per_project': 30, 'comments_per_task': 2},
+    'large': {'projects_per_org': 20, 'tasks_per_project': 500, 'comments_per_task': 3},
+}
+
+SIZE = os.environ.get('BENCHMARK_SIZE', 'small')
+REPEAT = int(os.environ.get('BENCHMARK_REPEAT', 5))
+TIME_TOLERANCE = float(os.environ.get('BENCHMARK_TIME_TOLERANCE', 1.0))
+TIME_FLOOR_MS = float(os.environ.get('BENCHMARK_TIME_FLOOR_MS', 5))
+UPDATE_BASELINES = os.environ.get('BENCHMARK_UPDATE_BASELINES') == '1'
+
+
+@dataclass
+class Measurement:
+    queries: int
+    rows: int
+    wall_time_ms: float
+
+
+class RowCounter:
+    """Counts model instances created while active, i.e. rows fetched through the ORM."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        post_init.connect(self, weak=False)
+        return self
+
+    def __exit__(self, *exc_info):
+        post_init.disconnect(self)
+
+
+def measure(run, prepare=lambda: None, repeat=REPEAT):
+    """
+    Measure ``run(prepare())``.
+
+    One untimed warm-up call fills per-process caches first. Queries and
+    rows come from the first measured call; wall time is the median of
+    ``repeat`` calls.
+    """
+    run(prepare())
+    timings = []
+    queries = rows = None
+    for _ in range(repeat):
+        arguments = prepare()
+        with CaptureQueriesContext(connection) as captured, RowCounter() as counter:
+            started = time.perf_counter()
+            run(arguments)
+            timings.append((time.perf_counter() - started) * 1000)
+        if queries is None:
+            queries, rows = len(captured), counter.count
+    return Measurement(queries, rows, round(statistics.median(timings), 3))
+
+
+def load_baselines():
+    if not BASELINES_PATH.exists():
+        return {}
+    return json.loads(BASELINES_PATH.read_text())
+
+
+def counts_for(baselines, name, vendor_specific=False):
+    """The recorded ``{'queries', 'rows'}`` of ``name``, or None."""
+    if vendor_specific:
+        counts = baselines.get('vendor_counts', {}).get(connection.vendor, {})
+    else:
+        counts = baselines.get('counts', {})
+    return counts.get(SIZE, {}).get(name)
+
+
+def wall_time_for(baselines, name):
+    return baselines.get('wall_time_ms', {}).get(connection.vendor, {}).get(SIZE, {}).get(name)
+
+
+def save_baselines(baselines, results, vendor_specific=()):
+    for name, result in results.items():
+        if name in vendor_specific:
+            counts = baselines.setdefault('vendor_counts', {}).setdefault(connection.vendor, {})
+        else:
+            counts = baselines.setdefault('counts', {})
+        counts.setdefault(SIZE, {})[name] = {'queries': result.queries, 'rows': result.rows}
+        times = baselines.setdefault('wall_time_ms', {}).setdefault(connection.vendor, {})
+        times.setdefault(SIZE, {})[name] = result.wall_time_ms
+    BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+def regressions(result, counts, wall_time_ms=None):
+    """Return human-readable failures of ``result`` against the recorded numbers."""
+    problems = []
+    if counts is not None:
+        if result.queries > counts['queries']:
+            problems.append(f'{result.queries} queries, baseline {counts["queries"]}')
+        if result.rows > counts['rows']:
+            problems.append(f'{result.rows} rows fetched, baseline {counts["rows"]}')
+    if wall_time_ms is not None:
+        allowed = wall_time_ms * (1 + TIME_TOLERANCE)
+        if result.wall_time_ms > allowed and result.wall_time_ms - wall_time_ms > TIME_FLOOR_MS:
+            problems.append(
+                f'{result.wall_time_ms:.1f}ms, baseline {wall_time_ms:.1f}ms '
+                f'(+{TIME_TOLERANCE:.0%} allowed)'
+            )
+    return problems
@@ -0,0 +1,237 @@
+"""
+Query-count, rows-fetched and latency benchmarks for every GraphQL root field.
+
+Each operation runs against two seeded tenants, a tiny one and one of
+``BENCHMARK_SIZE``. Its query count must be the same for both, which catches
+N+1 patterns without relying on any stored numbers. The large-tenant
+measurement is then compared with ``baselines.json`` (see ``harness``):
+its query and row counts on every database, its wall time where one was
+recorded for the database in use.
+
+Run only these with ``pytest -m benchmark``; refresh the baselines with
+``BENCHMARK_UPDATE_BASELINES=1 pytest -m benchmark``.
+"""
+from dataclasses import dataclass
+from typing import Callable
+import pytest
+from django.test import Client, TestCase
+from apps.organizations.sample_data import generate
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task
+from . import harness
+
+pytestmark = pytest.mark.benchmark
+
+
+@dataclass
+class Tenant:
+    organization: Organization
+    project: Project
+    task: Task
+
+    @classmethod
+    def seed(cls, seed, **size):
+        generate(orgs=1, seed=seed, **size)
+        organization = Organization.objects.latest('pk')
+        project = Project.objects.filter(organization=organization).order_by('-done_task_count', 'pk').first()
+        task = Task.objects.filter(project=project).order_by('-comment_count', 'pk').first()
+        return cls(organization, project, task)
+
+
+@dataclass
+class Operation:
+    name: str
+    query: str
+    variables: Callable = lambda tenant: {}
+    # Runs different SQL per database (here: the search backend).
+    vendor_specific: bool = False
+
+
+def _new_project(tenant):
+    return Project.objects.create(organization=tenant.organization, name=f'Benchmark {Project.all_objects.count()}')
+
+
+def _new_tasks(tenant, count):
+    return [Task.objects.create(project=tenant.project, title='Benchmark task') for _ in range(count)]
+
+
+OPERATIONS = [
+    Operation('organizations', '{ organizations { id name projectCount taskCount } }'),
+    Operation(
+        'organization',
+        'query($slug: String!) { organization(slug: $slug) { id name projectCount } }',
+        lambda t: {'slug': t.organization.slug},
+    ),
+    Operation(
+        'projects',
+        '{ projects(limit: 20) { id name status taskCount completedTasks completionRate isOverdue organization { name } } }',
+    ),
+    Operation(
+        'projects_connection',
+        '{ projectsConnection(first: 20) { edges { cursor node { id name taskCount } } pageInfo { hasNextPage } } }',
+    ),
+    Operation(
+        'project',
+        'query($id: ID!) { project(id: $id) { id name taskCount completionRate organization { name } } }',
+        lambda t: {'id': t.project.pk},
+    ),
+    Operation(
+        'tasks',
+        'query($projectId: ID) { tasks(projectId: $projectId, limit: 20) '
+        '{ id title status priority commentCount isOverdue project { name taskCount } } }',
+        lambda t: {'projectId': t.project.pk},
+    ),
+    Operation(
+        'tasks_connection',
+        '{ tasksConnection(first: 20) { edges { node { id title commentCount project { name } } } pageInfo { hasNextPage } } }',
+    ),
+    Operation(
+        'task',
+        'query($id: ID!) { task(id: $id) { id title commentCount project { name } } }',
+        lambda t: {'id': t.task.pk},
+    ),
+    Operation(
+        'task_comments',
+        'query($taskId: ID!) { taskComments(taskId: $taskId) { id content authorEmail task { title } } }',
+        lambda t: {'taskId': t.task.pk},
+    ),
+    Operation(
+        'task_comments_connection',
+        'query($taskId: ID!) { taskCommentsConnection(taskId: $taskId, first: 20) '
+        '{ edges { node { id content task { title } } } } }',
+        lambda t: {'taskId': t.task.pk},
+    ),
+    Operation(
+        'search',
+        # A common word, so every model has matches in both tenants.
+        '{ search(query: "the", limit: 10) { projects { id name } tasks { id title searchRank project { name } } comments { id } } }',
+        vendor_specific=True,
+    ),
+    Operation('suggest', '{ suggest(field: TASK_TITLE, query: "implem", limit: 10) { value score } }'),
+    Operation(
+        'project_stats',
+        '{ projectStats { totalProjects activeProjects completedProjects totalTasks completedTasks completionRate } }',
+    ),
+    Operation(
+        'create_organization',
+        'mutation($name: String!) { createOrganization(name: $name, contactEmail: "b@example.com") { success } }',
+        lambda t: {'name': f'Benchmark Org {Organization.objects.count()}'},
+    ),
+    Operation(
+        'create_project',
+        'mutation($name: String!) { createProject(name: $name) { success project { id taskCount } } }',
+        lambda t: {'name': f'Benchmark {Project.objects.count()}'},
+    ),
+    Operation(
+        'update_project',
+        'mutation($id: ID!) { updateProject(id: $id, status: "ON_HOLD") { success project { id status } } }',
+        lambda t: {'id': t.project.pk},
+    ),
+    Operation(
+        'delete_project',
+        'mutation($id: ID!) { deleteProject(id: $id) { success } }',
+        lambda t: {'id': _new_project(t).pk},
+    ),
+    Operation(
+        'create_task',
+        'mutation($projectId: ID!) { createTask(projectId: $projectId, title: "Benchmark", status: "DONE") '
+        '{ success task { id project { taskCount } } } }',
+        lambda t: {'projectId': t.project.pk},
+    ),
+    Operation(
+        'update_task',
+        'mutation($id: ID!) { updateTask(id: $id, status: "BLOCKED") { success task { id status } } }',
+        lambda t: {'id': _new_tasks(t, 1)[0].pk},
+    ),
+    Operation(
+        'delete_task',
+        'mutation($id: ID!) { deleteTask(id: $id) { success } }',
+        lambda t: {'id': _new_tasks(t, 1)[0].pk},
+    ),
+    Operation(
+        'create_task_comment',
+        'mutation($taskId: ID!) { createTaskComment(taskId: $taskId, content: "Benchmark", authorEmail: "b@example.com") '
+        '{ success comment { id task { commentCount } } } }',
+        lambda t: {'taskId': t.task.pk},
+    ),
+    Operation(
+        'bulk_create_tasks',
+        'mutation($tasks: [BulkTaskCreateInput!]!) { bulkCreateTasks(tasks: $tasks) { success tasks { id } } }',
+        lambda t: {'tasks': [{'projectId': t.project.pk, 'title': f'Bulk {i}'} for i in range(50)]},
+    ),
+    Operation(
+        'bulk_update_tasks',
+        'mutation($tasks: [BulkTaskUpdateInput!]!) { bulkUpdateTasks(tasks: $tasks) { success tasks { id status } } }',
+        lambda t: {'tasks': [{'id': task.pk, 'status': 'DONE'} for task in _new_tasks(t, 50)]},
+    ),
+    Operation(
+        'bulk_delete_tasks',
+        'mutation($ids: [ID!]!) { bulkDeleteTasks(ids: $ids) { success deletedIds } }',
+        lambda t: {'ids': [task.pk for task in _new_tasks(t, 50)]},
+    ),
+]
+
+
+class GraphQLBenchmark(TestCase):
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tiny = Tenant.seed(seed=2, projects_per_org=2, tasks_per_project=3, comments_per_task=1)
+        cls.tenant = Tenant.seed(seed=1, **harness.SIZES[harness.SIZE])
+        cls.baselines = harness.load_baselines()
+
+    @classmethod
+    def tearDownClass(cls):
+        if harness.UPDATE_BASELINES and cls.results:
+            vendor_specific = {operation.name for operation in OPERATIONS if operation.vendor_specific}
+            harness.save_baselines(cls.baselines, cls.results, vendor_specific)
+        super().tearDownClass()
+
+    def measure(self, operation, tenant):
+        client = Client()
+
+        def run(variables):
+            response = client.post(
+                '/graphql/',
+                {'query': operation.query, 'variables': variables},
+                content_type='application/json',
+                HTTP_X_ORGANIZATION_SLUG=tenant.organization.slug,
+                # Measure the resolvers, not the response cache.
+                HTTP_CACHE_CONTROL='no-cache',
+            )
+            self.assertNotIn('errors', response.json())
+
+        return harness.measure(run, lambda: operation.variables(tenant))
+
+    def check(self, operation):
+        tiny = self.measure(operation, self.tiny)
+        result = self.measure(operation, self.tenant)
+        self.assertEqual(
+            result.queries, tiny.queries,
+            f'{operation.name}: query count grows with tenant size '
+            f'({tiny.queries} for the tiny tenant, {result.queries} at size {harness.SIZE})',
+        )
+
+        if harness.UPDATE_BASELINES:
+            type(self).results[operation.name] = result
+            return
+        counts = harness.counts_for(self.baselines, operation.name, operation.vendor_specific)
+        if counts is None and not operation.vendor_specific:
+            self.fail(f'No {harness.SIZE} baseline for {operation.name}; run with BENCHMARK_UPDATE_BASELINES=1')
+        wall_time_ms = harness.wall_time_for(self.baselines, operation.name)
+        problems = harness.regressions(result, counts, wall_time_ms)
+        self.assertFalse(problems, f'{operation.name} regressed: ' + '; '.join(problems))
+
+
+def _benchmark(operation):
+    def test(self):
+        self.check(operation)
+    test.__name__ = f'test_{operation.name}'
+    test.__doc__ = f'Benchmark {operation.name}'
+    return test
+
+
+for _operation in OPERATIONS:
+    setattr(GraphQLBenchmark, f'test_{_operation.name}', _benchmark(_operation))
@@ -0,0 +1,20 @@
+import pytest
+from django.db import connections
+
+REPLICA = 'replica'
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    Add a second test database standing in for a read replica. Nothing
+    replicates to it, so tests can tell which database a query hit. It is not
+    in DATABASE_REPLICAS; tests opt in with override_settings.
+    """
+    if REPLICA in connections.settings:
+        return
+    primary = connections.settings['default']
+    test_name = None
+    if primary['ENGINE'] != 'django.db.backends.sqlite3':
+        test_name = (primary['TEST']['NAME'] or f"test_{primary['NAME']}") + '_replica'
+    connections.settings[REPLICA] = {**primary, 'TEST': {**primary['TEST'], 'NAME': test_name, 'MIRROR': None}}
@@ -0,0 +1,109 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.core import archive, counters, purge
+from apps.core.models import ProjectArchive
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.organization, name="Old", status='ARCHIVED')
+        self.active = Project.objects.create(organization=self.organization, name="Active")
+        for i, status in enumerate(['TODO', 'DONE', 'DONE']):
+            task = Task.objects.create(project=self.project, title=f'Task {i}', status=status)
+            TaskComment.objects.create(task=task, content=f'Comment {i}', author_email='a@example.com')
+        Task.objects.create(project=self.active, title='Live task')
+        self.task = Task.objects.filter(project=self.project).last()
+        self.titles = list(Task.objects.filter(project=self.project).values_list('title', flat=True))
+
+    def _graphql_query(self, query, variables=None):
+        response = self.client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+            headers={'X-Organization-Slug': self.organization.slug, 'Cache-Control': 'no-cache'},
+        )
+        return json.loads(response.content)['data']
+
+    def test_archived_rows_are_read_through(self):
+        call_command('archive_projects', stdout=StringIO())
+
+        self.assertFalse(Task.objects.filter(project=self.project).exists())
+        self.assertFalse(TaskComment.objects.filter(task__project=self.project).exists())
+        self.assertEqual(Task.objects.count(), 1)
+        record = ProjectArchive.objects.get()
+        self.assertEqual((record.task_count, record.comment_count), (3, 3))
+        self.project.refresh_from_db()
+        self.assertIsNotNone(self.project.archived_at)
+
+        data = self._graphql_query(
+            'query($id: ID!) { tasks(projectId: $id) { title project { name taskCount } } '
+            'done: tasks(projectId: $id, status: "DONE") { title } }',
+            {'id': self.project.pk},
+        )
+        self.assertEqual([task['title'] for task in data['tasks']], self.titles)
+        self.assertEqual(data['tasks'][0]['project'], {'name': 'Old', 'taskCount': 3})
+        self.assertEqual(len(data['done']), 2)
+
+        data = self._graphql_query(
+            'query($id: ID!) { task(id: $id) { title status } taskComments(taskId: $id) { content task { title } } }',
+            {'id': self.task.pk},
+        )
+        self.assertEqual(data['task'], {'title': self.task.title, 'status': self.task.status})
+        self.assertEqual(data['taskComments'], [{'content': 'Comment 0', 'task': {'title': 'Task 0'}}])
+
+    def test_live_task_without_comments_skips_the_archives(self):
+        live = Task.objects.get(title='Live task')
+        # The archive's id range now covers the live task.
+        Task.objects.create(project=self.project, title='Task 3')
+        archive.archive_project(self.project)
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self._graphql_query('query($id: ID!) { taskComments(taskId: $id) { content } }', {'id': live.pk})
+        self.assertEqual(data['taskComments'], [])
+        self.assertFalse([query for query in queries if 'project_archives' in query['sql']])
+
+    def test_restore(self):
+        archive.archive_project(self.project)
+        data = self._graphql_query(
+            'mutation($id: ID!) { restoreProject(id: $id) { success restoredTasks project { status archivedAt } } }',
+            {'id': self.project.pk},
+        )['restoreProject']
+        self.assertEqual(data, {'success': True, 'restoredTasks': 3, 'project': {'status': 'ACTIVE', 'archivedAt': None}})
+
+        restored = Task.objects.get(pk=self.task.pk)
+        self.assertEqual((restored.title, restored.created_at), (self.task.title, self.task.created_at))
+        self.assertEqual(TaskComment.objects.filter(task__project=self.project).count(), 3)
+        self.assertFalse(ProjectArchive.objects.exists())
+        self.assertFalse(archive.eligible_projects().exists())
+
+    def test_completed_projects_wait_for_the_retention_period(self):
+        Project.objects.filter(pk=self.project.pk).update(status='COMPLETED')
+        self.assertFalse(archive.eligible_projects().exists())
+        Project.objects.filter(pk=self.project.pk).update(updated_at=timezone.now() - timedelta(days=91))
+        self.assertEqual(list(archive.eligible_projects()), [self.project])
+
+    def test_counters_survive_archiving(self):
+        archive.archive_project(self.project)
+        counters.reconcile()
+        self.project.refresh_from_db()
+        self.organization.refresh_from_db()
+        self.assertEqual((self.project.task_count, self.project.done_task_count), (3, 2))
+        self.assertEqual(self.organization.task_count, 4)
+
+    def test_purge_removes_the_archive(self):
+        archive.archive_project(self.project)
+        purge.delete_project(self.project)
+        purge.run_pending(pause=0)
+        self.assertFalse(ProjectArchive.objects.exists())
+        self.assertFalse(Project.all_objects.filter(pk=self.project.pk).exists())
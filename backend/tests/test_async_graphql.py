@@ -0,0 +1,78 @@
+import json
+from django.test import AsyncRequestFactory, TestCase
+from django.views.decorators.csrf import csrf_exempt
+from apps.core.middleware import OrganizationMiddleware, organization_cache
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.schema import metrics
+from apps.schema.views import AsyncGraphQLView
+from apps.tasks.models import Task, TaskComment
+
+
+class AsyncGraphQLViewTest(TestCase):
+    def setUp(self):
+        organization_cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.view = OrganizationMiddleware(csrf_exempt(AsyncGraphQLView.as_view()))
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(organization=self.organization, name="Alpha")
+        self.task = Task.objects.create(project=self.project, title="Write docs", status='DONE')
+        TaskComment.objects.create(task=self.task, content="Done", author_email="a@example.com")
+
+    async def _graphql_query(self, query, variables=None):
+        request = self.factory.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+            headers={'X-Organization-Slug': self.organization.slug, 'Cache-Control': 'no-cache'},
+        )
+        response = await self.view(request)
+        return json.loads(response.content)
+
+    async def test_root_fields_resolve_concurrently(self):
+        metrics.reset()
+        data = (await self._graphql_query('''
+            {
+                projects { name completionRate organization { name } }
+                tasks { title project { name organization { slug } } }
+                taskComments(taskId: %d) { content task { title } }
+                projectsConnection(first: 1) { edges { node { name } } pageInfo { hasNextPage } }
+                projectStats { totalTasks completedTasks }
+                search(query: "docs") { tasks { title } }
+            }
+        ''' % self.task.pk))['data']
+
+        self.assertEqual(data['projects'], [
+            {'name': 'Alpha', 'completionRate': 100.0, 'organization': {'name': 'Test Organization'}}
+        ])
+        self.assertEqual(data['tasks'][0]['project']['organization']['slug'], self.organization.slug)
+        self.assertEqual(data['taskComments'], [{'content': 'Done', 'task': {'title': 'Write docs'}}])
+        self.assertEqual(data['projectsConnection']['edges'], [{'node': {'name': 'Alpha'}}])
+        self.assertEqual(data['projectStats'], {'totalTasks': 1, 'completedTasks': 1})
+        self.assertEqual(data['search']['tasks'], [{'title': 'Write docs'}])
+        # SQL run by the ORM threads is attributed to the operation.
+        self.assertGreater(metrics.sql_queries.sum('anonymous', 'query'), 5)
+
+    async def test_mutation(self):
+        data = await self._graphql_query(
+            'mutation($projectId: ID!) { createTask(projectId: $projectId, title: "Async") '
+            '{ success task { title project { taskCount } } } }',
+            {'projectId': self.project.pk},
+        )
+        result = data['data']['createTask']
+        self.assertTrue(result['success'])
+        self.assertEqual(result['task']['project']['taskCount'], 2)
+        self.assertTrue(await Task.objects.filter(title='Async').aexists())
+
+    async def test_unknown_tenant(self):
+        request = self.factory.post(
+            '/graphql/',
+            {'query': '{ projects { name } }'},
+            content_type='application/json',
+            headers={'X-Organization-Slug': 'missing'},
+        )
+        response = await self.view(request)
+        self.assertEqual(json.loads(response.content)['data'], {'projects': []})
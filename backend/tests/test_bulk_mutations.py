@@ -0,0 +1,148 @@
+from django.test import TestCase, Client, override_settings
+from apps.core import events
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+
+class BulkTaskMutationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(organization=self.organization, name="Project")
+        other = Organization.objects.create(name="Other", contact_email="other@example.com")
+        self.foreign_project = Project.objects.create(organization=other, name="Foreign")
+
+    def _graphql_query(self, query, variables=None):
+        return self.client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+        )
+
+    def test_bulk_create_reports_item_errors(self):
+        query = '''
+        mutation($tasks: [BulkTaskCreateInput!]!) {
+            bulkCreateTasks(tasks: $tasks) {
+                success
+                tasks { title status }
+                itemErrors { index message }
+            }
+        }
+        '''
+        tasks = [
+            {'projectId': self.project.id, 'title': f'Task {i}', 'status': 'DONE' if i % 2 else 'TODO'}
+            for i in range(10)
+        ]
+        tasks.append({'projectId': self.project.id, 'title': 'Bad', 'status': 'NOPE'})
+        tasks.append({'projectId': self.foreign_project.id, 'title': 'Elsewhere'})
+
+        result = self._graphql_query(query, {'tasks': tasks}).json()['data']['bulkCreateTasks']
+
+        self.assertFalse(result['success'])
+        self.assertEqual(len(result['tasks']), 10)
+        self.assertEqual([e['index'] for e in result['itemErrors']], [10, 11])
+        self.assertEqual(result['itemErrors'][1]['message'], 'Project not found')
+        self.project.refresh_from_db()
+        self.organization.refresh_from_db()
+        self.assertEqual(self.project.task_count, 10)
+        self.assertEqual(self.project.completed_tasks, 5)
+        self.assertEqual(self.organization.task_count, 10)
+        self.assertFalse(Task.objects.filter(project=self.foreign_project).exists())
+
+    def test_bulk_update_moves_statuses_in_one_statement(self):
+        tasks = Task.objects.bulk_create([
+            Task(project=self.project, title=f'Task {i}') for i in range(20)
+        ])
+        Project.objects.filter(pk=self.project.pk).update(todo_task_count=20)
+        foreign = Task.objects.create(project=self.foreign_project, title='Foreign')
+        query = '''
+        mutation($tasks: [BulkTaskUpdateInput!]!) {
+            bulkUpdateTasks(tasks: $tasks) { success tasks { status } itemErrors { id message } }
+        }
+        '''
+        items = [{'id': task.id, 'status': 'DONE'} for task in tasks]
+        items.append({'id': foreign.id, 'status': 'DONE'})
+
+        # Organization, task fetch, savepoint, one UPDATE, counters, stats mark, release.
+        with self.assertNumQueries(7):
+            result = self._graphql_query(query, {'tasks': items}).json()['data']['bulkUpdateTasks']
+
+        self.assertEqual(len(result['tasks']), 20)
+        self.assertEqual(result['itemErrors'], [{'id': str(foreign.id), 'message': 'Task not found'}])
+        self.assertEqual(Task.objects.filter(project=self.project, status='DONE').count(), 20)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.status, 'TODO')
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.todo_task_count, self.project.done_task_count), (0, 20))
+
+    def test_bulk_update_publishes_one_batch_of_events(self):
+        tasks = [Task.objects.create(project=self.project, title=f'Task {i}') for i in range(5)]
+        published = []
+        broker = events.get_broker()
+        broker.publish_many, original = published.append, broker.publish_many
+        self.addCleanup(setattr, broker, 'publish_many', original)
+        query = '''
+        mutation($tasks: [BulkTaskUpdateInput!]!) {
+            bulkUpdateTasks(tasks: $tasks) { success }
+        }
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            self._graphql_query(query, {'tasks': [{'id': task.id, 'status': 'DONE'} for task in tasks]})
+
+        self.assertEqual(len(published), 1)
+        self.assertEqual([event.id for event in published[0]], [task.id for task in tasks])
+
+    def test_bulk_update_with_mixed_changes(self):
+        first = Task.objects.create(project=self.project, title='First')
+        second = Task.objects.create(project=self.project, title='Second')
+        query = '''
+        mutation($tasks: [BulkTaskUpdateInput!]!) {
+            bulkUpdateTasks(tasks: $tasks) { success itemErrors { index message } }
+        }
+        '''
+        result = self._graphql_query(query, {'tasks': [
+            {'id': first.id, 'priority': 'HIGH'},
+            {'id': second.id, 'title': 'Renamed', 'status': 'BLOCKED'},
+            {'id': second.id, 'assigneeEmail': 'not-an-email'},
+        ]}).json()['data']['bulkUpdateTasks']
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['itemErrors'][0]['index'], 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.priority, 'HIGH')
+        self.assertEqual((second.title, second.status, second.assignee_email), ('Renamed', 'BLOCKED', ''))
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.todo_task_count, self.project.blocked_task_count), (1, 1))
+
+    def test_bulk_delete(self):
+        tasks = [Task.objects.create(project=self.project, title=f'Task {i}') for i in range(3)]
+        foreign = Task.objects.create(project=self.foreign_project, title='Foreign')
+        query = '''
+        mutation($ids: [ID!]!) {
+            bulkDeleteTasks(ids: $ids) { success deletedIds itemErrors { id } }
+        }
+        '''
+        ids = [task.id for task in tasks[:2]] + [foreign.id]
+        result = self._graphql_query(query, {'ids': ids}).json()['data']['bulkDeleteTasks']
+
+        self.assertEqual(sorted(result['deletedIds']), sorted(str(task.id) for task in tasks[:2]))
+        self.assertEqual(result['itemErrors'], [{'id': str(foreign.id)}])
+        self.assertTrue(Task.objects.filter(pk=foreign.pk).exists())
+        self.organization.refresh_from_db()
+        self.assertEqual(self.organization.task_count, 1)
+
+    @override_settings(BULK_TASK_MAX_ITEMS=2)
+    def test_batch_size_limit(self):
+        query = '''
+        mutation($ids: [ID!]!) {
+            bulkDeleteTasks(ids: $ids) { success errors }
+        }
+        '''
+        result = self._graphql_query(query, {'ids': [1, 2, 3]}).json()['data']['bulkDeleteTasks']
+        self.assertEqual(result, {'success': False, 'errors': ['At most 2 tasks can be changed at once']})
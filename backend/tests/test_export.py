@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import TestCase, Client, override_settings
+from apps.api import export
+from apps.core import archive
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = project = Project.objects.create(organization=self.organization, name="Alpha")
+        for i in range(5):
+            task = Task.objects.create(project=project, title=f'Task {i}', status='DONE' if i else 'TODO')
+        TaskComment.objects.create(task=task, content='Looks good', author_email='a@example.com')
+
+        other = Organization.objects.create(name="Other", contact_email="other@example.com")
+        Task.objects.create(project=Project.objects.create(organization=other, name="Beta"), title='Hidden')
+
+    def _export(self, resource, **params):
+        return self.client.get(
+            f'/api/export/{resource}/',
+            params,
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+        )
+
+    def test_tasks_as_ndjson(self):
+        response = self._export('tasks')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f'Task {i}' for i in range(5)])
+        self.assertEqual(rows[0]['project'], 'Alpha')
+        self.assertEqual(rows[0]['status'], 'TODO')
+
+    def test_comments_as_csv(self):
+        response = self._export('comments', format='csv')
+        body = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['content'], 'Looks good')
+
+    def test_archived_rows_follow_the_live_ones(self):
+        archived = Project.objects.create(organization=self.organization, name="Done", status='ARCHIVED')
+        task = Task.objects.create(project=archived, title='Archived task', priority='HIGH')
+        TaskComment.objects.create(task=task, content='Archived comment', author_email='b@example.com')
+        archive.archive_project(archived)
+        Task.objects.create(project=self.project, title='Task 5')
+
+        rows = [json.loads(line) for line in b''.join(self._export('tasks').streaming_content).splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f'Task {i}' for i in range(6)] + ['Archived task'])
+        self.assertEqual(
+            {key: rows[-1][key] for key in ('id', 'project_id', 'project', 'priority')},
+            {'id': task.pk, 'project_id': archived.pk, 'project': 'Done', 'priority': 'HIGH'},
+        )
+        self.assertEqual(rows[-1]['created_at'], DjangoJSONEncoder().default(task.created_at))
+
+        body = b''.join(self._export('comments', format='csv').streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row['content'] for row in rows], ['Looks good', 'Archived comment'])
+        self.assertEqual(rows[1]['task_id'], str(task.pk))
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_chunk_size_is_read_when_exporting(self):
+        self.assertEqual(export.get_chunk_size(), 2)
+        rows = list(export.export_rows(self.organization, 'tasks'))
+        self.assertEqual([row[3] for row in rows], [f'Task {i}' for i in range(5)])
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self._export('tasks', format='xml').status_code, 400)
+        self.assertEqual(self._export('users').status_code, 404)
+        self.assertEqual(self.client.get('/api/export/tasks/').status_code, 400)
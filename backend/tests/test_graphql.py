@@ -84,6 +84,72 @@ class GraphQLTestCase(TestCase):
         self.assertEqual(stats['completedTasks'], 1)
         self.assertEqual(stats['completionRate'], 100.0)
 
+    def test_project_stats_recomputed_after_writes(self):
+        project = Project.objects.create(
+            organization=self.organization,
+            name="Test Project"
+        )
+        task = Task.objects.create(project=project, title="Test Task")
+
+        query = '''
+        query {
+            projectStats {
+                totalTasks
+                completedTasks
+                completionRate
+            }
+        }
+        '''
+
+        stats = self._graphql_query(query).json()['data']['projectStats']
+        self.assertEqual(stats['completedTasks'], 0)
+
+        # A fresh rollup is served straight from the stats store.
+        with self.assertNumQueries(1):
+            self.client.post(
+                '/graphql/',
+                {'query': query},
+                content_type='application/json',
+                HTTP_X_ORGANIZATION_SLUG=self.organization.slug,
+                HTTP_CACHE_CONTROL='no-cache'
+            )
+
+        self._graphql_query(
+            'mutation($id: ID!) { updateTask(id: $id, status: "DONE") { success } }',
+            {'id': task.id}
+        )
+        stats = self._graphql_query(query).json()['data']['projectStats']
+        self.assertEqual(stats['totalTasks'], 1)
+        self.assertEqual(stats['completedTasks'], 1)
+        self.assertEqual(stats['completionRate'], 100.0)
+
+    def test_tasks_connection_pages_with_cursors(self):
+        project = Project.objects.create(
+            organization=self.organization,
+            name="Test Project"
+        )
+        for index in range(5):
+            Task.objects.create(project=project, title=f"Task {index}")
+
+        query = '''
+        query($after: String) {
+            tasksConnection(first: 2, after: $after) {
+                edges { cursor node { title } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+        '''
+
+        titles = []
+        after = None
+        for _ in range(3):
+            response = self._graphql_query(query, {'after': after})
+            connection = response.json()['data']['tasksConnection']
+            titles.extend(edge['node']['title'] for edge in connection['edges'])
+            after = connection['pageInfo']['endCursor']
+        self.assertFalse(connection['pageInfo']['hasNextPage'])
+        self.assertEqual(titles, [f"Task {index}" for index in reversed(range(5))])
+
     def test_create_project_mutation(self):
         mutation = '''
         mutation {
@@ -104,4 +170,33 @@ class GraphQLTestCase(TestCase):
         data = response.json()
         result = data['data']['createProject']
         self.assertTrue(result['success'])
-        self.assertEqual(result['project']['name'], "New Project")
\ No newline at end of file
+        self.assertEqual(result['project']['name'], "New Project")
+
+    def test_project_counts_read_stored_counters(self):
+        for index in range(3):
+            project = Project.objects.create(
+                organization=self.organization,
+                name=f"Project {index}"
+            )
+            Task.objects.create(project=project, title="Open Task")
+            Task.objects.create(project=project, title="Done Task", status="DONE")
+
+        query = '''
+        query {
+            projects {
+                taskCount
+                completedTasks
+                completionRate
+            }
+        }
+        '''
+
+        # Organization lookup and the projects page; counts are columns.
+        with self.assertNumQueries(2):
+            response = self._graphql_query(query)
+        projects = response.json()['data']['projects']
+        self.assertEqual(len(projects), 3)
+        for project in projects:
+            self.assertEqual(project['taskCount'], 2)
+            self.assertEqual(project['completedTasks'], 1)
+            self.assertEqual(project['completionRate'], 50.0)
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from apps.core.bulk import csv_field
+from apps.core.models import ImportCheckpoint
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.importer import IMPORTERS
+from apps.tasks.models import Task
+
+
+class ImportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(organization=self.organization, name="Alpha")
+        other = Organization.objects.create(name="Other", contact_email="other@example.com")
+        Project.objects.create(organization=other, name="Foreign")
+
+    def test_csv_upload_validates_rows(self):
+        body = (
+            'project,title,status,priority,assignee_email,due_date\n'
+            'Alpha,First,DONE,HIGH,a@example.com,2026-01-31T12:00:00Z\n'
+            'Alpha,Second,,,,\n'
+            'Alpha,Bad status,SOMEDAY,,,\n'
+            'Foreign,Not ours,TODO,,,\n'
+            'Alpha,Bad email,TODO,LOW,nope,\n'
+        )
+        response = self.client.post(
+            '/api/import/tasks/?format=csv',
+            body,
+            content_type='text/csv',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+        )
+        report = response.json()
+
+        self.assertEqual(report['imported'], 2)
+        self.assertEqual(report['failed'], 3)
+        self.assertEqual([error['line'] for error in report['errors']], [3, 4, 5])
+        self.assertIn('status', report['errors'][0]['message'])
+        self.assertEqual(report['errors'][1]['message'], "Project 'Foreign' not found")
+        second = Task.objects.get(title='Second')
+        self.assertEqual((second.status, second.priority, second.due_date), ('TODO', 'MEDIUM', None))
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.todo_task_count, self.project.done_task_count), (1, 1))
+
+    def test_command_resumes_from_checkpoint(self):
+        rows = [{'project_id': self.project.id, 'title': f'Task {i}'} for i in range(7)]
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as f:
+            f.write('\n'.join(json.dumps(row) for row in rows))
+        self.addCleanup(os.unlink, f.name)
+        # An earlier run committed the first four rows before stopping.
+        Task.objects.bulk_create(Task(project=self.project, title=f'Task {i}') for i in range(4))
+        ImportCheckpoint.objects.create(
+            key='migration', organization=self.organization, resource='tasks', rows_processed=4
+        )
+
+        out = StringIO()
+        call_command(
+            'import_data', 'tasks', f.name,
+            organization=self.organization.slug, checkpoint='migration', batch_size=2, stdout=out
+        )
+
+        self.assertIn('Resumed after 4 rows', out.getvalue())
+        self.assertEqual(
+            sorted(Task.objects.values_list('title', flat=True)),
+            [f'Task {i}' for i in range(7)]
+        )
+        checkpoint = ImportCheckpoint.objects.get(key='migration')
+        self.assertEqual((checkpoint.rows_processed, checkpoint.rows_imported), (7, 3))
+        self.assertIsNotNone(checkpoint.completed_at)
+
+    @override_settings(IMPORT_BATCH_SIZE=2)
+    def test_batch_size_is_read_when_importing(self):
+        self.assertEqual(IMPORTERS['tasks'](self.organization).batch_size, 2)
+        self.assertEqual(IMPORTERS['tasks'](self.organization, batch_size=3).batch_size, 3)
+
+    def test_comments_update_counters(self):
+        task = Task.objects.create(project=self.project, title='Task')
+        body = '\n'.join(json.dumps(row) for row in [
+            {'task_id': task.id, 'content': 'One', 'author_email': 'a@example.com'},
+            {'task_id': task.id, 'content': 'Two', 'author_email': 'b@example.com'},
+            {'task_id': 999999, 'content': 'Lost', 'author_email': 'c@example.com'},
+        ])
+        report = self.client.post(
+            '/api/import/comments/',
+            body,
+            content_type='application/x-ndjson',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+        ).json()
+
+        self.assertEqual((report['imported'], report['failed']), (2, 1))
+        task.refresh_from_db()
+        self.assertEqual(task.comment_count, 2)
+
+
+class CopyFormatTest(SimpleTestCase):
+    def test_only_none_is_written_as_null(self):
+        row = [None, '', r'\N', 'say "hi"', 3]
+        self.assertEqual(','.join(csv_field(value) for value in row), r',"","\N","say ""hi""","3"')
@@ -0,0 +1,149 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+from apps.core import purge, queue
+from apps.core.models import Job, Purge
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+calls = []
+
+
+@queue.job()
+def add(a, b):
+    calls.append((a, b))
+    return {'sum': a + b}
+
+
+@queue.job(max_attempts=2, backoff=30)
+def flaky():
+    raise RuntimeError('Try again')
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+
+    def test_job_runs_and_records_its_result(self):
+        job = queue.enqueue('add', {'a': 1, 'b': 2})
+        self.assertEqual(queue.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.DONE, 1, {'sum': 3}))
+        self.assertIsNotNone(job.completed_at)
+        self.assertEqual(queue.run_pending(), 0)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = queue.enqueue('flaky')
+        queue.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), (Job.PENDING, 1, 'RuntimeError: Try again'))
+        self.assertGreaterEqual(job.run_at, timezone.now() + timedelta(seconds=29))
+        self.assertEqual(queue.run_pending(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        queue.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_retry_delay_doubles_up_to_the_maximum(self):
+        with override_settings(JOB_RETRY_BACKOFF=10, JOB_RETRY_MAX_DELAY=60):
+            self.assertTrue(10 <= queue.retry_delay(1) <= 12.5)
+            self.assertTrue(40 <= queue.retry_delay(3) <= 50)
+            self.assertTrue(60 <= queue.retry_delay(8) <= 75)
+
+    def test_scheduled_job_waits_for_its_time(self):
+        job = queue.enqueue('add', {'a': 1, 'b': 1}, delay=60)
+        self.assertEqual(queue.run_pending(), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(queue.run_pending(), 1)
+
+    def test_key_allows_one_active_job(self):
+        first = queue.enqueue('add', {'a': 1, 'b': 1}, key='sum')
+        self.assertEqual(queue.enqueue('add', {'a': 2, 'b': 2}, key='sum'), first)
+        queue.run_pending()
+        self.assertNotEqual(queue.enqueue('add', {'a': 2, 'b': 2}, key='sum'), first)
+        self.assertEqual(calls, [(1, 1)])
+
+    def test_abandoned_job_is_claimed_again(self):
+        job = queue.enqueue('add', {'a': 1, 'b': 1})
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, attempts=1, locked_by='gone', locked_at=timezone.now() - queue.STALE_AFTER * 2
+        )
+        self.assertEqual(queue.run_pending('other'), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.DONE, 2, 'other'))
+
+    def test_worker_runs_periodic_jobs_and_schedules_the_next_run(self):
+        queue.enqueue('add', {'a': 2, 'b': 3})
+        out = StringIO()
+        call_command('run_workers', '--burst', '--concurrency', '1', stdout=out)
+
+        self.assertEqual(calls, [(2, 3)])
+        periodic = [task for task in queue.registry.values() if task.every]
+        self.assertIn(f'Ran {len(periodic) + 1} jobs', out.getvalue())
+        archive_runs = Job.objects.filter(name='archive_projects').order_by('pk')
+        self.assertEqual([job.status for job in archive_runs], [Job.DONE, Job.PENDING])
+        self.assertEqual(archive_runs[0].result, {'archived': 0})
+        self.assertGreater(archive_runs[1].run_at, timezone.now() + timedelta(minutes=59))
+
+    @override_settings(PURGE_IN_BACKGROUND=False)
+    def test_purge_runs_as_a_job(self):
+        project = Project.objects.create(organization=self.organization, name="Doomed")
+        Task.objects.create(project=project, title='Task')
+        deletion = purge.delete_project(project)
+
+        job = Job.objects.get(name='run_purge')
+        self.assertEqual((job.kwargs, job.organization_id), ({'purge_id': deletion.pk}, self.organization.pk))
+        queue.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'projects_deleted': 1, 'tasks_deleted': 1, 'comments_deleted': 0})
+        self.assertEqual(Purge.objects.get().status, Purge.DONE)
+
+    def test_sample_data_in_the_background(self):
+        call_command('create_sample_data', '--background', '--orgs', '1', stdout=StringIO())
+        job = Job.objects.get(name='create_sample_data')
+        queue.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result['organizations']), (Job.DONE, 1))
+
+    def test_job_status_query(self):
+        job = queue.enqueue('add', {'a': 1, 'b': 2}, organization_id=self.organization.pk)
+        other = queue.enqueue('add', {'a': 1, 'b': 2})
+        queue.run_pending()
+        query = 'query($id: ID!) { job(id: $id) { name status attempts result error } }'
+
+        def fetch(id):
+            response = Client().post(
+                '/graphql/',
+                {'query': query, 'variables': {'id': id}},
+                content_type='application/json',
+                headers={'X-Organization-Slug': self.organization.slug, 'Cache-Control': 'no-cache'},
+            )
+            return json.loads(response.content)['data']['job']
+
+        data = fetch(job.pk)
+        self.assertEqual(json.loads(data.pop('result')), {'sum': 3})
+        self.assertEqual(data, {'name': 'add', 'status': 'DONE', 'attempts': 1, 'error': ''})
+        self.assertIsNone(fetch(other.pk))
+
+    def test_job_status_is_not_served_from_the_response_cache(self):
+        job = queue.enqueue('add', {'a': 1, 'b': 2}, organization_id=self.organization.pk)
+        query = 'query($id: ID!) { job(id: $id) { status } }'
+
+        def poll():
+            response = Client().post(
+                '/graphql/',
+                {'query': query, 'variables': {'id': job.pk}},
+                content_type='application/json',
+                headers={'X-Organization-Slug': self.organization.slug},
+            )
+            return json.loads(response.content)['data']['job']['status']
+
+        self.assertEqual(poll(), 'PENDING')
+        queue.run_pending()
+        self.assertEqual(poll(), 'DONE')
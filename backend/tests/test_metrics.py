@@ -0,0 +1,71 @@
+from django.test import TestCase, Client, override_settings
+from apps.core.metrics import Histogram
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.schema import metrics
+
+
+class HistogramTest(TestCase):
+    def test_renders_cumulative_buckets(self):
+        histogram = Histogram('latency_seconds', 'Latency.', ['operation'], buckets=(0.1, 1))
+        histogram.observe(0.05, 'a"b')
+        histogram.observe(0.5, 'a"b')
+        histogram.observe(5, 'a"b')
+
+        lines = histogram.render()
+        self.assertIn('latency_seconds_bucket{operation="a\\"b",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{operation="a\\"b",le="1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{operation="a\\"b",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_count{operation="a\\"b"} 3', lines)
+
+
+@override_settings(DEBUG=False, GRAPHQL_DEBUG_TOKEN='secret')
+class GraphQLMetricsTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        Project.objects.create(organization=self.organization, name="Alpha")
+
+    def _graphql_query(self, query, **headers):
+        return self.client.post(
+            '/graphql/',
+            {'query': query},
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug,
+            HTTP_CACHE_CONTROL='no-cache',
+            **headers
+        )
+
+    def test_records_operation_metrics(self):
+        self._graphql_query('query ListProjects { projects { name } }')
+        self._graphql_query('query ListProjects { projects { nope } }')
+        self._graphql_query('{ projectStats { totalProjects } }')
+
+        labels = ('ListProjects', 'query')
+        self.assertEqual(metrics.requests_total.value(*labels, 'success'), 1)
+        self.assertEqual(metrics.requests_total.value(*labels, 'error'), 1)
+        self.assertEqual(metrics.requests_total.value('anonymous', 'query', 'success'), 1)
+        self.assertEqual(metrics.request_duration.count(*labels), 2)
+        self.assertGreater(metrics.sql_queries.sum(*labels), 0)
+
+        body = self.client.get('/api/metrics/').content.decode()
+        self.assertIn('# TYPE graphql_request_duration_seconds histogram', body)
+        self.assertIn('graphql_requests_total{operation="ListProjects",type="query",status="error"} 1', body)
+
+    @override_settings(GRAPHQL_METRICS_MAX_OPERATIONS=1)
+    def test_operation_names_are_capped(self):
+        self._graphql_query('query First { projects { name } }')
+        self._graphql_query('query Second { projects { name } }')
+        self.assertEqual(metrics.requests_total.value('other', 'query', 'success'), 1)
+
+    def test_debug_requires_token(self):
+        query = '{ projects { name } _debug { sql { rawSql } } }'
+        self.assertIsNone(self._graphql_query(query).json()['data']['_debug'])
+
+        data = self._graphql_query(query, HTTP_X_GRAPHQL_DEBUG='secret').json()['data']
+        self.assertTrue(data['_debug']['sql'])
+        self.assertIsNone(self._graphql_query(query, HTTP_X_GRAPHQL_DEBUG='wrong').json()['data']['_debug'])
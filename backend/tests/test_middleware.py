@@ -0,0 +1,60 @@
+from django.test import TestCase, Client
+from apps.core.cache import TTLCache
+from apps.core.middleware import organization_cache
+from apps.organizations.models import Organization
+
+
+class TTLCacheTest(TestCase):
+    def test_entries_expire_and_evict(self):
+        now = [0]
+        cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+        now[0] = 10
+        self.assertIsNone(cache.get('a'))
+
+
+class OrganizationMiddlewareTest(TestCase):
+    def setUp(self):
+        organization_cache.clear()
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+
+    def _stats_query(self):
+        return self.client.post(
+            '/graphql/',
+            {'query': '{ projectStats { totalProjects } }'},
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug,
+            HTTP_CACHE_CONTROL='no-cache'
+        )
+
+    def test_lookup_is_lazy(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                '/api/health/',
+                HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_lookup_is_cached(self):
+        self._stats_query()
+        # Only the stats read remains once the slug is cached.
+        with self.assertNumQueries(1):
+            self._stats_query()
+
+    def test_deactivation_invalidates(self):
+        self._stats_query()
+        self.organization.is_active = False
+        self.organization.save()
+        self.assertEqual(organization_cache.get(self.organization.slug, 'missing'), 'missing')
+        response = self._stats_query()
+        self.assertEqual(response.json()['data']['projectStats']['totalProjects'], 0)
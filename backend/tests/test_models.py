@@ -99,4 +99,79 @@ class TaskCommentModelTest(TestCase):
             author_email="author@example.com"
         )
         self.assertEqual(comment.content, "Test comment")
-        self.assertEqual(self.task.comment_count, 1)
\ No newline at end of file
+        self.assertEqual(self.task.comment_count, 1)
+
+
+class CounterTest(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(
+            name="Test Org",
+            contact_email="test@example.com"
+        )
+        self.project = Project.objects.create(
+            organization=self.organization,
+            name="Test Project"
+        )
+
+    def test_counters_follow_task_lifecycle(self):
+        task = Task.objects.create(project=self.project, title="Test Task")
+        Task.objects.create(project=self.project, title="Other Task", status="DONE")
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = "DONE"
+        task.save()
+
+        self.project.refresh_from_db()
+        self.organization.refresh_from_db()
+        self.assertEqual(self.project.task_count, 2)
+        self.assertEqual(self.project.completed_tasks, 2)
+        self.assertEqual(self.project.todo_task_count, 0)
+        self.assertEqual(self.organization.project_count, 1)
+        self.assertEqual(self.organization.task_count, 2)
+
+        task.delete()
+        self.project.refresh_from_db()
+        self.organization.refresh_from_db()
+        self.assertEqual(self.project.completed_tasks, 1)
+        self.assertEqual(self.organization.task_count, 1)
+
+    def test_project_delete_updates_organization(self):
+        Task.objects.create(project=self.project, title="Test Task")
+        self.project.delete()
+        self.organization.refresh_from_db()
+        self.assertEqual(self.organization.project_count, 0)
+        self.assertEqual(self.organization.task_count, 0)
+
+    def test_only_status_changes_mark_stats_stale(self):
+        from apps.organizations.models import OrganizationStats
+
+        stats = OrganizationStats.objects.create(organization=self.organization)
+        project = Project.objects.get(pk=self.project.pk)
+        project.description = "Edited"
+        project.save()
+        stats.refresh_from_db()
+        self.assertEqual(stats.generation, 1)
+
+        project.status = "COMPLETED"
+        project.save()
+        project.save()
+        stats.refresh_from_db()
+        self.assertEqual(stats.generation, 2)
+
+    def test_reconcile_repairs_drift(self):
+        from apps.core import counters
+
+        task = Task.objects.create(project=self.project, title="Test Task")
+        TaskComment.objects.create(task=task, content="Hi", author_email="a@example.com")
+        Task.objects.filter(pk=task.pk).update(status="DONE", comment_count=7)
+        Organization.objects.filter(pk=self.organization.pk).update(task_count=42)
+
+        counters.reconcile()
+
+        task.refresh_from_db()
+        self.project.refresh_from_db()
+        self.organization.refresh_from_db()
+        self.assertEqual(task.comment_count, 1)
+        self.assertEqual(self.project.done_task_count, 1)
+        self.assertEqual(self.project.todo_task_count, 0)
+        self.assertEqual(self.organization.task_count, 1)
@@ -0,0 +1,108 @@
+from io import StringIO
+from unittest import skipUnless
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks import partitioning
+from apps.tasks.bulk import create_tasks
+from apps.tasks.models import Task, TaskComment
+
+
+class PartitionKeyTest(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.organization, name="Project")
+
+    def test_tasks_and_comments_carry_the_organization(self):
+        task = Task.objects.create(project=self.project, title='Saved')
+        comment = TaskComment.objects.create(task=task, content='Hi', author_email='a@example.com')
+        Task.objects.bulk_create([Task(project=self.project, title='Bulk')])
+        create_tasks(self.organization, [{'project_id': self.project.pk, 'title': 'Batch'}])
+
+        self.assertEqual(set(Task.objects.values_list('organization_id', flat=True)), {self.organization.pk})
+        self.assertEqual(comment.organization_id, self.organization.pk)
+
+    def test_tenant_queries_filter_on_the_partition_key(self):
+        for queryset in (
+            Task.objects.for_organization(self.organization),
+            TaskComment.objects.for_organization(self.organization),
+        ):
+            sql = str(queryset.query)
+            self.assertIn(f'{queryset.model._meta.db_table}"."organization_id" = {self.organization.pk}', sql)
+
+    @skipUnless(connection.vendor != 'postgresql', 'Runs against other databases')
+    def test_command_needs_postgresql(self):
+        with self.assertRaisesMessage(CommandError, 'Partitioning needs PostgreSQL'):
+            call_command('partition_tasks', stdout=StringIO())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitioning needs PostgreSQL')
+class PartitionCommandTest(TransactionTestCase):
+    def setUp(self):
+        self.organizations = [
+            Organization.objects.create(name=f"Organization {i}", contact_email=f"{i}@example.com") for i in range(3)
+        ]
+        for organization in self.organizations:
+            project = Project.objects.create(organization=organization, name="Project")
+            for i in range(5):
+                task = Task.objects.create(project=project, title=f'Task {i}')
+                TaskComment.objects.create(task=task, content='Hi', author_email='a@example.com')
+
+    def partition(self, *args):
+        call_command(
+            'partition_tasks', '--partitions', '4', '--batch-size', '4', '--pause', '0', *args, stdout=StringIO()
+        )
+
+    def test_prepare_copy_and_swap(self):
+        self.partition('--table', 'tasks', '--no-swap')
+        self.assertTrue(partitioning.exists('tasks_partitioned'))
+        self.assertFalse(partitioning.is_partitioned('tasks'))
+        # Writes during the copy reach the new table through the sync trigger.
+        task = Task.objects.for_organization(self.organizations[0]).first()
+        Task.objects.filter(pk=task.pk).update(title='Renamed')
+        Task.objects.filter(pk=Task.objects.order_by('-pk')[0].pk).delete()
+        Task.objects.create(project=task.project, title='Added')
+
+        self.partition()
+        self.assertTrue(partitioning.is_partitioned('tasks'))
+        self.assertTrue(partitioning.is_partitioned('task_comments'))
+        self.assertFalse(partitioning.exists('tasks_partitioned'))
+        self.assertEqual(Task.objects.count(), 15)
+        self.assertEqual(TaskComment.objects.count(), 14)
+        self.assertEqual(Task.objects.get(pk=task.pk).title, 'Renamed')
+
+        created = Task.objects.create(project=task.project, title='After the swap')
+        self.assertGreater(created.pk, task.pk)
+        TaskComment.objects.create(task=created, content='Hi', author_email='a@example.com')
+        for organization in self.organizations:
+            self.assertEqual(
+                set(Task.objects.for_organization(organization).values_list('organization_id', flat=True)),
+                {organization.pk},
+            )
+
+        out = StringIO()
+        call_command('partition_tasks', stdout=out)
+        self.assertIn('tasks is already partitioned', out.getvalue())
+
+
+class PartitioningSQLTest(SimpleTestCase):
+    def test_index_is_created_on_the_new_table(self):
+        self.assertEqual(
+            partitioning.index_on(
+                'CREATE INDEX tasks_assigne_0d6f5e_idx ON public.tasks USING btree (assignee_email)',
+                'tasks_assigne_0d6f5e_idx',
+                'tasks_partitioned',
+            ),
+            'CREATE INDEX tasks_assigne_0d6f5e_idx_part ON tasks_partitioned USING btree (assignee_email)',
+        )
+
+    def test_foreign_keys_gain_the_partition_key(self):
+        self.assertEqual(
+            partitioning.with_partition_key(
+                'FOREIGN KEY (task_id) REFERENCES tasks(id) DEFERRABLE INITIALLY DEFERRED'
+            ),
+            'FOREIGN KEY (task_id, organization_id) REFERENCES tasks(id, organization_id) '
+            'DEFERRABLE INITIALLY DEFERRED',
+        )
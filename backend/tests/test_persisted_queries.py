@@ -0,0 +1,50 @@
+import hashlib
+from django.test import TestCase, Client
+from apps.core.models import PersistedQuery
+from apps.organizations.models import Organization
+from apps.schema.persisted import document_cache
+
+QUERY = '{ projects { name } }'
+QUERY_HASH = hashlib.sha256(QUERY.encode()).hexdigest()
+
+
+class PersistedQueryTest(TestCase):
+    def setUp(self):
+        document_cache.clear()
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+
+    def _post(self, body):
+        return self.client.post(
+            '/graphql/',
+            body,
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+        )
+
+    def _extensions(self, sha256=QUERY_HASH):
+        return {'persistedQuery': {'version': 1, 'sha256Hash': sha256}}
+
+    def test_unknown_hash_asks_for_query(self):
+        response = self._post({'extensions': self._extensions()})
+        error = response.json()['errors'][0]
+        self.assertEqual(error['message'], 'PersistedQueryNotFound')
+        self.assertEqual(error['extensions']['code'], 'PERSISTED_QUERY_NOT_FOUND')
+
+    def test_registered_query_runs_by_hash(self):
+        response = self._post({'query': QUERY, 'extensions': self._extensions()})
+        self.assertEqual(response.json()['data'], {'projects': []})
+        self.assertTrue(PersistedQuery.objects.filter(sha256=QUERY_HASH).exists())
+
+        # Another worker only has the durable store.
+        document_cache.clear()
+        response = self._post({'extensions': self._extensions()})
+        self.assertEqual(response.json()['data'], {'projects': []})
+
+    def test_hash_mismatch_is_rejected(self):
+        response = self._post({'query': QUERY, 'extensions': self._extensions('0' * 64)})
+        self.assertEqual(response.json()['errors'][0]['extensions']['code'], 'INVALID_PERSISTED_QUERY')
+        self.assertFalse(PersistedQuery.objects.exists())
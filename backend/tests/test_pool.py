@@ -0,0 +1,120 @@
+import threading
+from django.test import SimpleTestCase
+from apps.core import metrics
+from apps.core.backends.postgresql.base import DatabaseWrapper
+from apps.core.pool import ConnectionPool, PoolTimeout, checkouts_total, connections_gauge, timeouts_total
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.healthy = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self.now = [0.0]
+        self.opened = []
+
+    def _pool(self, **options):
+        def connect():
+            self.opened.append(FakeConnection(len(self.opened)))
+            return self.opened[-1]
+
+        return ConnectionPool(
+            'test', connect,
+            close=lambda connection: setattr(connection, 'closed', True),
+            check=lambda connection: connection.healthy,
+            timer=lambda: self.now[0],
+            **options,
+        )
+
+    def test_connections_are_reused(self):
+        pool = self._pool(max_size=2)
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        pool.release(second)
+        self.assertEqual(len(self.opened), 2)
+        self.assertEqual(pool.stats(), {'size': 2, 'idle': 1, 'in_use': 1, 'min_size': 0, 'max_size': 2})
+        self.assertEqual(checkouts_total.value('test'), 3)
+        self.assertEqual(connections_gauge.value('test', 'in_use'), 1)
+
+    def test_waits_for_a_connection_then_times_out(self):
+        pool = ConnectionPool('test', lambda: FakeConnection(0), close=lambda connection: None, max_size=1)
+        held = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(timeout=0.01)
+        self.assertEqual(timeouts_total.value('test'), 1)
+
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+        waiter.start()
+        pool.release(held)
+        waiter.join()
+        self.assertEqual(acquired, [held])
+
+    def test_broken_connections_are_replaced(self):
+        pool = self._pool(check_interval=30)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.healthy = False
+        # Recently used connections are trusted without a round trip.
+        self.assertIs(pool.acquire(), connection)
+        pool.release(connection)
+
+        self.now[0] = 31
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_idle_and_old_connections_are_closed(self):
+        pool = self._pool(min_size=1, max_idle=60, max_lifetime=600)
+        pool.fill()
+        kept = pool.acquire()
+        extra = pool.acquire()
+        pool.release(kept)
+        pool.release(extra)
+
+        self.now[0] = 100
+        # Idle too long, but the pool keeps min_size connections.
+        self.assertIs(pool.acquire(), extra)
+        self.assertTrue(kept.closed)
+
+        self.now[0] = 700
+        pool.release(extra)
+        self.assertTrue(extra.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_discard(self):
+        pool = self._pool()
+        connection = pool.acquire()
+        pool.release(connection, discard=True)
+        self.assertTrue(connection.closed)
+        self.assertIsNot(pool.acquire(), connection)
+
+    def test_metrics_are_exposed(self):
+        pool = self._pool()
+        pool.acquire()
+        response = self.client.get('/api/metrics/')
+        content = response.content.decode()
+        self.assertIn('db_pool_connections{database="test",state="in_use"} 1', content)
+        self.assertIn('db_pool_checkouts_total{database="test"} 1', content)
+        self.assertIn('db_pool_wait_seconds_count{database="test"} 1', content)
+
+
+class PooledBackendTest(SimpleTestCase):
+    def test_pool_options_are_not_passed_to_the_driver(self):
+        wrapper = DatabaseWrapper({
+            'ENGINE': 'apps.core.backends.postgresql', 'NAME': 'app', 'USER': 'app', 'PASSWORD': '',
+            'HOST': 'localhost', 'PORT': '5432', 'OPTIONS': {'pool': {'max_size': 4}},
+            'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+            'TIME_ZONE': None, 'TEST': {},
+        }, alias='pooled')
+        params = wrapper.get_connection_params()
+        self.assertNotIn('pool', params)
+        self.assertEqual(wrapper.pool_options, {'max_size': 4})
@@ -0,0 +1,116 @@
+import json
+from datetime import timedelta
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.core import counters, purge
+from apps.core.models import Purge
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+
+
+class PurgeTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.organization, name="Doomed")
+        self.kept = Project.objects.create(organization=self.organization, name="Kept")
+        for i in range(5):
+            task = Task.objects.create(project=self.project, title=f'Task {i}')
+            for j in range(2):
+                TaskComment.objects.create(task=task, content=f'Comment {j}', author_email='a@example.com')
+        Task.objects.create(project=self.kept, title='Kept task')
+
+    def _graphql_query(self, query, variables=None, cache=False):
+        headers = {'X-Organization-Slug': self.organization.slug}
+        if not cache:
+            headers['Cache-Control'] = 'no-cache'
+        response = self.client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+            headers=headers,
+        )
+        return json.loads(response.content)
+
+    def test_delete_project_hides_it_then_purges_in_batches(self):
+        data = self._graphql_query(
+            'mutation($id: ID!) { deleteProject(id: $id) { success deletion { id status } } }',
+            {'id': self.project.pk},
+        )['data']['deleteProject']
+        self.assertTrue(data['success'])
+        self.assertEqual(data['deletion']['status'], 'PENDING')
+
+        data = self._graphql_query('{ projects { name } tasks { title } }')['data']
+        self.assertEqual([project['name'] for project in data['projects']], ['Kept'])
+        self.assertEqual([task['title'] for task in data['tasks']], ['Kept task'])
+        self.organization.refresh_from_db()
+        self.assertEqual((self.organization.project_count, self.organization.task_count), (1, 1))
+        # Nothing has been deleted yet.
+        self.assertEqual(TaskComment.objects.count(), 10)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(purge.run_pending(batch_size=3, pause=0), 1)
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE FROM "task_comments"')]
+        self.assertEqual(len(deletes), 4)
+        self.assertFalse(Project.all_objects.filter(pk=self.project.pk).exists())
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(TaskComment.objects.count(), 0)
+
+        deletion = self._graphql_query(
+            'query($id: ID!) { deletion(id: $id) { status progress projectsDeleted tasksDeleted commentsDeleted } }',
+            {'id': Purge.objects.get().pk},
+        )['data']['deletion']
+        self.assertEqual(deletion, {
+            'status': 'DONE', 'progress': 1.0, 'projectsDeleted': 1, 'tasksDeleted': 5, 'commentsDeleted': 10,
+        })
+
+    def test_progress_is_not_served_from_the_response_cache(self):
+        deletion = purge.delete_project(self.project)
+        query = 'query($id: ID!) { deletion(id: $id) { status } }'
+        first = self._graphql_query(query, {'id': deletion.pk}, cache=True)
+        self.assertEqual(first['data']['deletion']['status'], 'PENDING')
+        purge.run_pending(pause=0)
+
+        second = self._graphql_query(query, {'id': deletion.pk}, cache=True)
+        self.assertEqual(second['data']['deletion']['status'], 'DONE')
+        self.assertNotIn('responseCache', second.get('extensions', {}))
+
+    def test_reconcile_leaves_out_projects_being_purged(self):
+        purge.delete_project(self.project)
+        counters.reconcile()
+        self.organization.refresh_from_db()
+        self.assertEqual((self.organization.project_count, self.organization.task_count), (1, 1))
+
+        purge.run_pending(pause=0)
+        counters.reconcile()
+        self.organization.refresh_from_db()
+        self.assertEqual((self.organization.project_count, self.organization.task_count), (1, 1))
+
+    def test_deleting_twice_returns_the_same_purge(self):
+        first = purge.delete_project(self.project)
+        self.assertEqual(purge.delete_project(self.project), first)
+        self.assertEqual(Purge.objects.count(), 1)
+        self.organization.refresh_from_db()
+        self.assertEqual(self.organization.project_count, 1)
+
+    def test_delete_organization(self):
+        purge.delete_organization(self.organization)
+        self.assertFalse(Organization.objects.get(pk=self.organization.pk).is_active)
+        self.assertFalse(Project.objects.exists())
+
+        purge.run_pending(batch_size=2, pause=0)
+        self.assertFalse(Organization.objects.filter(pk=self.organization.pk).exists())
+        self.assertEqual((Project.all_objects.count(), Task.objects.count(), TaskComment.objects.count()), (0, 0, 0))
+        self.assertEqual(Purge.objects.get().progress, 1.0)
+
+    def test_abandoned_purge_is_resumed(self):
+        record = purge.delete_project(self.project)
+        Purge.objects.filter(pk=record.pk).update(status=Purge.RUNNING)
+        self.assertIsNone(purge.claim_next())
+
+        Purge.objects.filter(pk=record.pk).update(updated_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(purge.run_pending(pause=0), 1)
+        self.assertEqual(Purge.objects.get().status, Purge.DONE)
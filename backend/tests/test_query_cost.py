@@ -0,0 +1,70 @@
+from django.test import TestCase, Client, override_settings
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+
+class QueryCostTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+
+    def _graphql_query(self, query, variables=None):
+        body = {'query': query}
+        if variables:
+            body['variables'] = variables
+        return self.client.post(
+            '/graphql/',
+            body,
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+        )
+
+    def test_cost_reported_in_extensions(self):
+        response = self._graphql_query(
+            'query($n: Int) { projects(limit: $n) { name organization { name } } }',
+            {'n': 10}
+        )
+        self.assertEqual(response.status_code, 200)
+        # Ten projects, each with one organization object.
+        self.assertEqual(response.json()['extensions']['cost']['cost'], 10 * (1 + 1))
+
+    def test_connection_first_multiplies_edges(self):
+        response = self._graphql_query(
+            '{ tasksConnection(first: 5) { edges { node { project { name } } } } }'
+        )
+        # Connection (1) + 5 edges x (edge 1 + node 1 + project 1).
+        self.assertEqual(response.json()['extensions']['cost']['cost'], 1 + 5 * 3)
+
+    @override_settings(GRAPHQL_QUERY_COST={'MAX_LIST_SIZE': 3})
+    def test_lists_are_served_at_the_size_they_are_costed_at(self):
+        project = Project.objects.create(organization=self.organization, name="Project")
+        Task.objects.bulk_create([Task(project=project, title=f'Task {i}') for i in range(5)])
+        response = self._graphql_query(
+            'query($id: ID!) { tasks(projectId: $id, limit: 100000) { id } }',
+            {'id': project.pk}
+        )
+        body = response.json()
+        self.assertEqual(body['extensions']['cost']['cost'], 3)
+        self.assertEqual(len(body['data']['tasks']), 3)
+
+    @override_settings(GRAPHQL_QUERY_COST={'MAX_COST': 50})
+    def test_over_budget_operation_is_rejected(self):
+        response = self._graphql_query(
+            '{ tasks(limit: 100) { project { organization { name } } } }'
+        )
+        self.assertEqual(response.status_code, 400)
+        body = response.json()
+        self.assertNotIn('data', body)
+        self.assertIn('exceeds the maximum of 50', body['errors'][0]['message'])
+
+    @override_settings(GRAPHQL_QUERY_COST={'MAX_DEPTH': 3})
+    def test_depth_limit(self):
+        response = self._graphql_query(
+            '{ tasks { project { organization { name } } } }'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('depth', response.json()['errors'][0]['message'])
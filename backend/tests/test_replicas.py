@@ -0,0 +1,90 @@
+import json
+from django.contrib.auth.models import User
+from django.db import router
+from django.test import AsyncRequestFactory, Client, TestCase, override_settings
+from django.views.decorators.csrf import csrf_exempt
+from apps.core.middleware import OrganizationMiddleware, ReplicaMiddleware, organization_cache
+from apps.core.routers import read_from_replicas, replica_session
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.schema.views import AsyncGraphQLView
+from .conftest import REPLICA
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(TestCase):
+    databases = {'default', REPLICA}
+
+    def setUp(self):
+        organization_cache.clear()
+        self.client = Client()
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        Project.objects.create(organization=self.organization, name="Primary")
+        # The replica has not caught up: it only has an older project.
+        replica_organization = Organization.objects.using(REPLICA).create(
+            pk=self.organization.pk, name="Test Organization", contact_email="test@example.com"
+        )
+        Project.objects.using(REPLICA).create(organization=replica_organization, name="Replica")
+
+    def _graphql_query(self, query):
+        response = self.client.post(
+            '/graphql/',
+            {'query': query},
+            content_type='application/json',
+            headers={'X-Organization-Slug': self.organization.slug, 'Cache-Control': 'no-cache'},
+        )
+        return response, json.loads(response.content)
+
+    def _project_names(self):
+        return [project['name'] for project in self._graphql_query('{ projects { name } }')[1]['data']['projects']]
+
+    def test_router(self):
+        self.assertEqual(router.db_for_read(Project), 'default')
+        with replica_session():
+            with read_from_replicas():
+                self.assertEqual(router.db_for_read(Project), REPLICA)
+                self.assertEqual(router.db_for_write(Project), 'default')
+                self.assertEqual(router.db_for_read(Project), REPLICA)
+                Project.objects.filter(organization=self.organization).update(description='Written')
+                # The rest of a request that wrote reads its own writes.
+                self.assertEqual(router.db_for_read(Project), 'default')
+        with replica_session(pinned=True), read_from_replicas():
+            self.assertEqual(router.db_for_read(Project), 'default')
+
+    def test_queries_read_from_replica(self):
+        self.assertEqual(self._project_names(), ['Replica'])
+
+    def test_client_sticks_to_primary_after_writing(self):
+        response, data = self._graphql_query('mutation { createProject(name: "New") { success } }')
+        self.assertTrue(data['data']['createProject']['success'])
+        self.assertIn(ReplicaMiddleware.cookie_name, response.cookies)
+        self.assertEqual(sorted(self._project_names()), ['New', 'Primary'])
+
+        # Once the window has passed the client reads from the replica again.
+        del self.client.cookies[ReplicaMiddleware.cookie_name]
+        self.assertEqual(self._project_names(), ['Replica'])
+
+    async def test_async_view_reads_from_replica(self):
+        view = ReplicaMiddleware(OrganizationMiddleware(csrf_exempt(AsyncGraphQLView.as_view())))
+        request = AsyncRequestFactory().post(
+            '/graphql/',
+            {'query': '{ projects { name organization { name } } }'},
+            content_type='application/json',
+            headers={'X-Organization-Slug': self.organization.slug, 'Cache-Control': 'no-cache'},
+        )
+        data = json.loads((await view(request)).content)['data']
+        self.assertEqual([project['name'] for project in data['projects']], ['Replica'])
+
+    def test_reads_do_not_pin(self):
+        response, _ = self._graphql_query('{ projects { name } }')
+        self.assertNotIn(ReplicaMiddleware.cookie_name, response.cookies)
+        # Computing and storing the stats rollup is not the client's write.
+        response, _ = self._graphql_query('{ projectStats { totalProjects } }')
+        self.assertNotIn(ReplicaMiddleware.cookie_name, response.cookies)
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_list_reads_from_replica(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        content = self.client.get('/admin/projects/project/').content.decode()
+        self.assertIn('Replica', content)
+        self.assertNotIn('Primary', content)
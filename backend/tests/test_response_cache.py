@@ -0,0 +1,74 @@
+from django.core.cache import caches
+from django.test import TestCase, Client, override_settings
+from apps.core.response_cache import check_version_cache, response_cache
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+
+
+class ResponseCacheTest(TestCase):
+    query = '{ projects { name } }'
+
+    def setUp(self):
+        caches['graphql'].clear()
+        response_cache.reset_stats()
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        Project.objects.create(organization=self.organization, name="Alpha")
+
+    def _graphql_query(self, query, organization=None):
+        return self.client.post(
+            '/graphql/',
+            {'query': query},
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=(organization or self.organization).slug
+        )
+
+    def test_repeated_query_is_served_from_cache(self):
+        first = self._graphql_query(self.query).json()
+        self.assertEqual(first['extensions']['responseCache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self._graphql_query(self.query).json()
+        self.assertEqual(second['extensions']['responseCache'], 'HIT')
+        self.assertEqual(second['data'], first['data'])
+
+    def test_mutation_invalidates_tenant(self):
+        self._graphql_query(self.query)
+        self._graphql_query('mutation { createProject(name: "Beta") { success } }')
+
+        data = self._graphql_query(self.query).json()
+        self.assertEqual(data['extensions']['responseCache'], 'MISS')
+        self.assertEqual({p['name'] for p in data['data']['projects']}, {'Alpha', 'Beta'})
+
+    def test_bump_from_another_process_invalidates(self):
+        self._graphql_query(self.query)
+        # Another worker's mutation reaches this one through the shared versions.
+        caches['graphql_versions'].incr(f'gql:version:{self.organization.pk}')
+
+        data = self._graphql_query(self.query).json()
+        self.assertEqual(data['extensions']['responseCache'], 'MISS')
+
+    def test_warns_when_versions_are_per_process(self):
+        self.assertEqual(check_version_cache(), [])
+        with override_settings(GRAPHQL_RESPONSE_CACHE={'ALIAS': 'graphql'}):
+            self.assertEqual([warning.id for warning in check_version_cache()], ['core.W001'])
+
+    def test_tenants_are_isolated(self):
+        other = Organization.objects.create(name="Other", contact_email="other@example.com")
+        self._graphql_query(self.query)
+
+        data = self._graphql_query(self.query, organization=other).json()
+        self.assertEqual(data['extensions']['responseCache'], 'MISS')
+        self.assertEqual(data['data']['projects'], [])
+
+    def test_stats_endpoint(self):
+        self._graphql_query(self.query)
+        self._graphql_query(self.query)
+
+        stats = self.client.get('/api/cache/stats/').json()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
@@ -0,0 +1,42 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from apps.core import counters
+from apps.organizations.models import Organization
+from apps.organizations.sample_data import generate
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskComment
+
+
+class SampleDataTest(TestCase):
+    def _snapshot(self):
+        return (
+            list(Organization.objects.order_by('pk').values_list('project_count', 'task_count')),
+            list(Project.objects.order_by('pk').values_list(*Project.TASK_COUNTER_FIELDS.values())),
+            list(Task.objects.order_by('pk').values_list('comment_count', flat=True)),
+        )
+
+    def test_generated_counters_are_consistent(self):
+        totals = generate(orgs=2, projects_per_org=4, tasks_per_project=30, comments_per_task=2, seed=7, batch_size=50)
+
+        self.assertEqual(totals['organizations'], 2)
+        self.assertEqual(Task.objects.count(), totals['tasks'])
+        self.assertEqual(TaskComment.objects.count(), totals['comments'])
+        stored = self._snapshot()
+        counters.reconcile()
+        self.assertEqual(self._snapshot(), stored)
+
+    def test_seed_is_deterministic(self):
+        generate(orgs=1, projects_per_org=2, tasks_per_project=20, seed=3)
+        first = list(Task.objects.order_by('pk').values_list('title', 'status', 'priority', 'assignee_email'))
+        Organization.objects.all().delete()
+
+        generate(orgs=1, projects_per_org=2, tasks_per_project=20, seed=3)
+        second = list(Task.objects.order_by('pk').values_list('title', 'status', 'priority', 'assignee_email'))
+        self.assertEqual(first, second)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('create_sample_data', '--orgs', '1', '--tasks-per-project', '3', stdout=out)
+        self.assertIn('1 organizations', out.getvalue())
+        self.assertEqual(Project.objects.count(), 3)
@@ -0,0 +1,66 @@
+from django.test import TestCase
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.search import get_search_backend
+from apps.search.suggest import suggestion_cache
+from apps.tasks.models import Task, TaskComment
+
+
+class SearchBackendTest(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(
+            name="Test Org",
+            contact_email="test@example.com"
+        )
+        self.roadmap = Project.objects.create(
+            organization=self.organization,
+            name="Roadmap",
+            description="Quarterly planning"
+        )
+        self.website = Project.objects.create(
+            organization=self.organization,
+            name="Website",
+            description="Publish the roadmap on the website"
+        )
+        Project.objects.create(organization=self.organization, name="Hiring")
+
+    def test_ranks_title_matches_first(self):
+        results = list(get_search_backend().search(Project.objects.all(), "roadmap"))
+        self.assertEqual(results, [self.roadmap, self.website])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+        self.assertIn('<b>', results[1].search_headline)
+
+    def test_all_terms_must_match(self):
+        results = get_search_backend().search(Project.objects.all(), "roadmap website")
+        self.assertEqual(list(results), [self.website])
+
+    def test_searches_tasks_and_comments(self):
+        task = Task.objects.create(project=self.website, title="Deploy staging server")
+        TaskComment.objects.create(task=task, content="Staging is down", author_email="a@example.com")
+        backend = get_search_backend()
+        self.assertEqual(list(backend.search(Task.objects.all(), "staging")), [task])
+        self.assertEqual(backend.search(TaskComment.objects.all(), "staging").count(), 1)
+
+
+class SuggestTest(TestCase):
+    def setUp(self):
+        suggestion_cache.clear()
+        self.organization = Organization.objects.create(
+            name="Test Org",
+            contact_email="test@example.com"
+        )
+        project = Project.objects.create(organization=self.organization, name="Website")
+        Task.objects.create(project=project, title="Design homepage", assignee_email="dana@example.com")
+        Task.objects.create(project=project, title="Deploy", assignee_email="dana@example.com")
+        Task.objects.create(project=project, title="Write copy", assignee_email="sam@example.com")
+
+    def test_suggest_query(self):
+        response = self.client.post(
+            '/graphql/',
+            {'query': '{ suggest(field: ASSIGNEE_EMAIL, query: "dana") { value score } }'},
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug
+        )
+        suggestions = response.json()['data']['suggest']
+        self.assertEqual([s['value'] for s in suggestions], ["dana@example.com"])
+        self.assertGreater(suggestions[0]['score'], 0)
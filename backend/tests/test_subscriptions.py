@@ -0,0 +1,240 @@
+import asyncio
+import json
+import socket
+from types import SimpleNamespace
+import psycopg2
+from django.db import transaction
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.views.decorators.csrf import csrf_exempt
+from apps.core import events
+from apps.core.middleware import OrganizationMiddleware, organization_cache
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.schema.views import AsyncGraphQLView
+from apps.schema.websocket import GraphQLWebSocketApp, PROTOCOL
+
+TASK_CHANGED = '''
+    subscription($projectId: ID) {
+        taskChanged(projectId: $projectId) { action taskId task { title project { name } } }
+    }
+'''
+
+
+class Client:
+    """Drives ``GraphQLWebSocketApp`` through its ASGI interface."""
+
+    def __init__(self, subprotocols=(PROTOCOL,)):
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+        scope = {'type': 'websocket', 'path': '/graphql/', 'headers': [], 'subprotocols': list(subprotocols)}
+        self.task = asyncio.ensure_future(
+            GraphQLWebSocketApp(init_timeout=5)(scope, self.incoming.get, self.outgoing.put)
+        )
+
+    async def connect(self):
+        await self.incoming.put({'type': 'websocket.connect'})
+        return await self.receive_raw()
+
+    async def send(self, message):
+        await self.incoming.put({'type': 'websocket.receive', 'text': json.dumps(message)})
+
+    async def receive_raw(self):
+        return await asyncio.wait_for(self.outgoing.get(), 5)
+
+    async def receive(self):
+        message = await self.receive_raw()
+        return json.loads(message['text'])
+
+    async def close(self):
+        await self.incoming.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(self.task, 5)
+
+
+class SubscriptionTest(TransactionTestCase):
+    def setUp(self):
+        organization_cache.clear()
+        self.organization = Organization.objects.create(name="Test Organization", contact_email="test@example.com")
+        self.project = Project.objects.create(organization=self.organization, name="Alpha")
+        self.other = Project.objects.create(organization=self.organization, name="Beta")
+        self.view = OrganizationMiddleware(csrf_exempt(AsyncGraphQLView.as_view()))
+
+    async def _graphql_query(self, query, variables=None):
+        request = AsyncRequestFactory().post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+            headers={'X-Organization-Slug': self.organization.slug},
+        )
+        return json.loads((await self.view(request)).content)
+
+    async def _subscribed_client(self, query, variables=None):
+        client = Client()
+        self.assertEqual((await client.connect())['subprotocol'], PROTOCOL)
+        await client.send({'type': 'connection_init', 'payload': {'organizationSlug': self.organization.slug}})
+        self.assertEqual(await client.receive(), {'type': 'connection_ack'})
+        await client.send({'id': '1', 'type': 'subscribe', 'payload': {'query': query, 'variables': variables or {}}})
+        for _ in range(100):
+            if events.get_broker().subscriber_count(self.organization.pk):
+                break
+            await asyncio.sleep(0.01)
+        return client
+
+    async def _create_task(self, project, title):
+        data = await self._graphql_query(
+            'mutation($projectId: ID!, $title: String!) { createTask(projectId: $projectId, title: $title) '
+            '{ task { id } } }',
+            {'projectId': project.pk, 'title': title},
+        )
+        return data['data']['createTask']['task']['id']
+
+    async def test_task_changes_are_pushed(self):
+        client = await self._subscribed_client(TASK_CHANGED, {'projectId': self.project.pk})
+        await self._create_task(self.other, 'Filtered out')
+        task_id = await self._create_task(self.project, 'Pushed')
+
+        message = await client.receive()
+        self.assertEqual(message['id'], '1')
+        self.assertEqual(message['type'], 'next')
+        self.assertEqual(message['payload']['data']['taskChanged'], {
+            'action': 'CREATED',
+            'taskId': task_id,
+            'task': {'title': 'Pushed', 'project': {'name': 'Alpha'}},
+        })
+
+        await self._graphql_query('mutation($id: ID!) { deleteTask(id: $id) { success } }', {'id': task_id})
+        message = await client.receive()
+        self.assertEqual(message['payload']['data']['taskChanged'], {
+            'action': 'DELETED', 'taskId': task_id, 'task': None,
+        })
+
+        await client.send({'id': '1', 'type': 'complete'})
+        await client.close()
+        self.assertEqual(events.get_broker().subscriber_count(self.organization.pk), 0)
+
+    async def test_events_stay_within_organization(self):
+        other = await Organization.objects.acreate(name="Other", contact_email="other@example.com")
+        client = await self._subscribed_client('subscription { projectChanged { action project { name } } }')
+        await Project.objects.acreate(organization=other, name="Elsewhere")
+        events.get_broker().publish(events.ChangeEvent('project', events.CREATED, other.pk, 1, 1))
+        await self._graphql_query('mutation { createProject(name: "Gamma") { success } }')
+
+        message = await client.receive()
+        self.assertEqual(message['payload']['data']['projectChanged'], {
+            'action': 'CREATED', 'project': {'name': 'Gamma'},
+        })
+        await client.close()
+
+    async def test_only_subscriptions(self):
+        client = await self._subscribed_client('{ projects { name } }')
+        message = await client.receive()
+        self.assertEqual(message['type'], 'error')
+        await client.close()
+
+        data = await self._graphql_query(TASK_CHANGED)
+        self.assertEqual(data['errors'][0]['message'], 'Subscriptions are only available over WebSocket.')
+
+    async def test_unknown_organization_is_rejected(self):
+        client = Client()
+        await client.connect()
+        await client.send({'type': 'connection_init', 'payload': {'organizationSlug': 'missing'}})
+        self.assertEqual((await client.receive_raw())['code'], 4403)
+
+    async def test_subscribe_before_init_is_rejected(self):
+        client = Client()
+        await client.connect()
+        await client.send({'id': '1', 'type': 'subscribe', 'payload': {'query': TASK_CHANGED}})
+        self.assertEqual((await client.receive_raw())['code'], 4401)
+
+    async def test_wrong_subprotocol(self):
+        client = Client(subprotocols=['graphql-ws'])
+        self.assertEqual((await client.connect())['code'], 4406)
+
+
+class RecordingBroker(events.InMemoryBroker):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def publish_many(self, events):
+        self.batches.append([event.id for event in events])
+
+
+class EventBatchTest(TestCase):
+    def setUp(self):
+        self.broker = RecordingBroker()
+        previous, events._broker = events._broker, self.broker
+        self.addCleanup(setattr, events, '_broker', previous)
+
+    def test_events_are_sent_per_transaction_without_rolled_back_ones(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                events.publish('task', events.UPDATED, 1, 1, 1)
+                events.publish('task', events.UPDATED, 1, 2, 1)
+                try:
+                    with transaction.atomic():
+                        events.publish('task', events.UPDATED, 1, 3, 1)
+                        raise ValueError
+                except ValueError:
+                    pass
+                # Joins the first batch again once the savepoint's is dropped.
+                events.publish('task', events.UPDATED, 1, 4, 1)
+            self.assertEqual(self.broker.batches, [])
+        self.assertEqual(self.broker.batches, [[1, 2, 4]])
+
+
+class FakeListener:
+    """Stands in for the broker's LISTEN connection; readable after ``wake``."""
+
+    def __init__(self, payloads=(), fail=False):
+        self.reader, self.writer = socket.socketpair()
+        self.payloads = list(payloads)
+        self.fail = fail
+        self.notifies = []
+        self.closed = False
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def wake(self):
+        self.writer.send(b'.')
+
+    def poll(self):
+        self.reader.recv(64)
+        if self.fail:
+            raise psycopg2.OperationalError('server closed the connection unexpectedly')
+        self.notifies.extend(SimpleNamespace(payload=payload) for payload in self.payloads)
+        self.payloads = []
+
+    def close(self):
+        self.closed = True
+        self.reader.close()
+        self.writer.close()
+
+
+class PostgresBrokerTest(SimpleTestCase):
+    async def test_lost_listener_is_replaced(self):
+        event = events.ChangeEvent('project', events.CREATED, 1, 5, 5)
+        dead, replacement = FakeListener(fail=True), FakeListener([event.to_json()])
+        listeners = iter([dead, replacement])
+        broker = events.PostgresBroker()
+        broker.RECONNECT_DELAY = 0
+        broker._connect = lambda: next(listeners)
+        loop = asyncio.get_running_loop()
+
+        subscription = broker.subscribe(1)
+        received = asyncio.ensure_future(subscription.__anext__())
+        while not broker.subscriber_count():
+            await asyncio.sleep(0.01)
+        dead.wake()
+        for _ in range(100):
+            task = broker._listeners.get(loop)
+            if task is not None and task.done() and task.result() is replacement:
+                break
+            await asyncio.sleep(0.01)
+        self.assertTrue(dead.closed)
+
+        replacement.wake()
+        self.assertEqual((await asyncio.wait_for(received, 5)).id, 5)
+        await subscription.aclose()
+        loop.remove_reader(replacement.fileno())
+        replacement.close()
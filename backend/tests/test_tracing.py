@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+from django.test import TestCase, Client, override_settings
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.schema import tracing
+
+
+class TracingTest(TestCase):
+    query = 'query Dashboard { projects { name completionRate } }'
+
+    def setUp(self):
+        self.client = Client()
+        self.organization = Organization.objects.create(
+            name="Test Organization",
+            contact_email="test@example.com"
+        )
+        Project.objects.create(organization=self.organization, name="Alpha")
+        Project.objects.create(organization=self.organization, name="Beta")
+
+    def _graphql_query(self, **headers):
+        return self.client.post(
+            '/graphql/',
+            {'query': self.query},
+            content_type='application/json',
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug,
+            **headers
+        ).json()
+
+    def test_requested_trace_in_apollo_format(self):
+        self.assertNotIn('tracing', self._graphql_query()['extensions'])
+
+        trace = self._graphql_query(HTTP_X_GRAPHQL_TRACE='1')['extensions']['tracing']
+        self.assertEqual(trace['version'], 1)
+        self.assertIn('parsing', trace)
+        self.assertIn('validation', trace)
+        resolvers = {tuple(r['path']): r for r in trace['execution']['resolvers']}
+        rate = resolvers[('projects', 1, 'completionRate')]
+        self.assertEqual((rate['parentType'], rate['returnType']), ('ProjectType', 'Float'))
+        self.assertGreaterEqual(rate['startOffset'], resolvers[('projects',)]['startOffset'])
+        self.assertLessEqual(rate['startOffset'] + rate['duration'], trace['duration'])
+
+    def test_sampled_traces_are_exported_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traces.jsonl')
+            with override_settings(GRAPHQL_TRACING={'SAMPLE_RATE': 1.0, 'EXPORTER': 'file', 'FILE': path}):
+                response = self._graphql_query(
+                    HTTP_TRACEPARENT='00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00'
+                )
+                tracing.get_exporter().flush()
+            self.assertNotIn('tracing', response['extensions'])
+
+            with open(path) as f:
+                payloads = [json.loads(line) for line in f]
+        self.assertEqual(len(payloads), 1)
+        spans = payloads[0]['resourceSpans'][0]['scopeSpans'][0]['spans']
+        root = spans[0]
+        self.assertEqual(root['name'], 'query Dashboard')
+        self.assertEqual(root['traceId'], '0af7651916cd43dd8448eb211c80319c')
+        self.assertEqual(root['parentSpanId'], 'b7ad6b7169203331')
+
+        by_name = {span['name']: span for span in spans}
+        projects = by_name['Query.projects']
+        self.assertEqual(projects['parentSpanId'], root['spanId'])
+        field_spans = [span for span in spans if span['name'] == 'ProjectType.completionRate']
+        self.assertEqual(len(field_spans), 2)
+        self.assertTrue(all(span['parentSpanId'] == projects['spanId'] for span in field_spans))
+
+    def test_unsampled_operations_are_not_traced(self):
+        request = type('Request', (), {'headers': {}})()
+        with override_settings(GRAPHQL_TRACING={'SAMPLE_RATE': 0.0}):
+            self.assertIsNone(tracing.start_trace(request))
@@ -1,10 +1,21 @@
 import { ApolloClient, InMemoryCache, createHttpLink } from '@apollo/client';
 import { setContext } from '@apollo/client/link/context';
+import { createPersistedQueryLink } from '@apollo/client/link/persisted-queries';
 
 const httpLink = createHttpLink({
   uri: 'http://localhost:8000/graphql/',
 });
 
+// Send operations by hash; the backend asks for the full text only once.
+const sha256 = async (query: string) => {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(query));
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
+
+const persistedQueryLink = createPersistedQueryLink({ sha256 });
+
 const authLink = setContext((_, { headers }) => {
   // Get organization slug from localStorage
   const currentOrg = localStorage.getItem('currentOrg');
@@ -20,7 +31,7 @@ const authLink = setContext((_, { headers }) => {
 });
 
 export const apolloClient = new ApolloClient({
-  link: authLink.concat(httpLink),
+  link: authLink.concat(persistedQueryLink).concat(httpLink),
   cache: new InMemoryCache({
     typePolicies: {
       Project: {